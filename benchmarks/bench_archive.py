@@ -0,0 +1,65 @@
+"""Measures how long :class:`pycpg.clients._archiveaccess.ArchiveExplorer` takes to
+resolve a path in an archive.
+
+The explorer resolves a path by listing the children of each directory on the way to
+it, so the cost grows with both the depth of the path and the number of entries per
+directory. Each case builds a synthetic tree on
+:class:`pycpg.testing.FakeCrashPlanServer` and resolves a file in its deepest
+directory.
+
+Run with::
+
+    python benchmarks/bench_archive.py
+"""
+
+import argparse
+import timeit
+
+from pycpg.clients._archiveaccess import ArchiveExplorer
+from pycpg.testing import FakeCrashPlanServer
+
+UNIT = "ms/path"
+# (depth, breadth, files per directory)
+TREES = ((2, 2, 5), (5, 2, 5), (8, 2, 5), (3, 10, 50), (3, 20, 200))
+
+
+def _create_explorer(server):
+    sdk = server.create_sdk()
+    device_guid = sdk.devices.get_page(1, page_size=1)["computers"][0]["guid"]
+    factory = sdk.archive._archive_accessor_factory
+    return factory.create_archive_accessor(
+        device_guid, ArchiveExplorer, destination_guid="42"
+    )
+
+
+def run(number=20):
+    results = {}
+    for depth, breadth, files in TREES:
+        server = FakeCrashPlanServer(
+            device_count=1,
+            tree_depth=depth,
+            tree_breadth=breadth,
+            files_per_directory=files,
+        )
+        explorer = _create_explorer(server)
+        path = "/" + "".join(f"dir{breadth - 1}/" for _ in range(depth)) + "file0.txt"
+
+        def resolve():
+            return explorer.create_file_selections("1", path, 0)
+
+        resolve()
+        seconds = min(timeit.repeat(resolve, number=number, repeat=5))
+        results[f"depth{depth}_breadth{breadth}_files{files}"] = seconds / number * 1e3
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20)
+    args = parser.parse_args()
+    for name, millis in run(args.number).items():
+        print(f"{name:<32}{millis:>10.2f} {UNIT}")
+
+
+if __name__ == "__main__":
+    main()
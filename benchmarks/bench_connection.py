@@ -0,0 +1,68 @@
+"""Measures the per-request overhead pycpg adds on top of the HTTP round trip.
+
+The session's ``send`` is replaced with one that returns a canned response, so the time
+reported is spent entirely inside :class:`pycpg.services._connection.Connection` (URL
+joining, header merging, request preparation, auth and response wrapping).
+
+Run with::
+
+    python benchmarks/bench_connection.py
+"""
+
+import argparse
+import timeit
+
+from requests import Response
+from requests.sessions import Session
+
+from pycpg.services._auth import CustomJWTAuth
+from pycpg.services._connection import Connection
+
+UNIT = "us/request"
+
+
+class _CannedSession(Session):
+    def __init__(self):
+        super().__init__()
+        self.headers = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+
+    def send(self, request, **kwargs):
+        response = Response()
+        response.status_code = 200
+        response._content = b'{"data": {"key": "value"}}'
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def run(number=2000):
+    connection = Connection.from_host_address(
+        "https://console.example.com",
+        auth=CustomJWTAuth(lambda: "token"),
+        session=_CannedSession(),
+    )
+    cases = {
+        "get": lambda: connection.get("/api/v1/Computer", params={"pgNum": 1}),
+        "get_with_headers": lambda: connection.get(
+            "/api/v1/Computer", headers={"Accept": "*/*"}
+        ),
+        "post_json": lambda: connection.post("/api/v1/User", json={"key": "value"}),
+    }
+    results = {}
+    for name, func in cases.items():
+        func()
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        results[name] = seconds / number * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+    for name, micros in run(args.number).items():
+        print(f"{name:<20}{micros:>10.1f} {UNIT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Measures how many items per second :func:`pycpg.services.util.get_all_pages` yields.
+
+Devices are paged from :class:`pycpg.testing.FakeCrashPlanServer` with
+``sdk.devices.get_all()``. Every request to the fake server sleeps for the configured
+latency, so the ``latency_*`` cases show how the round trip bounds throughput and the
+``latency_0ms`` case shows the SDK's own cost.
+
+Run with::
+
+    python benchmarks/bench_paging.py
+"""
+
+import argparse
+import time
+
+from pycpg.testing import FakeCrashPlanServer
+
+UNIT = "items/s"
+LATENCIES = (0, 0.005, 0.02)
+
+
+def run(device_count=5000, page_size=500):
+    results = {}
+    for latency in LATENCIES:
+        server = FakeCrashPlanServer(
+            device_count=device_count, max_page_size=page_size, latency=latency
+        )
+        sdk = server.create_sdk()
+        start = time.perf_counter()
+        item_count = sum(
+            len(page["computers"]) for page in sdk.devices.get_all(page_size=page_size)
+        )
+        seconds = time.perf_counter() - start
+        results[f"latency_{latency * 1e3:g}ms"] = item_count / seconds
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-d", "--device-count", type=int, default=5000)
+    parser.add_argument("-p", "--page-size", type=int, default=500)
+    args = parser.parse_args()
+    for name, rate in run(args.device_count, args.page_size).items():
+        print(f"{name:<20}{rate:>10.0f} {UNIT}")
+
+
+if __name__ == "__main__":
+    main()
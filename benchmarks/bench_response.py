@@ -0,0 +1,82 @@
+"""Measures how long :class:`pycpg.response.PycpgResponse` takes to parse a page.
+
+Each case wraps a canned :class:`requests.Response` holding a page of device records,
+like the ones ``/api/v1/Computer`` returns, and reads an item from it, which decodes
+and parses the whole body. The ``select_*`` cases decode the same pages with a
+:class:`pycpg.query.DeviceQuery` that selects two fields, which adds the cost of cutting
+each record down. Page sizes range from 100 to 10,000 items.
+
+Run with::
+
+    python benchmarks/bench_response.py
+"""
+
+import argparse
+import json
+import timeit
+
+from requests import Response
+
+from pycpg.query import DeviceQuery
+from pycpg.response import PycpgResponse
+
+UNIT = "ms/page"
+PAGE_SIZES = (100, 1000, 10000)
+
+
+def _create_page(page_size):
+    computers = [
+        {
+            "computerId": i,
+            "guid": str(900000000000000000 + i),
+            "name": f"device-{i}",
+            "osHostname": f"host-{i}",
+            "osName": "linux",
+            "status": "Active",
+            "active": True,
+            "userUid": f"user-uid-{i}",
+            "orgId": 1,
+            "lastConnected": "2024-01-01T00:00:00.000Z",
+        }
+        for i in range(page_size)
+    ]
+    body = {"data": {"totalCount": page_size, "computers": computers}}
+    response = Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response._content = json.dumps(body).encode("utf-8")
+    return response
+
+
+def run(number=20):
+    results = {}
+    for page_size in PAGE_SIZES:
+        response = _create_page(page_size)
+
+        def parse():
+            return PycpgResponse(response)["computers"]
+
+        # One more than the page size, so that the query reads a single page.
+        query = DeviceQuery(
+            lambda *args, **kwargs: PycpgResponse(response), page_size=page_size + 1
+        ).select("guid", "name")
+
+        def select():
+            return list(query)
+
+        for name, func in (("parse", parse), ("select", select)):
+            seconds = min(timeit.repeat(func, number=number, repeat=5))
+            results[f"{name}_{page_size}"] = seconds / number * 1e3
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20)
+    args = parser.parse_args()
+    for name, millis in run(args.number).items():
+        print(f"{name:<20}{millis:>10.2f} {UNIT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Measures end-to-end latency of the web restore job pollers.
+
+:class:`~pycpg.clients._archiveaccess.restoremanager.FileSizePoller` starts a size
+job for each file and polls until they finish, and
+:class:`~pycpg.clients._archiveaccess.restoremanager.RestoreJobManager` starts a
+restore, polls until it is done and opens the result stream. Both run against
+:class:`pycpg.testing.FakeCrashPlanServer`, whose jobs finish immediately, with the
+given per-request latency, so the time reported is the cost of the requests each
+poller sends.
+
+Run with::
+
+    python benchmarks/bench_restore.py
+"""
+
+import argparse
+import time
+
+from pycpg.clients._archiveaccess import FileSelection
+from pycpg.clients._archiveaccess.restoremanager import FileSizePoller
+from pycpg.clients._archiveaccess.restoremanager import RestoreJobManager
+from pycpg.services._connection import Connection
+from pycpg.services.storage.archive import StorageArchiveService
+from pycpg.testing import FakeCrashPlanServer
+
+UNIT = "ms"
+FILE_COUNTS = (1, 10, 50)
+
+
+def _time(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return min(samples) * 1e3
+
+
+def run(latency=0.005, repeat=5):
+    server = FakeCrashPlanServer(device_count=1, latency=latency)
+    sdk = server.create_sdk()
+    connection = Connection.from_host_address(
+        server.host_address, auth=sdk._auth, transport=server
+    )
+    service = StorageArchiveService(connection)
+    device_guid = sdk.devices.get_page(1, page_size=1)["computers"][0]["guid"]
+    poller = FileSizePoller(service, device_guid, job_polling_interval=0.001)
+    manager = RestoreJobManager(
+        service, device_guid, "session-1", job_polling_interval=0.001
+    )
+
+    results = {}
+    for count in FILE_COUNTS:
+        file_ids = [f"root.f{i}" for i in range(count)]
+        results[f"file_sizes_{count}"] = _time(
+            lambda: poller.get_file_sizes(file_ids, timeout=60), repeat
+        )
+    for count in FILE_COUNTS:
+        selections = [
+            FileSelection({"fileType": "FILE", "path": f"/file{i}.txt"}, 1, 0, 1024)
+            for i in range(count)
+        ]
+
+        def restore():
+            response = manager.get_stream("1", selections, show_deleted=True)
+            return b"".join(response.iter_content(chunk_size=1024))
+
+        results[f"restore_{count}"] = _time(restore, repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-l", "--latency", type=float, default=0.005)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for name, millis in run(args.latency, args.repeat).items():
+        print(f"{name:<20}{millis:>10.2f} {UNIT}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Measures the cost of constructing and mutating device and org settings objects.
+
+:class:`pycpg.clients.settings.device_settings.DeviceSettings` and
+:class:`pycpg.clients.settings.org_settings.OrgSettings` are built from the sample
+settings in the unit tests, so this script needs the repository checkout. Construction copies the sample first, as each object modifies the dictionary it
+wraps. The mutation cases set properties and append backup paths, which records the
+changes to post. The read cases get every device setting property from 100 devices,
+one attribute at a time and with :func:`pycpg.clients.settings.extract`.
+
+Run with::
+
+    python benchmarks/bench_settings.py
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from copy import deepcopy
+from pathlib import Path
+
+from pycpg.clients.settings import extract
+from pycpg.clients.settings import SettingProperty
+from pycpg.clients.settings.device_settings import DeviceSettings
+from pycpg.clients.settings.org_settings import OrgSettings
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(_REPO_ROOT))
+
+from tests.clients.settings.test_device_settings import (  # noqa: E402
+    DEVICE_DICT_W_SETTINGS,
+)
+from tests.clients.settings.test_org_settings import (  # noqa: E402
+    TEST_T_SETTINGS_DICT,
+)
+
+UNIT = "us/op"
+_ORG_SETTINGS_PATH = (
+    _REPO_ROOT / "tests/clients/settings/org_settings_not_inherited.json"
+)
+
+
+def _load_org_settings():
+    with open(_ORG_SETTINGS_PATH) as f:
+        return json.load(f)["data"]
+
+
+def _mutate_device(device_settings):
+    device_settings.name = "Renamed Device"
+    device_settings.notes = "notes"
+    device_settings.warning_alert_days = 5
+    backup_set = device_settings.backup_sets[0]
+    backup_set.included_files.append("/Users/bench/")
+    backup_set.excluded_files.append("/Users/bench/tmp/")
+    backup_set.filename_exclusions.append(".*\\.tmp")
+
+
+def _mutate_org(org_settings):
+    org_settings.org_name = "Renamed Org"
+    org_settings.archive_hold_days = 365
+    org_settings.user_backup_quota = 100
+    org_settings.web_restore_enabled = False
+    org_settings.device_defaults.warning_alert_days = 5
+
+
+def _read_devices(devices, names):
+    return [[getattr(device, name) for name in names] for device in devices]
+
+
+def run(number=2000):
+    org_dict = _load_org_settings()
+    devices = [DeviceSettings(deepcopy(DEVICE_DICT_W_SETTINGS)) for _ in range(100)]
+    names = [
+        name
+        for name in dir(DeviceSettings)
+        if isinstance(getattr(DeviceSettings, name), SettingProperty)
+    ]
+    cases = {
+        "copy_device_dict": lambda: deepcopy(DEVICE_DICT_W_SETTINGS),
+        "device_construct": lambda: DeviceSettings(deepcopy(DEVICE_DICT_W_SETTINGS)),
+        "device_mutate": lambda: _mutate_device(
+            DeviceSettings(deepcopy(DEVICE_DICT_W_SETTINGS))
+        ),
+        "copy_org_dict": lambda: (deepcopy(org_dict), deepcopy(TEST_T_SETTINGS_DICT)),
+        "org_construct": lambda: OrgSettings(
+            deepcopy(org_dict), deepcopy(TEST_T_SETTINGS_DICT)
+        ),
+        "org_mutate": lambda: _mutate_org(
+            OrgSettings(deepcopy(org_dict), deepcopy(TEST_T_SETTINGS_DICT))
+        ),
+        "device_read_100": lambda: _read_devices(devices, names),
+        "device_extract_100": lambda: extract(devices, names),
+    }
+    results = {}
+    for name, func in cases.items():
+        func()
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        results[name] = seconds / number * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+    for name, micros in run(args.number).items():
+        print(f"{name:<20}{micros:>10.1f} {UNIT}")
+
+
+if __name__ == "__main__":
+    main()
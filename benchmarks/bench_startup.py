@@ -0,0 +1,58 @@
+"""Measures how long a new process takes to import pycpg and construct an SDK client.
+
+Each sample runs in a fresh interpreter so that nothing is already imported. Client
+construction uses :meth:`pycpg.sdk.SDKClient.from_jwt_provider` with a provider that
+returns a fixed token, so no requests are sent. The ``first_service`` case also reads
+``sdk.devices``, as a script that uses one service would.
+
+Run with::
+
+    python benchmarks/bench_startup.py
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+UNIT = "ms"
+
+_SCRIPT = """
+from time import perf_counter
+
+start = perf_counter()
+import pycpg.sdk
+
+imported = perf_counter()
+sdk = pycpg.sdk.SDKClient.from_jwt_provider("https://console.example.com", lambda: "t")
+constructed = perf_counter()
+sdk.devices
+used = perf_counter()
+print(imported - start, constructed - imported, used - constructed)
+"""
+
+
+def run(repeat=20):
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _SCRIPT], check=True, capture_output=True, text=True
+        ).stdout
+        samples.append([float(value) for value in output.split()])
+    names = ("import_sdk", "from_jwt_provider", "first_service")
+    return {
+        name: statistics.median(sample[i] for sample in samples) * 1e3
+        for i, name in enumerate(names)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-r", "--repeat", type=int, default=20)
+    args = parser.parse_args()
+    for name, millis in run(args.repeat).items():
+        print(f"{name:<20}{millis:>10.2f} {UNIT}")
+
+
+if __name__ == "__main__":
+    main()
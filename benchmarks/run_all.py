@@ -0,0 +1,83 @@
+"""Runs every benchmark and reports the results, optionally as JSON.
+
+The JSON report records the pycpg and Python versions alongside each result, so
+reports saved for different releases can be compared to find regressions::
+
+    python benchmarks/run_all.py --json results.json
+
+Pass a saved report to ``--compare`` to print the change from it next to each result.
+Use ``--only`` to run a subset, e.g. ``--only connection response``. The ``startup``
+benchmark starts many interpreters, so it only runs when named.
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import sys
+from datetime import datetime
+from datetime import timezone
+from importlib.metadata import version
+from pathlib import Path
+
+BENCHMARKS = ("connection", "response", "paging", "archive", "settings", "restore")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def run(names=BENCHMARKS):
+    results = {}
+    for name in names:
+        module = importlib.import_module(f"bench_{name}")
+        results[name] = {
+            case: {"value": value, "unit": module.UNIT}
+            for case, value in module.run().items()
+        }
+    return results
+
+
+def create_report(results):
+    return {
+        "pycpg_version": version("pycpg"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+
+
+def _format_change(name, case, value, baseline):
+    try:
+        previous = baseline["results"][name][case]["value"]
+    except KeyError:
+        return ""
+    return f"{(value - previous) / previous:>+9.1%}" if previous else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--only", nargs="+", choices=BENCHMARKS + ("startup",), default=BENCHMARKS
+    )
+    parser.add_argument("--json", metavar="PATH", help="Write the results to PATH.")
+    parser.add_argument(
+        "--compare", metavar="PATH", help="Compare the results to the report at PATH."
+    )
+    args = parser.parse_args()
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    results = run(args.only)
+    for name, cases in results.items():
+        for case, result in cases.items():
+            value, unit = result["value"], result["unit"]
+            change = _format_change(name, case, value, baseline)
+            print(f"{name:<12}{case:<32}{value:>12.2f} {unit:<12}{change}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(create_report(results), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
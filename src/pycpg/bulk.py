@@ -0,0 +1,136 @@
+import json
+import os
+from collections import namedtuple
+from itertools import takewhile
+from threading import Lock
+
+from pycpg.exceptions import PycpgBulkErrorThresholdError
+from pycpg.services.util import run_concurrently
+
+BulkResult = namedtuple("BulkResult", ["item", "response", "error"])
+"""The outcome of a bulk operation for one item. `response` is the return value of the
+operation and `error` is the exception it raised, if any. Both are None in a dry run."""
+
+
+class BulkProgress:
+    """Records which items of a bulk operation have finished so that an interrupted run can
+    be resumed without repeating them.
+
+    When a `path` is given, each finished item is appended to that file as a line of JSON and
+    items recorded by an earlier run are loaded, so items must be JSON-serializable (such as
+    IDs or GUIDs). Failed items are not treated as done and are retried on the next run.
+
+    Args:
+        path (str, optional): The file to record progress in. Defaults to None, which only
+            keeps progress in memory.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.completed = set()
+        self.failed = {}
+        self._lock = Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def is_done(self, item):
+        """Returns True if the item finished successfully in this or an earlier run."""
+        return _progress_key(item) in self.completed
+
+    def record(self, result):
+        """Records the outcome of a :class:`BulkResult`."""
+        key = _progress_key(result.item)
+        with self._lock:
+            if result.error is None:
+                self.completed.add(key)
+                self.failed.pop(key, None)
+            else:
+                self.failed[key] = str(result.error)
+            if self.path:
+                entry = {"item": result.item, "ok": result.error is None}
+                with open(self.path, "a", encoding="utf-8") as progress_file:
+                    progress_file.write(json.dumps(entry) + "\n")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as progress_file:
+            for line in progress_file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = _progress_key(entry["item"])
+                if entry["ok"]:
+                    self.completed.add(key)
+                    self.failed.pop(key, None)
+                else:
+                    self.failed[key] = None
+
+
+def run_bulk(
+    operation, items, max_workers=None, dry_run=False, max_errors=None, progress=None
+):
+    """Runs a single-item operation, such as `sdk.devices.deactivate`, for each item in an
+    iterable with bounded concurrency and yields a :class:`BulkResult` for each item as it
+    finishes.
+
+    Errors raised by the operation, such as
+    :class:`~pycpg.exceptions.PycpgActiveLegalHoldError`, are reported in the result for
+    that item rather than raised. Items are read lazily, so the iterable can be a generator
+    over a very large number of IDs.
+
+    Args:
+        operation (callable): A function that accepts one item. Use `functools.partial`
+            or a lambda to supply any other arguments, e.g.
+            `partial(sdk.users.deactivate, block_user=True)`.
+        items (iterable): The items, usually IDs or GUIDs, to run the operation for.
+        max_workers (int, optional): The maximum number of items to run at the same time.
+            Defaults to `pycpg.settings.max_workers`.
+        dry_run (bool, optional): When True, yields a result for each item that would be run
+            without calling the operation. Defaults to False.
+        max_errors (int, optional): Stops starting new items once this many items have
+            failed, and raises :class:`~pycpg.exceptions.PycpgBulkErrorThresholdError`
+            after the items already running have finished. Defaults to None, which never
+            stops.
+        progress (:class:`BulkProgress`, optional): Records finished items and skips items
+            that already finished in an earlier run. Defaults to None.
+
+    Returns:
+        generator: An object that yields a :class:`BulkResult` for each item.
+
+    Usage example::
+
+        from pycpg.bulk import BulkProgress, run_bulk
+
+        progress = BulkProgress("deactivate-progress.jsonl")
+        for result in run_bulk(sdk.devices.deactivate, device_ids, progress=progress):
+            if result.error:
+                print(f"Failed to deactivate {result.item}: {result.error}")
+    """
+    if progress is not None:
+        items = (item for item in items if not progress.is_done(item))
+
+    if dry_run:
+        for item in items:
+            yield BulkResult(item, None, None)
+        return
+
+    stopped = False
+    items = takewhile(lambda _: not stopped, items)
+    error_count = 0
+    for item, response, error in run_concurrently(operation, items, max_workers):
+        result = BulkResult(item, response, error)
+        if progress is not None:
+            progress.record(result)
+        yield result
+        if error is not None:
+            error_count += 1
+            if max_errors is not None and error_count >= max_errors:
+                # No new items are started, but the items already running still
+                # finish, and are recorded so that a resumed run does not repeat them.
+                stopped = True
+    if stopped:
+        raise PycpgBulkErrorThresholdError(error_count)
+
+
+def _progress_key(item):
+    # JSON round-trips turn tuples into lists, so keys are normalized to hashable JSON text.
+    return json.dumps(item, sort_keys=True, default=str)
@@ -0,0 +1,277 @@
+from collections import namedtuple
+from threading import Lock
+from uuid import uuid4
+from urllib.parse import urlsplit
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from pycpg.services._cache import TTLCache
+from pycpg.services._diskcache import make_cache_key
+
+DEFAULT_TTLS = {
+    "/api/v1/ServerEnv": 3600,
+    "/api/v3/customer/my": 3600,
+    "/api/v1/role": 900,
+    "/api/v38/legal-hold-policy": 300,
+    "/api/v3/BackupSets": 300,
+    "/api/v1/WebRestoreInfo": 300,
+}
+"""The endpoints :class:`ResponseCache` caches by default, mapped to the number of
+seconds their responses are kept."""
+
+CacheStats = namedtuple("CacheStats", ["hits", "misses"])
+"""The number of requests that were answered from a cache and that were not."""
+
+
+class ResponseCache:
+    """Caches the responses of GET requests to endpoints whose data rarely changes, such
+    as the available roles, the legal hold policy list, and the current tenant.
+
+    Each endpoint is a URL path. It covers the paths below it, so ``/api/v3/BackupSets``
+    covers the backup sets of every device, and has its own time-to-live. Responses are
+    kept per host and per the ``Authorization`` header they were requested with, so
+    users and tenants never see each other's responses. Responses requested with
+    credentials that have since been renewed are requested again.
+
+    A successful POST, PUT, PATCH, or DELETE to a path an endpoint covers invalidates the
+    endpoint, so that creating a legal hold policy is seen by the next policy list. Call
+    :meth:`invalidate` after changes made some other way. Invalidations are recorded in
+    the backend, so with a shared backend they reach every process that uses it.
+
+    Set ``pycpg.settings.response_cache`` to a cache to use it::
+
+        pycpg.settings.response_cache = pycpg.cache.ResponseCache()
+
+    Args:
+        ttls (dict, optional): Endpoint paths mapped to the number of seconds their
+            responses are kept. Defaults to :data:`DEFAULT_TTLS`.
+        maxsize (int, optional): The most responses to keep in memory. The least
+            recently used response is dropped when the cache is full. Not used when
+            `backend` is given. Defaults to 1000.
+        backend (optional): Where responses are kept instead of memory, such as a store
+            shared by several processes. It must have ``get(key)`` and
+            ``set(key, value, ttl)`` methods, where `ttl` is in seconds. Keys are strings
+            and values are strings or JSON-serializable dicts.
+    """
+
+    def __init__(self, ttls=None, maxsize=1000, backend=None):
+        ttls = DEFAULT_TTLS if ttls is None else ttls
+        self._ttls = {path.rstrip("/"): ttl for path, ttl in ttls.items()}
+        # Longer paths are checked first so the most specific endpoint wins.
+        self._endpoints = sorted(
+            ((path.lower(), path) for path in self._ttls),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._memory = backend is None
+        if backend is None:
+            backend = TTLCache(maxsize, 0)
+            # Kept apart from the responses so that evicting responses never drops
+            # the record of an invalidation.
+            self._generations = TTLCache(max(len(self._ttls), 1), 0)
+        else:
+            self._generations = backend
+        self._backend = backend
+        self._hits = dict.fromkeys(self._ttls, 0)
+        self._misses = dict.fromkeys(self._ttls, 0)
+        self._lock = Lock()
+
+    def get_stats(self):
+        """Returns how many requests to each endpoint were answered from the cache.
+
+        Returns:
+            dict: Endpoint paths mapped to a :class:`CacheStats`.
+        """
+        with self._lock:
+            return {
+                path: CacheStats(self._hits[path], self._misses[path])
+                for path in self._ttls
+            }
+
+    def invalidate(self, path=None):
+        """Drops the cached responses of the endpoints that cover a path, or that a path
+        covers, or of every endpoint.
+
+        Args:
+            path (str, optional): A URL path, such as ``/api/v38/legal-hold-policy``.
+                Defaults to every endpoint.
+        """
+        endpoints = self._ttls if path is None else self._find_related(path)
+        for endpoint in endpoints:
+            # Responses are keyed by their endpoint's generation, so a new generation
+            # hides the older responses until they expire. A random generation is
+            # never reused, even after its record expires.
+            self._generations.set(
+                _get_generation_key(endpoint), uuid4().hex, self._ttls[endpoint]
+            )
+
+    def clear(self):
+        """Drops the cached responses of every endpoint and resets the hit and miss
+        counts. Other entries in a shared backend are left alone."""
+        if self._memory:
+            self._backend.clear()
+        else:
+            self.invalidate()
+        with self._lock:
+            self._hits = dict.fromkeys(self._ttls, 0)
+            self._misses = dict.fromkeys(self._ttls, 0)
+
+    def get(self, request):
+        """Returns the cached response to a prepared GET request, or None if there is
+        none or its endpoint is not cached."""
+        endpoint = self._find_endpoint(urlsplit(request.url).path)
+        if endpoint is None:
+            return None
+        entry = self._backend.get(self._get_key(endpoint, request))
+        with self._lock:
+            if entry is None:
+                self._misses[endpoint] += 1
+            else:
+                self._hits[endpoint] += 1
+        return _create_response(request, entry) if entry is not None else None
+
+    def set(self, request, response):
+        """Caches the response to a prepared GET request if its endpoint is cached."""
+        endpoint = self._find_endpoint(urlsplit(request.url).path)
+        if endpoint is None or response.status_code != 200:
+            return
+        entry = {
+            "status": response.status_code,
+            # The body is kept decoded, so headers describing its encoding are dropped.
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() not in ("content-encoding", "content-length")
+            },
+            "body": response.text,
+        }
+        key = self._get_key(endpoint, request)
+        self._backend.set(key, entry, self._ttls[endpoint])
+
+    def _get_key(self, endpoint, request):
+        return make_cache_key(
+            "response",
+            endpoint,
+            self._generations.get(_get_generation_key(endpoint)) or "",
+            request.url,
+            request.headers.get("Authorization"),
+        )
+
+    def _find_endpoint(self, path):
+        path = path.lower()
+        for prefix, endpoint in self._endpoints:
+            if path == prefix or path.startswith(f"{prefix}/"):
+                return endpoint
+        return None
+
+    def _find_related(self, path):
+        path = path.rstrip("/").lower()
+        return [
+            endpoint
+            for prefix, endpoint in self._endpoints
+            if path == prefix
+            or path.startswith(f"{prefix}/")
+            or prefix.startswith(f"{path}/")
+        ]
+
+
+class RevalidationCache:
+    """Keeps the responses of GET requests that carry an ``ETag`` or ``Last-Modified``
+    header, and asks the server whether they have changed instead of downloading them
+    again.
+
+    A request for a kept response is sent with ``If-None-Match`` and
+    ``If-Modified-Since`` headers. When the server answers ``304 Not Modified``, the
+    kept response is returned without downloading its body. This suits list endpoints
+    that are polled often, such as orgs and legal hold matters, on servers that support
+    conditional requests; other responses are unaffected. Responses are kept per URL and
+    per the ``Authorization`` header they were requested with.
+
+    Set ``pycpg.settings.revalidation_cache`` to a cache to use it::
+
+        pycpg.settings.revalidation_cache = pycpg.cache.RevalidationCache()
+
+    Args:
+        maxsize (int, optional): The most responses to keep. The least recently used
+            response is dropped when the cache is full. Defaults to 256.
+    """
+
+    def __init__(self, maxsize=256):
+        self._responses = TTLCache(maxsize, float("inf"))
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    def get_stats(self):
+        """Returns how many revalidated requests were answered with a kept response.
+
+        Returns:
+            :class:`CacheStats`: The number of requests answered with a ``304`` and the
+            number answered with a new response.
+        """
+        with self._lock:
+            return CacheStats(self._hits, self._misses)
+
+    def clear(self):
+        """Drops every kept response and resets the hit and miss counts."""
+        self._responses.clear()
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+    def add_validators(self, request):
+        """Adds the validators of the kept response to a prepared GET request, if there
+        is one, and returns the kept response. Requests that already have conditional
+        headers are left unchanged."""
+        headers = request.headers
+        if "If-None-Match" in headers or "If-Modified-Since" in headers:
+            return None
+        kept = self._responses.get(_get_identity(request))
+        if kept is None:
+            return None
+        etag = kept.headers.get("ETag")
+        last_modified = kept.headers.get("Last-Modified")
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return kept
+
+    def update(self, request, response, kept):
+        """Returns the response to a GET request, which is the kept response if the
+        server answered ``304``, and keeps new responses that carry validators."""
+        if kept is not None and response.status_code == 304:
+            with self._lock:
+                self._hits += 1
+            return kept
+        if response.status_code == 200 and (
+            "ETag" in response.headers or "Last-Modified" in response.headers
+        ):
+            if kept is not None:
+                with self._lock:
+                    self._misses += 1
+            self._responses.set(_get_identity(request), response)
+        return response
+
+
+def _get_identity(request):
+    return request.url, request.headers.get("Authorization")
+
+
+def _get_generation_key(endpoint):
+    return make_cache_key("response-generation", endpoint)
+
+
+def _create_response(request, entry):
+    response = Response()
+    response.status_code = entry["status"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.url = request.url
+    response.request = request
+    response.encoding = "utf-8"
+    response._content = entry["body"].encode("utf-8")
+    # Marks the body as already read, like a response that was not streamed.
+    response._content_consumed = True
+    response.raw = None
+    return response
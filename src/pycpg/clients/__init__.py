@@ -1,11 +0,0 @@
-from collections import namedtuple
-
-Clients = namedtuple(
-    "Clients",
-    [
-        "archive",
-        "authority",
-        "auditlogs",
-        "loginconfig",
-    ],
-)
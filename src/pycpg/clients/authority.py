@@ -1,6 +0,0 @@
-from collections import namedtuple
-
-AuthorityClient = namedtuple(
-    "AuthorityClient",
-    ["administration", "archive", "devices", "legalhold", "orgs", "users"],
-)
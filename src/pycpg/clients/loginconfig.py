@@ -1,3 +1,6 @@
+from requests.models import Request
+
+import pycpg.settings as settings
 from pycpg.response import PycpgResponse
 
 
@@ -17,5 +20,13 @@ class LoginConfigurationClient:
             :class:`pycpg.response.PycpgResponse`
         """
         uri = f"{self._connection.host_address}/api/v3/LoginConfiguration"
-        response = self._connection._session.get(uri, params={"username": username})
+        # The endpoint is unauthenticated, so the request is sent through the
+        # connection's transport without the connection's auth.
+        transport = self._connection.transport
+        request = Request("GET", uri, params={"username": username})
+        response = transport.send(
+            transport.prepare_request(request),
+            verify=settings.verify_ssl_certs,
+            proxies=settings.proxies,
+        )
         return PycpgResponse(response)
@@ -1,3 +1,6 @@
+from operator import attrgetter
+
+
 def set_val(d, keys, value):
     """Helper for setting nested values from a dict based on a list of keys."""
     d = get_val(d, keys[:-1])
@@ -11,6 +14,25 @@ def get_val(d, keys):
     return d
 
 
+def _compile_getter(keys):
+    """Returns a function that gets the value at the location defined by a list of keys
+    from a nested dict, with the keys bound ahead of time instead of walked in a loop on
+    every call."""
+    keys = tuple(keys)
+    if not keys:
+        return lambda d: d
+    if len(keys) == 1:
+        (k1,) = keys
+        return lambda d: d[k1]
+    if len(keys) == 2:
+        k1, k2 = keys
+        return lambda d: d[k1][k2]
+    if len(keys) == 3:
+        k1, k2, k3 = keys
+        return lambda d: d[k1][k2][k3]
+    return lambda d: get_val(d, keys)
+
+
 def show_change(val1, val2):
     if isinstance(val1, str):
         val1 = f'"{val1}"'
@@ -19,21 +41,30 @@ def show_change(val1, val2):
     return f"{val1} -> {val2}"
 
 
+def _get_original_values(instance):
+    """Returns the dict that holds the original value of each setting that has been
+    changed on `instance`, keyed by setting name. Values are only recorded the first
+    time a setting is changed, so unchanged settings cost nothing to track.
+    """
+    return vars(instance).setdefault("_original_values", {})
+
+
 class BaseSettingProperty:
     def __init__(self, name, location):
         self.name = name
         self.location = location
-        self.init_val = None
 
     def _register_change(self, instance, orig_val, new_val):
         name = self.name.lstrip("_")
-        if self.init_val is None:
-            self.init_val = orig_val
-        if self.init_val == new_val:
+        # Descriptors are shared by every instance of a class, so the original value
+        # is kept on the instance being changed.
+        original_values = _get_original_values(instance)
+        init_val = original_values.setdefault(name, orig_val)
+        if init_val == new_val:
             if name in instance.changes:
                 instance.changes.pop(name)
         else:
-            instance.changes[name] = show_change(self.init_val, new_val)
+            instance.changes[name] = show_change(init_val, new_val)
 
 
 class SettingProperty(BaseSettingProperty):
@@ -59,10 +90,14 @@ class SettingProperty(BaseSettingProperty):
         self.get_converter = get_converter
         self.set_converter = set_converter
         self.inheritance_attr = inheritance_attr
+        self._get_parent = _compile_getter(location[:-1])
+        self._key = location[-1]
 
     def __get__(self, instance, owner):
-        val = get_val(instance.data, self.location)
-        if isinstance(val, dict) and "#text" in val.keys():
+        if instance is None:
+            return self
+        val = self._get_parent(instance.data)[self._key]
+        if isinstance(val, dict) and "#text" in val:
             val = val["#text"]
         return self.get_converter(val) if self.get_converter is not None else val
 
@@ -70,21 +105,22 @@ class SettingProperty(BaseSettingProperty):
         converted_new_val = (
             self.set_converter(new_val) if self.set_converter is not None else new_val
         )
-        orig_val = get_val(instance.data, self.location)
+        parent = self._get_parent(instance.data)
+        key = self._key
+        orig_val = parent[key]
 
         # if locked, value is a dict with '#text' as the _real_ value key. Some properties will have dicts with @nil: true, these should stay dicts, as the whole dict is the property value.
-        if isinstance(orig_val, dict) and "#text" in orig_val.keys():
-            location = self.location + ["#text"]
+        if isinstance(orig_val, dict) and "#text" in orig_val:
+            parent = orig_val
+            key = "#text"
             orig_val = orig_val["#text"]
-        else:
-            location = self.location
 
         self._register_change(instance, orig_val, converted_new_val)
         if self.inheritance_attr is not None and getattr(
             instance, self.inheritance_attr
         ):
             setattr(instance, self.inheritance_attr, False)
-        set_val(instance.data, location, converted_new_val)
+        parent[key] = converted_new_val
 
 
 class TSettingProperty:
@@ -101,9 +137,10 @@ class TSettingProperty:
         self.key = key
         self.get_converter = get_converter
         self.set_converter = set_converter
-        self.init_val = None
 
     def __get__(self, instance, owner):
+        if instance is None:
+            return self
         if self.key in instance._packets:
             packet = instance._packets[self.key]
         else:
@@ -123,17 +160,15 @@ class TSettingProperty:
         self._register_change(instance, val)
 
     def _register_change(self, instance, val):
-        if self.init_val is None:
-            packet = instance._t_settings.get(self.key)
-            if packet is None:
-                self.init_val = None
-            else:
-                self.init_val = packet["value"]
-        if self.init_val == val:
+        # Changes are kept in `._packets`, so `._t_settings` still holds the instance's
+        # original values.
+        packet = instance._t_settings.get(self.key)
+        init_val = None if packet is None else packet["value"]
+        if init_val == val:
             if self.name in instance.changes:
                 instance.changes.pop(self.name)
         else:
-            instance.changes[self.name] = show_change(self.init_val, val)
+            instance.changes[self.name] = show_change(init_val, val)
 
 
 def check_lock(locked_attr):
@@ -151,3 +186,91 @@ def check_lock(locked_attr):
         return func
 
     return f
+
+
+def extract(settings_objects, properties):
+    """Reads properties from many settings objects in one pass and returns them as
+    columns, one list of values per property.
+
+    How to read each property is worked out once per settings class rather than on
+    every read, so this is much faster than reading the attributes one at a time when
+    auditing settings across many devices or orgs.
+
+    Example::
+
+        columns = extract(
+            (sdk.devices.get_settings(guid) for guid in guids),
+            ["name", "warning_alert_days", "critical_alert_days"],
+        )
+        columns["warning_alert_days"]  # [7, 5, 7, ...]
+
+    Args:
+        settings_objects (iterable): :class:`~pycpg.clients.settings.device_settings.DeviceSettings`,
+            :class:`~pycpg.clients.settings.org_settings.OrgSettings`, or other settings
+            objects to read.
+        properties (list): The names of the properties to read, such as
+            ``"warning_alert_days"``. Other attributes, and dotted paths such as
+            ``"device_defaults.warning_alert_days"``, can also be read.
+
+    Returns:
+        dict: The property names mapped to lists of values, in the order of
+        `settings_objects`. A setting that is missing or null in an object's settings
+        is read as `None`, and so is an attribute or dotted path that cannot be read.
+    """
+    names = list(dict.fromkeys(properties))
+    columns = {name: [] for name in names}
+    plans = {}
+    for settings_object in settings_objects:
+        cls = type(settings_object)
+        plan = plans.get(cls)
+        if plan is None:
+            plan = plans[cls] = _compile_extract_plan(cls, names, columns)
+        groups, readers = plan
+        data = settings_object.data if groups else None
+        for get_parent, settings in groups:
+            try:
+                parent = get_parent(data)
+            except (KeyError, TypeError):
+                parent = {}
+            for append, key, get_converter in settings:
+                val = parent.get(key)
+                if isinstance(val, dict) and "#text" in val:
+                    val = val["#text"]
+                if val is not None and get_converter is not None:
+                    val = get_converter(val)
+                append(val)
+        for append, read in readers:
+            append(read(settings_object))
+    return columns
+
+
+def _compile_extract_plan(cls, names, columns):
+    """Works out how to read each of `names` from instances of `cls`. Setting
+    properties are grouped by the dict that holds them, so each dict is looked up once
+    per object no matter how many of its settings are read."""
+    groups = {}
+    readers = []
+    for name in names:
+        attr = getattr(cls, name, None)
+        if isinstance(attr, SettingProperty):
+            parent_location = tuple(attr.location[:-1])
+            if parent_location not in groups:
+                groups[parent_location] = (attr._get_parent, [])
+            groups[parent_location][1].append(
+                (columns[name].append, attr._key, attr.get_converter)
+            )
+        else:
+            readers.append((columns[name].append, _read_or_none(attrgetter(name))))
+    return list(groups.values()), readers
+
+
+def _read_or_none(getter):
+    # TSettingProperty raises KeyError for a t-setting the org does not have, and a
+    # dotted path raises AttributeError when a part of it is missing.
+    def read(settings_object):
+        try:
+            return getter(settings_object)
+        except (AttributeError, KeyError):
+            return None
+
+    return read
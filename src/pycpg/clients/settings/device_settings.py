@@ -1,5 +1,6 @@
 from collections import UserDict
 from collections import UserList
+from contextlib import contextmanager
 
 from pycpg.clients.settings import check_lock
 from pycpg.clients.settings import SettingProperty
@@ -184,6 +185,8 @@ class BackupSet(UserDict):
         self._manager = settings_manager
         self._changes = settings_manager.changes
         self.data = backup_set_dict
+        self._batch_depth = 0
+        self._pending_lists = {}
         includes, excludes = self._extract_file_selection_lists()
         regex_excludes = self._extract_regex_exclusions()
         self._included_files = TrackedFileSelectionList(
@@ -289,6 +292,47 @@ class BackupSet(UserDict):
         }
         self.data["backupPaths"]["excludeUser"] = user_exclude_dict
 
+    @contextmanager
+    def batch_edit(self):
+        """Context manager that defers updating the backup set's settings until the
+        block exits. Changes made to `.included_files`, `.excluded_files`, and
+        `.filename_exclusions` inside the block rebuild the "pathset" and
+        "excludeUser" objects and register their changes once, instead of after
+        every change, which makes adding or removing many paths much faster. Blocks
+        can be nested; the settings are updated when the outermost block exits.
+
+        The backup set's settings dict is not updated until the block exits, so
+        don't send the settings to the server from inside the block.
+
+        Example::
+
+            with backup_set.batch_edit():
+                for path in paths_to_exclude:
+                    backup_set.excluded_files.append(path)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._apply_pending_changes()
+
+    def _register_list_change(self, tracked_list):
+        self._pending_lists[tracked_list.name] = tracked_list
+        if not self._batch_depth:
+            self._apply_pending_changes()
+
+    def _apply_pending_changes(self):
+        if not self._pending_lists:
+            return
+        pending = self._pending_lists.values()
+        self._pending_lists = {}
+        self._build_file_selection()
+        self._build_regex_exclusions()
+        for tracked_list in pending:
+            tracked_list._update_change()
+
     @property
     def locked(self):
         """Indicates whether the backup set as a whole is locked. If True, individual
@@ -307,8 +351,9 @@ class BackupSet(UserDict):
     @included_files.setter
     def included_files(self, value):
         if isinstance(value, (list, tuple)):
-            self._included_files.clear()
-            self._included_files.extend(value)
+            with self.batch_edit():
+                self._included_files.clear()
+                self._included_files.extend(value)
         else:
             raise AttributeError("included files must be a list/tuple.")
 
@@ -323,8 +368,9 @@ class BackupSet(UserDict):
     @excluded_files.setter
     def excluded_files(self, value):
         if isinstance(value, (list, tuple)):
-            self._excluded_files.clear()
-            self._excluded_files.extend(value)
+            with self.batch_edit():
+                self._excluded_files.clear()
+                self._excluded_files.extend(value)
         else:
             raise AttributeError("excluded files must be a list/tuple.")
 
@@ -340,8 +386,9 @@ class BackupSet(UserDict):
     @filename_exclusions.setter
     def filename_exclusions(self, value):
         if isinstance(value, (list, tuple)):
-            self._filename_exclusions.clear()
-            self._filename_exclusions.extend(value)
+            with self.batch_edit():
+                self._filename_exclusions.clear()
+                self._filename_exclusions.extend(value)
         else:
             raise AttributeError("filename exclusions must be a list/tuple.")
 
@@ -459,13 +506,15 @@ class TrackedFileSelectionList(UserList):
         self.backup_set = backup_set
         self.name = name
         self.orig = list(_list)
+        self._orig_set = set(self.orig)
         self.data = _list
         self._changes = changes_dict
 
     def register_change(self):
-        self.backup_set._build_file_selection()
-        self.backup_set._build_regex_exclusions()
-        if set(self.orig) != set(self.data):
+        self.backup_set._register_list_change(self)
+
+    def _update_change(self):
+        if self._orig_set != set(self.data):
             self._changes[self.name] = show_change(self.orig, self.data)
         elif self.name in self._changes:
             del self._changes[self.name]
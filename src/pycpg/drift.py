@@ -0,0 +1,157 @@
+from collections import namedtuple
+from threading import Lock
+
+from pycpg.exceptions import PycpgError
+from pycpg.services.util import run_concurrently
+
+DEVICE_SETTINGS = (
+    "warning_email_enabled",
+    "critical_email_enabled",
+    "warning_alert_days",
+    "critical_alert_days",
+    "backup_status_email_enabled",
+    "backup_status_email_frequency_days",
+)
+"""The alert settings compared for each device, by their
+:class:`~pycpg.clients.settings.device_settings.DeviceSettingsDefaults` property
+names."""
+
+BACKUP_SET_SETTINGS = (
+    "included_files",
+    "excluded_files",
+    "filename_exclusions",
+    "destinations",
+)
+"""The settings compared for each backup set, by their
+:class:`~pycpg.clients.settings.device_settings.BackupSet` property names."""
+
+DeviceDrift = namedtuple("DeviceDrift", ["guid", "org_id", "differences", "error"])
+"""The result of checking one device's settings. `differences` maps the name of each
+setting that does not match, such as ``warning_alert_days`` or
+``backup_sets[0].excluded_files``, to an ``(expected, actual)`` tuple, and is empty when
+the device matches. `error` is the exception raised while reading the device's or its
+org's settings, if one was."""
+
+
+class DriftDetector:
+    """Finds devices whose settings no longer match their org's device defaults or a
+    template.
+
+    Device settings are read concurrently and each device is reported as soon as it is
+    checked. When comparing against org defaults, each org's settings are read once and
+    shared by all of its devices, however many are checked at the same time.
+
+    The alert settings in :data:`DEVICE_SETTINGS` and, for each backup set by position,
+    the settings in :data:`BACKUP_SET_SETTINGS` are compared. File selections and
+    filename exclusions are compared without regard to order, and destinations by GUID
+    only.
+
+    Example::
+
+        detector = pycpg.drift.DriftDetector(sdk, max_workers=16)
+        guids = (d["guid"] for d in sdk.devices.query().filter(active=True).select("guid"))
+        for drift in detector.check(guids):
+            if drift.differences:
+                print(drift.guid, drift.differences)
+
+    Args:
+        sdk (:class:`pycpg.sdk.SDKClient`): The SDK client to read settings with.
+        template (:class:`~pycpg.clients.settings.device_settings.DeviceSettingsDefaults`, optional):
+            The settings every device should have, such as another device's
+            :class:`~pycpg.clients.settings.device_settings.DeviceSettings` or an org's
+            ``device_defaults``. Defaults to comparing each device with its own org's
+            device defaults.
+        max_workers (int, optional): The most device settings to read at the same time.
+            Defaults to `pycpg.settings.max_workers`.
+    """
+
+    def __init__(self, sdk, template=None, max_workers=None):
+        self._sdk = sdk
+        self._template = _normalize(template) if template is not None else None
+        self._max_workers = max_workers
+        self._org_defaults = {}
+        self._org_locks = {}
+        self._lock = Lock()
+
+    def check(self, guids):
+        """Reads the settings of each device and yields a :class:`DeviceDrift` for each
+        device as it is checked.
+
+        Args:
+            guids (iterable): The globally unique identifiers of the devices to check.
+
+        Returns:
+            generator
+        """
+        for guid, drift, error in run_concurrently(
+            self._check_device, guids, max_workers=self._max_workers
+        ):
+            yield drift if error is None else DeviceDrift(guid, None, {}, error)
+
+    def get_org_defaults(self, org_id):
+        """Returns the normalized device defaults of an org, reading the org's settings
+        the first time they are needed.
+
+        Args:
+            org_id (int): The identifier of the org.
+
+        Returns:
+            dict: Setting names mapped to their normalized values.
+        """
+        with self._lock:
+            if org_id in self._org_defaults:
+                return self._get_cached(org_id)
+            org_lock = self._org_locks.setdefault(org_id, Lock())
+        # Holding the org's lock while its settings are read makes other devices in the
+        # same org wait for them instead of reading them again.
+        with org_lock:
+            with self._lock:
+                if org_id in self._org_defaults:
+                    return self._get_cached(org_id)
+            try:
+                org_settings = self._sdk.orgs.get_settings(org_id)
+                if org_settings.device_defaults is None:
+                    raise PycpgError(f"Org {org_id} has no device defaults.")
+                defaults = _normalize(org_settings.device_defaults)
+            except Exception as err:
+                defaults = err
+            with self._lock:
+                self._org_defaults[org_id] = defaults
+                return self._get_cached(org_id)
+
+    def _get_cached(self, org_id):
+        defaults = self._org_defaults[org_id]
+        if isinstance(defaults, Exception):
+            raise defaults
+        return defaults
+
+    def _check_device(self, guid):
+        device_settings = self._sdk.devices.get_settings(guid)
+        org_id = device_settings.org_id
+        expected = self._template
+        if expected is None:
+            try:
+                expected = self.get_org_defaults(org_id)
+            except Exception as err:
+                return DeviceDrift(guid, org_id, {}, err)
+        differences = _compare(expected, _normalize(device_settings))
+        return DeviceDrift(guid, org_id, differences, None)
+
+
+def _normalize(settings):
+    values = {name: getattr(settings, name) for name in DEVICE_SETTINGS}
+    for index, backup_set in enumerate(settings.backup_sets):
+        for name in BACKUP_SET_SETTINGS:
+            # Sorting a destinations dict keeps just the destination GUIDs.
+            values[f"backup_sets[{index}].{name}"] = sorted(getattr(backup_set, name))
+    return values
+
+
+def _compare(expected, actual):
+    differences = {}
+    for name in dict.fromkeys([*expected, *actual]):
+        expected_value = expected.get(name)
+        actual_value = actual.get(name)
+        if expected_value != actual_value:
+            differences[name] = (expected_value, actual_value)
+    return differences
@@ -138,6 +138,21 @@ class PycpgSessionInitializationError(PycpgError):
         super().__init__(exception, message)
 
 
+class PycpgBulkErrorThresholdError(PycpgError):
+    """An exception raised when a bulk operation stops early because too many of its items
+    failed."""
+
+    def __init__(self, error_count):
+        message = f"Bulk operation stopped after {error_count} items failed."
+        super().__init__(message, error_count)
+        self._error_count = error_count
+
+    @property
+    def error_count(self):
+        """The number of items that failed before the operation stopped."""
+        return self._error_count
+
+
 class PycpgBadRequestError(PycpgHTTPError):
     """A wrapper to represent an HTTP 400 error."""
 
@@ -0,0 +1,495 @@
+import hashlib
+import json
+import sqlite3
+from collections import namedtuple
+from threading import RLock
+from time import time
+
+from pycpg.util import parse_iso_datetime
+
+MirrorRefreshResult = namedtuple(
+    "MirrorRefreshResult", ["table", "fetched", "changed", "deleted", "unchanged_pages"]
+)
+"""The outcome of refreshing one table of an :class:`InventoryMirror`. `fetched` is the
+number of records read from the API, `changed` the number that were new or different,
+`deleted` the number removed because the API no longer returns them, and
+`unchanged_pages` the number of pages that were identical to the last refresh and so
+were not rewritten."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orgs (
+    org_uid TEXT PRIMARY KEY,
+    org_id INTEGER,
+    org_name TEXT,
+    parent_org_uid TEXT,
+    active INTEGER,
+    checksum TEXT,
+    page_num INTEGER,
+    refresh_id INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orgs_org_id ON orgs (org_id);
+CREATE INDEX IF NOT EXISTS orgs_parent_org_uid ON orgs (parent_org_uid);
+CREATE INDEX IF NOT EXISTS orgs_page_num ON orgs (page_num);
+
+CREATE TABLE IF NOT EXISTS users (
+    user_uid TEXT PRIMARY KEY,
+    user_id INTEGER,
+    username TEXT COLLATE NOCASE,
+    email TEXT COLLATE NOCASE,
+    org_uid TEXT,
+    active INTEGER,
+    checksum TEXT,
+    page_num INTEGER,
+    refresh_id INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_user_id ON users (user_id);
+CREATE INDEX IF NOT EXISTS users_username ON users (username);
+CREATE INDEX IF NOT EXISTS users_org_uid ON users (org_uid);
+CREATE INDEX IF NOT EXISTS users_page_num ON users (page_num);
+
+CREATE TABLE IF NOT EXISTS devices (
+    guid TEXT PRIMARY KEY,
+    computer_id INTEGER,
+    name TEXT,
+    os_name TEXT,
+    user_uid TEXT,
+    org_uid TEXT,
+    active INTEGER,
+    last_connected REAL,
+    last_backup REAL,
+    checksum TEXT,
+    page_num INTEGER,
+    refresh_id INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS devices_computer_id ON devices (computer_id);
+CREATE INDEX IF NOT EXISTS devices_user_uid ON devices (user_uid);
+CREATE INDEX IF NOT EXISTS devices_org_uid ON devices (org_uid);
+CREATE INDEX IF NOT EXISTS devices_last_backup ON devices (last_backup);
+CREATE INDEX IF NOT EXISTS devices_page_num ON devices (page_num);
+
+CREATE TABLE IF NOT EXISTS mirror_pages (
+    table_name TEXT,
+    page_num INTEGER,
+    checksum TEXT,
+    PRIMARY KEY (table_name, page_num)
+);
+
+CREATE TABLE IF NOT EXISTS mirror_state (
+    table_name TEXT PRIMARY KEY,
+    refresh_id INTEGER,
+    refreshed_at REAL
+);
+"""
+
+# The largest number of parameters used in one statement, below SQLite's lowest limit.
+_MAX_PARAMS = 900
+
+_ORG_COLUMNS = ("org_uid", "org_id", "org_name", "parent_org_uid", "active")
+_USER_COLUMNS = ("user_uid", "user_id", "username", "email", "org_uid", "active")
+_DEVICE_COLUMNS = (
+    "guid",
+    "computer_id",
+    "name",
+    "os_name",
+    "user_uid",
+    "org_uid",
+    "active",
+    "last_connected",
+    "last_backup",
+)
+
+
+def _get_org_values(org):
+    return (
+        org["orgUid"],
+        org.get("orgId"),
+        org.get("orgName"),
+        org.get("parentOrgUid"),
+        _to_flag(org.get("active")),
+    )
+
+
+def _get_user_values(user):
+    return (
+        user["userUid"],
+        user.get("userId"),
+        user.get("username"),
+        user.get("email"),
+        user.get("orgUid"),
+        _to_flag(user.get("active")),
+    )
+
+
+def _get_device_values(device):
+    return (
+        str(device["guid"]),
+        device.get("computerId"),
+        device.get("name"),
+        device.get("osName"),
+        device.get("userUid"),
+        device.get("orgUid"),
+        _to_flag(device.get("active")),
+        _to_timestamp(device.get("lastConnected")),
+        _get_last_backup(device),
+    )
+
+
+_Table = namedtuple("_Table", ["name", "service", "page_key", "columns", "get_values"])
+
+_TABLES = {
+    "orgs": _Table("orgs", "orgs", "orgs", _ORG_COLUMNS, _get_org_values),
+    "users": _Table("users", "users", "users", _USER_COLUMNS, _get_user_values),
+    "devices": _Table(
+        "devices", "devices", "computers", _DEVICE_COLUMNS, _get_device_values
+    ),
+}
+
+
+class InventoryMirror:
+    """Keeps a local SQLite copy of the orgs, users, and devices visible to an SDK client,
+    so that reports can query the inventory without paging through the API each time.
+
+    Call :meth:`refresh` to bring the mirror up to date. Each refresh still pages through
+    ``get_all()``, but pages whose contents are unchanged since the last refresh are not
+    rewritten, and within a changed page only new or modified records are written.
+    Records the API no longer returns are removed. The query methods return the records
+    as the API last returned them.
+
+    Args:
+        sdk (:class:`pycpg.sdk.SDKClient`): The SDK client to read the inventory with.
+        path (str, optional): The SQLite database file to keep the mirror in. Defaults to
+            ``":memory:"``, which keeps the mirror only as long as this object.
+        page_size (int, optional): The number of records to request per page. Defaults to
+            `pycpg.settings.items_per_page`.
+        include_backup_usage (bool, optional): Whether to request devices with their
+            backup usage, which :meth:`get_devices_not_backed_up` needs. Defaults to True.
+    """
+
+    def __init__(self, sdk, path=":memory:", page_size=None, include_backup_usage=True):
+        self._sdk = sdk
+        self._page_size = page_size
+        self._include_backup_usage = include_backup_usage
+        self._lock = RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._db:
+            self._db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Closes the database."""
+        with self._lock:
+            self._db.close()
+
+    def refresh(self, tables=("orgs", "users", "devices")):
+        """Updates the mirror with the current orgs, users, and devices.
+
+        Args:
+            tables (iterable, optional): The tables to refresh. Defaults to
+                ``("orgs", "users", "devices")``.
+
+        Returns:
+            list: A :class:`MirrorRefreshResult` for each table.
+        """
+        return [self._refresh_table(_TABLES[name]) for name in tables]
+
+    def get_refreshed_at(self, table):
+        """Returns when a table was last refreshed completely, as a POSIX timestamp, or
+        None if it never was.
+
+        Args:
+            table (str): ``"orgs"``, ``"users"``, or ``"devices"``.
+
+        Returns:
+            float
+        """
+        row = self._fetch_one(
+            "SELECT refreshed_at FROM mirror_state WHERE table_name = ?", (table,)
+        )
+        return row["refreshed_at"] if row else None
+
+    def get_device(self, guid):
+        """Returns the device with the given GUID, or None if it is not in the mirror.
+
+        Args:
+            guid (str): The GUID of the device.
+
+        Returns:
+            dict
+        """
+        row = self._fetch_one("SELECT data FROM devices WHERE guid = ?", (str(guid),))
+        return json.loads(row["data"]) if row else None
+
+    def get_user_by_username(self, username):
+        """Returns the user with the given username, ignoring case, or None if the user
+        is not in the mirror.
+
+        Args:
+            username (str): The username of the user.
+
+        Returns:
+            dict
+        """
+        row = self._fetch_one("SELECT data FROM users WHERE username = ?", (username,))
+        return json.loads(row["data"]) if row else None
+
+    def get_devices_by_org(self, org_uid, include_child_orgs=False):
+        """Returns the devices in an org.
+
+        Args:
+            org_uid (str): The UID of the org.
+            include_child_orgs (bool, optional): Whether to also return the devices in the
+                org's descendants. Defaults to False.
+
+        Returns:
+            list: The device dicts.
+        """
+        if include_child_orgs:
+            sql = """
+                WITH RECURSIVE org_tree(org_uid) AS (
+                    SELECT ?
+                    UNION
+                    SELECT orgs.org_uid FROM orgs
+                    JOIN org_tree ON orgs.parent_org_uid = org_tree.org_uid
+                )
+                SELECT data FROM devices
+                WHERE org_uid IN (SELECT org_uid FROM org_tree)
+                ORDER BY computer_id
+            """
+        else:
+            sql = "SELECT data FROM devices WHERE org_uid = ? ORDER BY computer_id"
+        return self._fetch_records(sql, (org_uid,))
+
+    def get_users_without_devices(self, active_devices_only=False):
+        """Returns the users that have no devices.
+
+        Args:
+            active_devices_only (bool, optional): Whether to also return users whose
+                devices are all deactivated. Defaults to False.
+
+        Returns:
+            list: The user dicts.
+        """
+        active_filter = "AND devices.active = 1" if active_devices_only else ""
+        sql = f"""
+            SELECT data FROM users
+            WHERE NOT EXISTS (
+                SELECT 1 FROM devices
+                WHERE devices.user_uid = users.user_uid {active_filter}
+            )
+            ORDER BY user_id
+        """
+        return self._fetch_records(sql)
+
+    def get_devices_not_backed_up(self, days, active=True, now=None):
+        """Returns the devices that have not completed a backup in the given number of
+        days, including devices that have never backed up, oldest backup first.
+
+        Args:
+            days (float): The number of days.
+            active (bool, optional): Limits the devices to active devices when True or
+                deactivated devices when False. Set to None to return both. Defaults to
+                True.
+            now (float, optional): The POSIX timestamp to count back from. Defaults to the
+                current time.
+
+        Returns:
+            list: The device dicts.
+        """
+        cutoff = (now if now is not None else time()) - days * 86400
+        sql = "SELECT data FROM devices WHERE (last_backup IS NULL OR last_backup < ?)"
+        params = [cutoff]
+        if active is not None:
+            sql += " AND active = ?"
+            params.append(_to_flag(active))
+        sql += " ORDER BY last_backup IS NOT NULL, last_backup, computer_id"
+        return self._fetch_records(sql, params)
+
+    def query(self, sql, params=()):
+        """Runs a SQL query against the mirror and returns the rows as dicts.
+
+        The ``orgs``, ``users``, and ``devices`` tables have a column for each commonly
+        filtered field, such as ``org_uid``, ``username``, and ``last_backup`` (a POSIX
+        timestamp), and the full record as JSON in the ``data`` column, which SQLite's
+        JSON functions can read.
+
+        Args:
+            sql (str): The query.
+            params (sequence or dict, optional): Values for the query's placeholders.
+
+        Returns:
+            list
+        """
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params)]
+
+    def _fetch_one(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchone()
+
+    def _fetch_records(self, sql, params=()):
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def _get_pages(self, table):
+        service = getattr(self._sdk, table.service)
+        if table.name == "devices":
+            return service.get_all(
+                include_backup_usage=self._include_backup_usage,
+                page_size=self._page_size,
+            )
+        return service.get_all(page_size=self._page_size)
+
+    def _refresh_table(self, table):
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT refresh_id FROM mirror_state WHERE table_name = ?",
+                (table.name,),
+            ).fetchone()
+            refresh_id = (row["refresh_id"] if row else 0) + 1
+            self._db.execute(
+                "INSERT INTO mirror_state (table_name, refresh_id) VALUES (?, ?) "
+                "ON CONFLICT (table_name) DO UPDATE SET refresh_id = excluded.refresh_id",
+                (table.name, refresh_id),
+            )
+
+        fetched = changed = unchanged_pages = page_count = 0
+        for page_count, page in enumerate(self._get_pages(table), start=1):
+            records = page[table.page_key]
+            fetched += len(records)
+            encoded = [json.dumps(record, sort_keys=True) for record in records]
+            keys = [table.get_values(record)[0] for record in records]
+            checksum = _get_checksum("\n".join(encoded))
+            with self._lock, self._db:
+                if self._claim_unchanged_page(
+                    table, page_count, checksum, keys, refresh_id
+                ):
+                    unchanged_pages += 1
+                    continue
+                changed += self._write_page(
+                    table, page_count, records, encoded, refresh_id
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO mirror_pages (table_name, page_num, "
+                    "checksum) VALUES (?, ?, ?)",
+                    (table.name, page_count, checksum),
+                )
+
+        with self._lock, self._db:
+            deleted = self._db.execute(
+                f"DELETE FROM {table.name} WHERE refresh_id != ?", (refresh_id,)
+            ).rowcount
+            self._db.execute(
+                "DELETE FROM mirror_pages WHERE table_name = ? AND page_num > ?",
+                (table.name, page_count),
+            )
+            self._db.execute(
+                "UPDATE mirror_state SET refreshed_at = ? WHERE table_name = ?",
+                (time(), table.name),
+            )
+        return MirrorRefreshResult(
+            table.name, fetched, changed, deleted, unchanged_pages
+        )
+
+    def _claim_unchanged_page(self, table, page_num, checksum, keys, refresh_id):
+        row = self._db.execute(
+            "SELECT checksum FROM mirror_pages WHERE table_name = ? AND page_num = ?",
+            (table.name, page_num),
+        ).fetchone()
+        if not row or row["checksum"] != checksum:
+            return False
+        # The page is the same as when it was last written, so its records are stored
+        # as they are now, unless an earlier page in this refresh has taken some over.
+        key = table.columns[0]
+        claimed = 0
+        for batch in _batch(keys):
+            placeholders = ", ".join("?" * len(batch))
+            claimed += self._db.execute(
+                f"UPDATE {table.name} SET refresh_id = ? "
+                f"WHERE page_num = ? AND {key} IN ({placeholders})",
+                (refresh_id, page_num, *batch),
+            ).rowcount
+        return claimed == len(keys)
+
+    def _write_page(self, table, page_num, records, encoded, refresh_id):
+        key = table.columns[0]
+        rows = [
+            (*table.get_values(record), _get_checksum(data), data)
+            for record, data in zip(records, encoded)
+        ]
+        stored = self._get_checksums(table, [row[0] for row in rows])
+        changed = [row for row in rows if stored.get(row[0]) != row[-2]]
+        unchanged = [row[0] for row in rows if stored.get(row[0]) == row[-2]]
+
+        columns = (*table.columns, "checksum", "data", "page_num", "refresh_id")
+        placeholders = ", ".join("?" * len(columns))
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO {table.name} ({', '.join(columns)}) "
+            f"VALUES ({placeholders})",
+            [(*row, page_num, refresh_id) for row in changed],
+        )
+        self._db.executemany(
+            f"UPDATE {table.name} SET page_num = ?, refresh_id = ? WHERE {key} = ?",
+            [(page_num, refresh_id, k) for k in unchanged],
+        )
+        return len(changed)
+
+    def _get_checksums(self, table, keys):
+        key = table.columns[0]
+        checksums = {}
+        for batch in _batch(keys):
+            placeholders = ", ".join("?" * len(batch))
+            rows = self._db.execute(
+                f"SELECT {key}, checksum FROM {table.name} "
+                f"WHERE {key} IN ({placeholders})",
+                batch,
+            )
+            checksums.update((row[0], row[1]) for row in rows)
+        return checksums
+
+
+def _batch(items):
+    for start in range(0, len(items), _MAX_PARAMS):
+        end = start + _MAX_PARAMS
+        yield items[start:end]
+
+
+def _get_checksum(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _to_flag(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return int(value.lower() == "true")
+    return int(bool(value))
+
+
+def _to_timestamp(value):
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        # Epoch milliseconds.
+        return value / 1000
+    parsed = parse_iso_datetime(value)
+    return parsed.timestamp() if parsed is not None else None
+
+
+def _get_last_backup(device):
+    # The most recent backup to any destination.
+    timestamps = [
+        _to_timestamp(usage.get("lastCompletedBackup") or usage.get("lastBackup"))
+        for usage in device.get("backupUsage") or []
+    ]
+    timestamps = [t for t in timestamps if t is not None]
+    return max(timestamps) if timestamps else None
@@ -0,0 +1,168 @@
+from pycpg.clients.settings import SettingProperty
+from pycpg.clients.settings.org_settings import OrgSettings
+from pycpg.exceptions import PycpgError
+from pycpg.services.util import run_concurrently
+
+INHERITED_SETTINGS = {
+    name: attr.inheritance_attr
+    for name, attr in vars(OrgSettings).items()
+    if isinstance(attr, SettingProperty) and attr.inheritance_attr is not None
+}
+"""The :class:`~pycpg.clients.settings.org_settings.OrgSettings` properties an org can
+inherit from its parent org, mapped to the property that says whether it does, such as
+``archive_hold_days`` to ``quota_settings_inherited``."""
+
+
+class OrgSettingsTree:
+    """Loads the settings of many orgs concurrently and works out the settings each org
+    inherits from the orgs above it.
+
+    Reading an org's settings takes two requests, so reading thousands of orgs one at a
+    time is slow. :meth:`load` lists the orgs once, to learn their parents, and then
+    reads their settings concurrently. An org that inherits a setting, such as its
+    quotas, takes its value from the nearest org above it that does not. These
+    effective values are worked out locally, and each one is remembered so that orgs
+    that share ancestors do not walk the same part of the tree again.
+
+    Example::
+
+        tree = pycpg.orgtree.OrgSettingsTree(sdk, max_workers=16).load()
+        for org_id in tree.org_ids:
+            print(org_id, tree.get_effective_value(org_id, "org_backup_quota"))
+
+    Args:
+        sdk (:class:`pycpg.sdk.SDKClient`): The SDK client to read orgs with.
+        max_workers (int, optional): The most orgs to read at the same time. Defaults to
+            `pycpg.settings.max_workers`.
+    """
+
+    def __init__(self, sdk, max_workers=None):
+        self._sdk = sdk
+        self._max_workers = max_workers
+        self._parents = {}
+        self._children = {}
+        self._settings = {}
+        self._effective = {}
+        self.errors = {}
+        """A dict of the orgs whose settings could not be read, mapped to the exception
+        raised when reading them."""
+
+    @property
+    def org_ids(self):
+        """The IDs of the orgs whose settings have been loaded."""
+        return list(self._settings)
+
+    def load(self, org_ids=None):
+        """Reads the settings of the given orgs, and of the orgs above them, or of every
+        org, concurrently. Orgs that have already been loaded are read again.
+
+        Args:
+            org_ids (iterable, optional): The IDs of the orgs to load. Defaults to every
+                org.
+
+        Returns:
+            :class:`OrgSettingsTree`: This tree.
+        """
+        self._load_hierarchy()
+        if org_ids is None:
+            org_ids = list(self._parents)
+        else:
+            org_ids = self._with_ancestors(org_ids)
+        for org_id, org_settings, error in run_concurrently(
+            self._sdk.orgs.get_settings, org_ids, max_workers=self._max_workers
+        ):
+            if error is not None:
+                self.errors[org_id] = error
+                self._settings.pop(org_id, None)
+            else:
+                self.errors.pop(org_id, None)
+                self._settings[org_id] = org_settings
+        self._effective.clear()
+        return self
+
+    def get_settings(self, org_id):
+        """Returns the settings of a loaded org, as read from the server.
+
+        Args:
+            org_id (int): The identifier of the org.
+
+        Returns:
+            :class:`pycpg.clients.settings.org_settings.OrgSettings`
+        """
+        try:
+            return self._settings[org_id]
+        except KeyError:
+            raise PycpgError(f"The settings of org {org_id} have not been loaded.")
+
+    def get_parent_id(self, org_id):
+        """Returns the ID of an org's parent org, or None for a top-level org."""
+        return self._parents.get(org_id)
+
+    def get_child_ids(self, org_id):
+        """Returns the IDs of the orgs directly below an org."""
+        return list(self._children.get(org_id, ()))
+
+    def get_effective_value(self, org_id, name):
+        """Returns the value of a setting that applies to an org, taking inherited
+        settings from the orgs above it.
+
+        Args:
+            org_id (int): The identifier of the org.
+            name (str): The name of an
+                :class:`~pycpg.clients.settings.org_settings.OrgSettings` property, such
+                as ``archive_hold_days``.
+
+        Returns:
+            The value of the setting.
+        """
+        if name not in INHERITED_SETTINGS:
+            return getattr(self.get_settings(org_id), name)
+        inheritance_attr = INHERITED_SETTINGS[name]
+        inheriting = []
+        current = org_id
+        while (current, name) not in self._effective:
+            org_settings = self.get_settings(current)
+            parent_id = self._parents.get(current)
+            if parent_id is None or not getattr(org_settings, inheritance_attr):
+                self._effective[(current, name)] = getattr(org_settings, name)
+                break
+            if current in inheriting:
+                raise PycpgError(f"Org {current} is its own ancestor.")
+            inheriting.append(current)
+            current = parent_id
+        value = self._effective[(current, name)]
+        for inheriting_id in inheriting:
+            self._effective[(inheriting_id, name)] = value
+        return value
+
+    def get_effective_settings(self, org_id):
+        """Returns the values of all the settings in :data:`INHERITED_SETTINGS` that
+        apply to an org.
+
+        Args:
+            org_id (int): The identifier of the org.
+
+        Returns:
+            dict: Setting names mapped to their effective values.
+        """
+        return {
+            name: self.get_effective_value(org_id, name) for name in INHERITED_SETTINGS
+        }
+
+    def _load_hierarchy(self):
+        orgs = [org for page in self._sdk.orgs.get_all() for org in page["orgs"]]
+        self._parents = {org["orgId"]: org.get("parentOrgId") for org in orgs}
+        self._children = {}
+        for org_id, parent_id in self._parents.items():
+            self._children.setdefault(parent_id, []).append(org_id)
+        # get_settings() looks up each org's GUID, and its lookup table only holds the
+        # first page of orgs unless it is filled from the full list.
+        self._sdk.orgs.load_org_id_map(orgs)
+
+    def _with_ancestors(self, org_ids):
+        with_ancestors = {}
+        for org_id in org_ids:
+            while org_id is not None and org_id not in with_ancestors:
+                with_ancestors[org_id] = None
+                org_id = self._parents.get(org_id)
+        return list(with_ancestors)
@@ -0,0 +1,221 @@
+import json
+import operator
+from datetime import datetime
+from datetime import timezone
+
+from pycpg import settings
+from pycpg.exceptions import PycpgError
+from pycpg.util import parse_iso_datetime
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda value, values: value in values,
+    "not in": lambda value, values: value not in values,
+}
+
+
+class ListingQuery:
+    """Lists records, such as devices or users, that match a set of filters.
+
+    Filters the API supports are sent with the request, so the server only returns
+    matching records. Any other filters are checked against each record after its page
+    is decoded. When fields are selected, each record is cut down to those fields before
+    it is returned, so the records a caller keeps only hold what it asked for.
+
+    Queries are immutable; :meth:`filter`, :meth:`where`, and :meth:`select` each return
+    a new query. Iterate over a query to get its records as dicts::
+
+        query = (
+            sdk.devices.query()
+            .filter(active=True)
+            .where("osName", "==", "win")
+            .where("lastConnected", "<", datetime(2024, 1, 1, tzinfo=timezone.utc))
+            .select("guid", "name", "lastConnected")
+        )
+        for device in query:
+            print(device["name"])
+
+    Use :meth:`pycpg.services.devices.DeviceService.query` or
+    :meth:`pycpg.services.users.UserService.query` to create a query.
+    """
+
+    _page_key = None
+    # The keyword arguments of the service's get_page() method that filter records.
+    _filters = ()
+    # Maps record fields to the get_page() arguments that filter on them for equality.
+    _pushdown = {}
+    # Maps record fields to get_page() arguments that must be set for the field to be
+    # returned.
+    _field_params = {}
+
+    def __init__(self, get_page, page_size=None):
+        self._get_page = get_page
+        self._page_size = page_size
+        self._params = {}
+        self._predicates = []
+        self._fields = None
+        # The get_page() arguments set by where(), mapped to their field and value.
+        self._pushed = {}
+
+    def __iter__(self):
+        page_size = self._page_size or settings.items_per_page
+        params = self._get_params()
+        page_num = 0
+        item_count = page_size
+        while item_count >= page_size:
+            page_num += 1
+            response = self._get_page(page_num, page_size=page_size, **params)
+            records = self._decode_page(response.raw_text)
+            item_count = len(records)
+            yield from self._process_records(records)
+
+    def filter(self, **params):
+        """Returns a query that also sends the given filters to the API. The filters are
+        the keyword arguments of the service's ``get_page()`` method, such as
+        ``active`` or ``org_uid``.
+
+        Returns:
+            :class:`ListingQuery`
+        """
+        for name in params:
+            if name not in self._filters:
+                raise PycpgError(
+                    f"'{name}' is not a filter the API supports. Use where() to filter "
+                    f"on other fields. Supported filters: {', '.join(self._filters)}."
+                )
+        query = self._copy()
+        for name in params:
+            if name in query._pushed:
+                # A where() clause sent as this argument still has to hold, so it is
+                # checked against each record instead of being overwritten.
+                field, value = query._pushed.pop(name)
+                query._predicates.append((field, operator.eq, value))
+        query._params.update(params)
+        return query
+
+    def where(self, field, op, value):
+        """Returns a query that only includes records whose `field` compares to `value`
+        with `op`. Equality filters on fields the API can filter by, such as ``orgUid``,
+        are sent with the request. Others are checked against each record after its page
+        is decoded; records without the field do not match, except with ``!=`` and
+        ``not in``.
+
+        Args:
+            field (str): The name of a top-level field of the record, such as ``osName``.
+            op (str): One of ``==``, ``!=``, ``<``, ``<=``, ``>``, ``>=``, ``in``, or
+                ``not in``.
+            value: The value to compare to. When it is a :class:`datetime.datetime`, the
+                record's field is parsed as an ISO 8601 date before comparing, and a
+                naive datetime is treated as UTC.
+
+        Returns:
+            :class:`ListingQuery`
+        """
+        if op not in _OPERATORS:
+            raise PycpgError(
+                f"Invalid operator '{op}'. Use one of: {', '.join(_OPERATORS)}."
+            )
+        query = self._copy()
+        param = self._pushdown.get(field)
+        if op == "==" and param and param not in query._params:
+            query._params[param] = value
+            query._pushed[param] = (field, value)
+        else:
+            if isinstance(value, datetime) and value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            query._predicates.append((field, _OPERATORS[op], value))
+        return query
+
+    def select(self, *fields):
+        """Returns a query whose records only include the given top-level fields.
+
+        Returns:
+            :class:`ListingQuery`
+        """
+        query = self._copy()
+        query._fields = fields
+        return query
+
+    def _copy(self):
+        query = self.__class__(self._get_page, page_size=self._page_size)
+        query._params = dict(self._params)
+        query._predicates = list(self._predicates)
+        query._fields = self._fields
+        query._pushed = dict(self._pushed)
+        return query
+
+    def _get_params(self):
+        params = dict(self._params)
+        needed = set(self._fields or ()) | {field for field, _, _ in self._predicates}
+        for field, (param, value) in self._field_params.items():
+            if field in needed:
+                params.setdefault(param, value)
+        return params
+
+    def _decode_page(self, text):
+        response = json.loads(text)
+        response = response.get("data", response)
+        return response.get(self._page_key) or []
+
+    def _process_records(self, records):
+        predicates = self._predicates
+        fields = self._fields
+        # Only the top-level records are cut down, after a plain json.loads(); a hook
+        # run on every decoded object would make decoding much slower.
+        for record in records:
+            if predicates and not all(
+                _matches(record.get(field), compare, value)
+                for field, compare, value in predicates
+            ):
+                continue
+            if fields is None:
+                yield record
+            else:
+                yield {field: record.get(field) for field in fields}
+
+
+class DeviceQuery(ListingQuery):
+    """A :class:`ListingQuery` over devices. Selecting or filtering on ``backupUsage``
+    requests devices with their backup usage."""
+
+    _page_key = "computers"
+    _filters = (
+        "active",
+        "blocked",
+        "org_uid",
+        "user_uid",
+        "destination_guid",
+        "include_backup_usage",
+        "include_counts",
+        "q",
+    )
+    _pushdown = {
+        "active": "active",
+        "blocked": "blocked",
+        "orgUid": "org_uid",
+        "userUid": "user_uid",
+    }
+    _field_params = {"backupUsage": ("include_backup_usage", True)}
+
+
+class UserQuery(ListingQuery):
+    """A :class:`ListingQuery` over users."""
+
+    _page_key = "users"
+    _filters = ("active", "email", "org_uid", "role_id", "q")
+    _pushdown = {"active": "active", "email": "email", "orgUid": "org_uid"}
+
+
+def _matches(actual, compare, expected):
+    if isinstance(expected, datetime):
+        actual = parse_iso_datetime(actual)
+    try:
+        return compare(actual, expected)
+    except TypeError:
+        # Ordering comparisons with a missing (None) field.
+        return False
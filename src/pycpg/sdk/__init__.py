@@ -1,4 +1,5 @@
 import warnings
+from threading import RLock
 
 from requests.auth import HTTPBasicAuth
 
@@ -8,7 +9,6 @@ from pycpg.services._auth import ApiClientAuth
 from pycpg.services._auth import BearerAuth
 from pycpg.services._auth import CustomJWTAuth
 from pycpg.services._connection import Connection
-from pycpg.usercontext import UserContext
 
 warnings.simplefilter("always", DeprecationWarning)
 warnings.simplefilter("always", UserWarning)
@@ -84,10 +84,13 @@ def from_jwt_provider(host_address, jwt_provider):
 
 class SDKClient:
     def __init__(self, main_connection, auth, auth_flag=None):
-        services, user_ctx = _init_services(main_connection, auth, auth_flag)
-        self._clients = _init_clients(services, main_connection)
-        self._user_ctx = user_ctx
+        # Services and clients are created, and their modules imported, the first time
+        # they are used, so that a script only pays for the parts of the SDK it needs.
+        self._main_connection = main_connection
+        self._auth = auth
         self._auth_flag = auth_flag
+        self._components = {}
+        self._components_lock = RLock()
 
     @classmethod
     def from_api_client(cls, host_address, client_id, secret):
@@ -104,9 +107,12 @@ class SDKClient:
             :class:`pycpg.sdk.SDKClient`
         """
 
+        from pycpg.services._diskcache import make_cache_key
+
         basic_auth = HTTPBasicAuth(client_id, secret)
         auth_connection = Connection.from_host_address(host_address, auth=basic_auth)
-        api_client_auth = ApiClientAuth(auth_connection)
+        cache_key = make_cache_key("api-client", host_address, client_id, secret)
+        api_client_auth = ApiClientAuth(auth_connection, cache_key=cache_key)
         main_connection = Connection.from_host_address(
             host_address, auth=api_client_auth
         )
@@ -130,11 +136,15 @@ class SDKClient:
         Returns:
             :class:`pycpg.sdk.SDKClient`
         """
+        from pycpg.services._diskcache import make_cache_key
+
         basic_auth = None
+        cache_key = None
         if username and password:
             basic_auth = HTTPBasicAuth(username, password)
+            cache_key = make_cache_key("local", host_address, username, password)
         auth_connection = Connection.from_host_address(host_address, auth=basic_auth)
-        bearer_auth = BearerAuth(auth_connection, totp)
+        bearer_auth = BearerAuth(auth_connection, totp, cache_key=cache_key)
         main_connection = Connection.from_host_address(host_address, auth=bearer_auth)
 
         return cls(main_connection, bearer_auth)
@@ -167,7 +177,7 @@ class SDKClient:
         Returns:
             :class:`pycpg.clients.loginconfig.LoginConfigurationClient.`
         """
-        return self._clients.loginconfig
+        return self._get_component("loginconfig")
 
     @property
     def serveradmin(self):
@@ -177,7 +187,7 @@ class SDKClient:
         Returns:
             :class:`pycpg.services.administration.AdministrationService`
         """
-        return self._clients.authority.administration
+        return self._get_component("administration")
 
     @property
     def archive(self):
@@ -187,7 +197,7 @@ class SDKClient:
         Returns:
             :class:`pycpg.clients.archive.ArchiveClient`
         """
-        return self._clients.archive
+        return self._get_component("archive")
 
     @property
     def users(self):
@@ -197,7 +207,7 @@ class SDKClient:
         Returns:
             :class:`pycpg.services.users.UserService`
         """
-        return self._clients.authority.users
+        return self._get_component("users")
 
     @property
     def devices(self):
@@ -207,7 +217,7 @@ class SDKClient:
         Returns:
             :class:`pycpg.services.devices.DeviceService`
         """
-        return self._clients.authority.devices
+        return self._get_component("devices")
 
     @property
     def orgs(self):
@@ -217,7 +227,7 @@ class SDKClient:
         Returns:
             :class:`pycpg.services.orgs.OrgService`
         """
-        return self._clients.authority.orgs
+        return self._get_component("orgs")
 
     @property
     def legalhold(self):
@@ -227,7 +237,7 @@ class SDKClient:
         Returns:
             :class:`pycpg.services.legalhold.LegalHoldService`
         """
-        return self._clients.authority.legalhold
+        return self._get_component("legalhold")
 
     @property
     def usercontext(self):
@@ -237,7 +247,7 @@ class SDKClient:
         Returns:
             :class:`pycpg.usercontext.UserContext`
         """
-        return self._user_ctx
+        return self._get_component("usercontext")
 
     @property
     def auditlogs(self):
@@ -246,76 +256,121 @@ class SDKClient:
         Returns:
             :class:`pycpg.clients.auditlogs.AuditLogsClient`
         """
-        return self._clients.auditlogs
+        return self._get_component("auditlogs")
 
+    def _get_component(self, name):
+        component = self._components.get(name)
+        if component is None:
+            with self._components_lock:
+                component = self._components.get(name)
+                if component is None:
+                    component = _COMPONENT_FACTORIES[name](self)
+                    self._components[name] = component
+        return component
 
-def _init_services(main_connection, main_auth, auth_flag=None):
-    # services are imported within function to prevent circular imports when a service
-    from pycpg.services import Services
-    from pycpg.services._keyvaluestore import KeyValueStoreService
+
+# Services and clients are imported within these functions to prevent circular imports
+# and to keep them out of the import graph of `pycpg.sdk`.
+
+
+def _create_administration_service(sdk):
     from pycpg.services.administration import AdministrationService
+
+    return AdministrationService(sdk._main_connection)
+
+
+def _create_archive_service(sdk):
     from pycpg.services.archive import ArchiveService
-    from pycpg.services.auditlogs import AuditLogsService
+
+    return ArchiveService(sdk._main_connection)
+
+
+def _create_device_service(sdk):
     from pycpg.services.devices import DeviceService
+
+    return DeviceService(sdk._main_connection)
+
+
+def _create_legal_hold_service(sdk):
     from pycpg.services.legalhold import LegalHoldService
+
+    return LegalHoldService(sdk._main_connection)
+
+
+def _create_org_service(sdk):
     from pycpg.services.orgs import OrgService
+
+    return OrgService(sdk._main_connection)
+
+
+def _create_user_service(sdk):
     from pycpg.services.users import UserService
 
+    return UserService(sdk._main_connection)
+
+
+def _create_user_context(sdk):
+    from pycpg.usercontext import UserContext
+
+    return UserContext(sdk._get_component("administration"))
+
+
+def _create_audit_logs_service(sdk):
+    from pycpg.services._keyvaluestore import KeyValueStoreService
+    from pycpg.services.auditlogs import AuditLogsService
+
     kv_prefix = "simple-key-value-store"
     audit_logs_key = "AUDIT-LOG_API-URL"
 
-    kv_connection = Connection.from_microservice_prefix(main_connection, kv_prefix)
+    transport = sdk._main_connection.transport
+    kv_connection = Connection.from_microservice_prefix(
+        sdk._main_connection, kv_prefix, transport=transport
+    )
     kv_service = KeyValueStoreService(kv_connection)
 
     audit_logs_conn = Connection.from_microservice_key(
-        kv_service, audit_logs_key, auth=main_auth
+        kv_service, audit_logs_key, auth=sdk._auth, transport=transport
     )
-    administration_svc = AdministrationService(main_connection)
-
-    user_ctx = UserContext(administration_svc)
-
-    services = Services(
-        administration=administration_svc,
-        archive=ArchiveService(main_connection),
-        devices=DeviceService(main_connection),
-        legalhold=LegalHoldService(main_connection),
-        orgs=OrgService(main_connection),
-        users=UserService(main_connection),
-        auditlogs=AuditLogsService(audit_logs_conn),
-    )
-
-    return services, user_ctx
+    return AuditLogsService(audit_logs_conn)
 
 
-def _init_clients(services, connection):
-    # clients are imported within function to prevent circular imports when a client
-    from pycpg.clients import Clients
+def _create_archive_client(sdk):
     from pycpg.clients._archiveaccess.accessorfactory import ArchiveAccessorFactory
     from pycpg.clients.archive import ArchiveClient
-    from pycpg.clients.auditlogs import AuditLogsClient
-    from pycpg.clients.authority import AuthorityClient
-    from pycpg.clients.loginconfig import LoginConfigurationClient
     from pycpg.services.storage._service_factory import StorageServiceFactory
 
-    authority = AuthorityClient(
-        administration=services.administration,
-        archive=services.archive,
-        devices=services.devices,
-        legalhold=services.legalhold,
-        orgs=services.orgs,
-        users=services.users,
+    archive_service = sdk._get_component("archive_service")
+    storage_service_factory = StorageServiceFactory(
+        sdk._main_connection, sdk._get_component("devices")
     )
-    storage_service_factory = StorageServiceFactory(connection, services.devices)
     archive_accessor_factory = ArchiveAccessorFactory(
-        services.archive, storage_service_factory
-    )
-    archive = ArchiveClient(archive_accessor_factory, services.archive)
-    auditlogs = AuditLogsClient(services.auditlogs)
-    loginconfig = LoginConfigurationClient(connection)
-    clients = Clients(
-        authority=authority,
-        archive=archive,
-        auditlogs=auditlogs,
-        loginconfig=loginconfig,
+        archive_service, storage_service_factory
     )
-    return clients
+    return ArchiveClient(archive_accessor_factory, archive_service)
+
+
+def _create_audit_logs_client(sdk):
+    from pycpg.clients.auditlogs import AuditLogsClient
+
+    return AuditLogsClient(sdk._get_component("auditlogs_service"))
+
+
+def _create_login_config_client(sdk):
+    from pycpg.clients.loginconfig import LoginConfigurationClient
+
+    return LoginConfigurationClient(sdk._main_connection)
+
+
+_COMPONENT_FACTORIES = {
+    "administration": _create_administration_service,
+    "archive_service": _create_archive_service,
+    "devices": _create_device_service,
+    "legalhold": _create_legal_hold_service,
+    "orgs": _create_org_service,
+    "users": _create_user_service,
+    "usercontext": _create_user_context,
+    "auditlogs_service": _create_audit_logs_service,
+    "archive": _create_archive_client,
+    "auditlogs": _create_audit_logs_client,
+    "loginconfig": _create_login_config_client,
+}
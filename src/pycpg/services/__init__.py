@@ -1,5 +1,3 @@
-from collections import namedtuple
-
 from pycpg.exceptions import PycpgActiveLegalHoldError
 
 
@@ -14,17 +12,3 @@ class BaseService:
 
     def __init__(self, connection):
         self._connection = connection
-
-
-Services = namedtuple(
-    "Services",
-    [
-        "administration",
-        "archive",
-        "devices",
-        "legalhold",
-        "orgs",
-        "users",
-        "auditlogs",
-    ],
-)
@@ -1,12 +1,34 @@
+import base64
+import json
 from threading import Lock
+from threading import Thread
+from time import monotonic
+from time import time
 
 from requests.auth import AuthBase
 
+from pycpg.exceptions import PycpgUnauthorizedError
+from pycpg.settings import debug
+
+# Credentials are renewed this many seconds before they expire, or halfway through
+# their lifetime if that is shorter.
+_REFRESH_MARGIN_SECONDS = 60
+# After a failed background refresh, wait this long before trying again.
+_REFRESH_RETRY_SECONDS = 5
+
 
 class CPGRenewableAuth(AuthBase):
-    def __init__(self):
+    def __init__(self, cache_key=None):
+        # Credentials are shared through the disk cache only when a key is given.
+        self._cache_key = cache_key
         self._auth_lock = Lock()
-        self._credentials = None
+        # The credentials and the monotonic times they expire and are due for renewal,
+        # kept in one tuple so that lock-free readers never see a mix of old and new.
+        self._token = (None, None, None)
+        self._refresh_lock = Lock()
+        self._refreshing = False
+        # Whether credentials are renewed in the background before they expire.
+        self._refresh_early = True
 
     def __call__(self, r):
         r.headers["Authorization"] = self.get_credentials()
@@ -15,24 +37,125 @@ class CPGRenewableAuth(AuthBase):
     def clear_credentials(self):
         # Do not clear credentials while they are being retrieved
         with self._auth_lock:
-            self._credentials = None
+            self._token = (None, None, None)
+            disk_cache = self._get_disk_cache()
+            if disk_cache:
+                disk_cache.pop(self._cache_key)
 
     def get_credentials(self):
-        if not self._credentials:
+        credentials, expires_at, refresh_at = self._token
+        if credentials and expires_at is not None:
+            now = monotonic()
+            if now >= expires_at:
+                credentials = None
+            elif refresh_at is not None and now >= refresh_at:
+                # Keep serving the current credentials while new ones are fetched.
+                self._start_background_refresh()
+        if not credentials:
             with self._auth_lock:
-                if not self._credentials:
-                    self._credentials = self._credentials or self._get_credentials()
-        return self._credentials
+                if not self._has_valid_credentials():
+                    self._renew_credentials()
+                credentials = self._token[0]
+        return credentials
 
     def _get_credentials(self):
         raise NotImplementedError()
 
+    def _get_credentials_lifetime(self, credentials):
+        """Returns the number of seconds the given credentials are valid for, or
+        ``None`` if it is not known."""
+        return _get_jwt_lifetime(credentials)
+
+    def _has_valid_credentials(self):
+        credentials, expires_at, _ = self._token
+        if not credentials:
+            return False
+        return expires_at is None or monotonic() < expires_at
+
+    def _renew_credentials(self):
+        # Must be called while holding self._auth_lock.
+        credentials, lifetime = self._load_cached_credentials()
+        if credentials is None:
+            credentials = self._get_credentials()
+            lifetime = self._get_credentials_lifetime(credentials)
+            self._store_cached_credentials(credentials, lifetime)
+        if lifetime is None or lifetime <= 0:
+            self._token = (credentials, None, None)
+        else:
+            now = monotonic()
+            refresh_at = None
+            if self._refresh_early:
+                refresh_at = now + max(lifetime - _REFRESH_MARGIN_SECONDS, lifetime / 2)
+            self._token = (credentials, now + lifetime, refresh_at)
+
+    def _get_disk_cache(self):
+        if not self._cache_key:
+            return None
+        from pycpg.services._diskcache import get_disk_cache
+
+        return get_disk_cache()
+
+    def _load_cached_credentials(self):
+        disk_cache = self._get_disk_cache()
+        entry = disk_cache.get(self._cache_key) if disk_cache else None
+        if not isinstance(entry, dict):
+            return None, None
+        try:
+            lifetime = float(entry["expires_at"]) - time()
+            credentials = entry["credentials"]
+        except (KeyError, TypeError, ValueError):
+            return None, None
+        # Credentials that are already due for renewal are not reused.
+        if lifetime <= _REFRESH_MARGIN_SECONDS or not credentials:
+            return None, None
+        return credentials, lifetime
+
+    def _store_cached_credentials(self, credentials, lifetime):
+        disk_cache = self._get_disk_cache()
+        if not disk_cache or not lifetime or lifetime <= _REFRESH_MARGIN_SECONDS:
+            return
+        entry = {"credentials": credentials, "expires_at": time() + lifetime}
+        disk_cache.set(self._cache_key, entry, lifetime)
+
+    def _start_background_refresh(self):
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        Thread(target=self._refresh_in_background, daemon=True).start()
+
+    def _refresh_in_background(self):
+        try:
+            with self._auth_lock:
+                refresh_at = self._token[2]
+                if refresh_at is not None and monotonic() < refresh_at:
+                    # Credentials were renewed while this thread was starting.
+                    return
+                try:
+                    self._renew_credentials()
+                except Exception as ex:
+                    debug.logger.info(f"Failed to refresh credentials: {ex}")
+                    credentials, expires_at, refresh_at = self._token
+                    if isinstance(ex, PycpgUnauthorizedError):
+                        # Retrying a rejected login, such as with a one-time code
+                        # that was already used, could lock the account. The
+                        # credentials are renewed once they expire instead.
+                        self._token = (credentials, expires_at, None)
+                    elif refresh_at is not None:
+                        retry_at = monotonic() + _REFRESH_RETRY_SECONDS
+                        self._token = (credentials, expires_at, retry_at)
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
 
 class BearerAuth(CPGRenewableAuth):
-    def __init__(self, auth_connection, totp=None):
-        super().__init__()
+    def __init__(self, auth_connection, totp=None, cache_key=None):
+        super().__init__(cache_key=cache_key)
         self._auth_connection = auth_connection
         self._totp = totp if callable(totp) else lambda: totp
+        # A fixed one-time code cannot be sent again, so renewing early would only fail.
+        self._refresh_early = callable(totp) or not totp
 
     def _get_credentials(self):
         uri = "/api/v3/auth/jwt"
@@ -44,17 +167,27 @@ class BearerAuth(CPGRenewableAuth):
 
 
 class ApiClientAuth(CPGRenewableAuth):
-    def __init__(self, auth_connnection):
-        super().__init__()
+    def __init__(self, auth_connnection, cache_key=None):
+        super().__init__(cache_key=cache_key)
         self._auth_connection = auth_connnection
+        self._expires_in = None
 
     def _get_credentials(self):
         uri = "/api/v3/oauth/token"
         params = {"grant_type": "client_credentials"}
         headers = {"Content-Type": "application/json"}
         response = self._auth_connection.post(uri, params=params, headers=headers)
+        try:
+            self._expires_in = float(response["expires_in"])
+        except (KeyError, TypeError, ValueError):
+            self._expires_in = None
         return f"Bearer {response['access_token']}"
 
+    def _get_credentials_lifetime(self, credentials):
+        if self._expires_in is not None:
+            return self._expires_in
+        return super()._get_credentials_lifetime(credentials)
+
 
 class CustomJWTAuth(CPGRenewableAuth):
     def __init__(self, jwt_provider):
@@ -63,3 +196,18 @@ class CustomJWTAuth(CPGRenewableAuth):
 
     def _get_credentials(self):
         return f"Bearer {self._jwt_provider()}"
+
+
+def _get_jwt_lifetime(credentials):
+    """Returns the seconds until the ``exp`` claim of a bearer JWT, or ``None`` if the
+    credentials are not a JWT with an expiry. The signature is not verified."""
+    token = credentials.split(" ", 1)[-1] if credentials else ""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims["exp"]) - time()
+    except (KeyError, TypeError, ValueError):
+        return None
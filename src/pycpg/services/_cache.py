@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A thread-safe, size-bounded LRU mapping whose entries expire after a time-to-live.
+
+    Args:
+        maxsize (int): The maximum number of entries to hold. The least recently used
+            entry is evicted when the cache is full.
+        ttl (int or float): The number of seconds an entry stays valid after it is set.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (value, monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        # Expired entries are dropped so that they are not counted.
+        with self._lock:
+            now = monotonic()
+            expired = [
+                k for k, (_, expires_at) in self._entries.items() if expires_at <= now
+            ]
+            for key in expired:
+                del self._entries[key]
+            return len(self._entries)
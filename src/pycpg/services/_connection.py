@@ -28,6 +28,43 @@ ROOT_SESSION.headers = {
     "Connection": "keep-alive",
 }
 
+# The transports, the in-flight GET registry, and the modules that define them are only
+# created and imported when first used, so that importing pycpg stays fast.
+_root_transport = None
+_http2_transport = None
+_in_flight_gets = None
+_lazy_init_lock = Lock()
+
+
+def _get_default_transport():
+    global _root_transport, _http2_transport
+    if not settings.use_http2:
+        if _root_transport is None:
+            with _lazy_init_lock:
+                if _root_transport is None:
+                    from pycpg.services._transport import RequestsTransport
+
+                    _root_transport = RequestsTransport(ROOT_SESSION)
+        return _root_transport
+    if _http2_transport is None:
+        with _lazy_init_lock:
+            if _http2_transport is None:
+                from pycpg.services._transport import HTTP2Transport
+
+                _http2_transport = HTTP2Transport()
+    return _http2_transport
+
+
+def _get_in_flight_gets():
+    global _in_flight_gets
+    if _in_flight_gets is None:
+        with _lazy_init_lock:
+            if _in_flight_gets is None:
+                from pycpg.services._singleflight import SingleFlight
+
+                _in_flight_gets = SingleFlight()
+    return _in_flight_gets
+
 
 class HostResolver:
     def get_host_address(self):
@@ -48,6 +85,12 @@ class MicroservicePrefixHostResolver(HostResolver):
         self._prefix = prefix
 
     def get_host_address(self):
+        return _resolve_with_disk_cache(
+            lambda: ("prefix", self._connection.host_address, self._prefix),
+            self._resolve_host_address,
+        )
+
+    def _resolve_host_address(self):
         sts_url = self._get_sts_base_url()
         return sts_url.replace("sts", self._prefix, 1)
 
@@ -70,7 +113,25 @@ class MicroserviceKeyHostResolver(HostResolver):
         self._key = key
 
     def get_host_address(self):
-        return self._kv_service.get_stored_value(self._key).text
+        return _resolve_with_disk_cache(
+            lambda: ("key", self._kv_service._connection.host_address, self._key),
+            lambda: self._kv_service.get_stored_value(self._key).text,
+        )
+
+
+def _resolve_with_disk_cache(get_key_parts, resolve):
+    from pycpg.services._diskcache import get_disk_cache
+    from pycpg.services._diskcache import make_cache_key
+
+    disk_cache = get_disk_cache()
+    if disk_cache is None:
+        return resolve()
+    key = make_cache_key("host", *get_key_parts())
+    host_address = disk_cache.get(key)
+    if not host_address:
+        host_address = resolve()
+        disk_cache.set(key, host_address, settings.disk_cache_host_ttl)
+    return host_address
 
 
 class ConnectedServerHostResolver(HostResolver):
@@ -92,41 +153,63 @@ class ConnectedServerHostResolver(HostResolver):
 
 
 class Connection:
-    def __init__(self, host_resolver, auth=None, session=None):
+    def __init__(self, host_resolver, auth=None, session=None, transport=None):
         self._host_resolver = host_resolver
         self._session = session or ROOT_SESSION
-        self._headers = self._session.headers.copy()
+        if transport is None:
+            if session:
+                from pycpg.services._transport import RequestsTransport
+
+                transport = RequestsTransport(session)
+            else:
+                transport = _get_default_transport()
+        self._transport = transport
+        self._headers = transport.headers.copy()
         self._auth = auth
         self._resolve_lock = Lock()
         self._host_address = None
+        self._host_origin = None
+        self._base_headers = None
 
     @classmethod
-    def from_host_address(cls, host_address, auth=None, session=None):
+    def from_host_address(cls, host_address, auth=None, session=None, transport=None):
         host_resolver = KnownUrlHostResolver(host_address)
-        return cls(host_resolver, auth=auth, session=session)
+        return cls(host_resolver, auth=auth, session=session, transport=transport)
 
     @classmethod
-    def from_microservice_key(cls, kv_service, key, auth=None, session=None):
+    def from_microservice_key(
+        cls, kv_service, key, auth=None, session=None, transport=None
+    ):
         host_resolver = MicroserviceKeyHostResolver(kv_service, key)
-        return cls(host_resolver, auth=auth, session=session)
+        return cls(host_resolver, auth=auth, session=session, transport=transport)
 
     @classmethod
-    def from_microservice_prefix(cls, connection, prefix, auth=None, session=None):
+    def from_microservice_prefix(
+        cls, connection, prefix, auth=None, session=None, transport=None
+    ):
         host_resolver = MicroservicePrefixHostResolver(connection, prefix)
-        return cls(host_resolver, auth=auth, session=session)
+        return cls(host_resolver, auth=auth, session=session, transport=transport)
 
     @classmethod
     def from_device_connection(cls, connection, device_guid):
         host_resolver = ConnectedServerHostResolver(connection, device_guid)
-        return cls(host_resolver, auth=connection._auth)
+        return cls(
+            host_resolver, auth=connection._auth, transport=connection._transport
+        )
 
     @property
     def host_address(self):
         return self._get_host_address()
 
-    def clone(self, host_address):
+    @property
+    def transport(self):
+        return self._transport
+
+    def clone(self, host_address, transport=None):
         host_resolver = KnownUrlHostResolver(host_address)
-        return Connection(host_resolver, auth=self._auth)
+        return Connection(
+            host_resolver, auth=self._auth, transport=transport or self._transport
+        )
 
     def get(self, url, **kwargs):
         return self.request("GET", url, **kwargs)
@@ -165,8 +248,72 @@ class Connection:
         timeout=180,
         cert=None,
         proxies=None,
+    ):
+        if (
+            method == "GET"
+            and settings.coalesce_get_requests
+            and not (data or json or headers or cookies or files or hooks or stream)
+        ):
+            key = (
+                self._transport,
+                self._build_url(url),
+                json_lib.dumps(params, sort_keys=True, default=str),
+                auth or self._auth,
+            )
+            response, shared = _get_in_flight_gets().run(
+                key,
+                lambda: self._send(
+                    method,
+                    url,
+                    params=params,
+                    auth=auth,
+                    timeout=timeout,
+                    cert=cert,
+                    proxies=proxies,
+                ),
+            )
+            # Callers may change the data they are given, so each one gets its own
+            # PycpgResponse around the shared HTTP response.
+            return PycpgResponse(response._response) if shared else response
+        return self._send(
+            method,
+            url,
+            params=params,
+            data=data,
+            json=json,
+            headers=headers,
+            cookies=cookies,
+            files=files,
+            auth=auth,
+            hooks=hooks,
+            stream=stream,
+            timeout=timeout,
+            cert=cert,
+            proxies=proxies,
+        )
+
+    def _send(
+        self,
+        method,
+        url,
+        params=None,
+        data=None,
+        json=None,
+        headers=None,
+        cookies=None,
+        files=None,
+        auth=None,
+        hooks=None,
+        stream=False,
+        timeout=180,
+        cert=None,
+        proxies=None,
     ):
         response = None
+        cache = settings.response_cache
+        revalidation_cache = None
+        if method == "GET" and not stream:
+            revalidation_cache = settings.revalidation_cache
         for _ in range(2):
             request = self._prepare_request(
                 method,
@@ -180,7 +327,15 @@ class Connection:
                 auth=auth,
                 hooks=hooks,
             )
-            response = self._session.send(
+            if cache is not None and method == "GET" and not stream:
+                cached = cache.get(request)
+                if cached is not None:
+                    debug.logger.info("Response served from cache")
+                    return PycpgResponse(cached)
+            kept = None
+            if revalidation_cache is not None:
+                kept = revalidation_cache.add_validators(request)
+            response = self._transport.send(
                 request,
                 stream=stream,
                 timeout=timeout,
@@ -188,6 +343,8 @@ class Connection:
                 cert=cert,
                 proxies=proxies or settings.proxies,
             )
+            if response is not None and revalidation_cache is not None:
+                response = revalidation_cache.update(request, response, kept)
 
             if response is not None:
                 debug.logger.info(f"Response status: {response.status_code}")
@@ -199,6 +356,8 @@ class Connection:
                     debug.logger.debug("Response data: <streamed>")
 
                 if 200 <= response.status_code <= 399:
+                    if cache is not None:
+                        _update_response_cache(cache, method, request, response, stream)
                     return PycpgResponse(response)
 
                 if response.status_code == 401:
@@ -223,17 +382,10 @@ class Connection:
         auth=None,
         hooks=None,
     ):
-        url = urljoin(self.host_address, url)
-        self._session.proxies = settings.proxies
-        self._session.verify = settings.verify_ssl_certs
-
-        headers = headers or {}
-        headers.update(self._headers)
+        url = self._build_url(url)
+        headers = self._build_headers(headers)
         if data and "Content-Type" not in headers:
-            headers.update({"Content-Type": "application/json"})
-        if "Accept" not in headers:
-            headers.update({"Accept": "application/json"})
-        headers = _create_user_headers(headers)
+            headers["Content-Type"] = "application/json"
 
         _print_request(method, url, params=params, data=data, json=json)
 
@@ -253,7 +405,32 @@ class Connection:
             hooks=hooks,
         )
 
-        return self._session.prepare_request(request)
+        return self._transport.prepare_request(request)
+
+    def _build_url(self, url):
+        host_address = self.host_address
+        # urljoin is only needed for relative, absolute, or dot-segment paths; most
+        # requests use a plain root-relative path that can be appended to the origin.
+        if url.startswith("/") and not url.startswith("//") and "/." not in url:
+            return self._host_origin + url
+        return urljoin(host_address, url)
+
+    def _build_headers(self, headers):
+        # Default and per-connection headers are merged once and only rebuilt when the
+        # User-Agent changes. Caller headers override the defaults but not the
+        # connection's own headers, such as Host.
+        user_agent = settings.get_user_agent_string()
+        base_headers = self._base_headers
+        if base_headers is None or base_headers["User-Agent"] != user_agent:
+            base_headers = {"User-Agent": user_agent, "Accept": "application/json"}
+            base_headers.update(self._headers)
+            self._base_headers = base_headers
+        if not headers:
+            return base_headers.copy()
+        merged = base_headers.copy()
+        merged.update(headers)
+        merged.update(self._headers)
+        return merged
 
     def _get_host_address(self):
         if not self._host_address:
@@ -268,14 +445,17 @@ class Connection:
             host = f"https://{host}"
         parsed_host = urlparse(host)
         self._headers["Host"] = parsed_host.netloc
+        self._host_origin = f"{parsed_host.scheme}://{parsed_host.netloc}"
+        self._base_headers = None
         self._host_address = host
 
 
-def _create_user_headers(headers):
-    user_headers = {"User-Agent": settings.get_user_agent_string()}
-    if headers:
-        user_headers.update(headers)
-    return user_headers
+def _update_response_cache(cache, method, request, response, stream):
+    if method == "GET":
+        if not stream:
+            cache.set(request, response)
+    elif method not in ("HEAD", "OPTIONS"):
+        cache.invalidate(urlparse(request.url).path)
 
 
 def _handle_error(method, url, response):
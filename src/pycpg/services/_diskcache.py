@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from time import time
+
+import pycpg.settings as settings
+from pycpg.settings import debug
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+
+class DiskCache:
+    """A small JSON key-value store in a file that processes run by the same user can
+    share. Entries expire after a time-to-live.
+
+    The cache file and its lock file are only readable and writable by their owner.
+    Writers hold an exclusive lock on the lock file while they read, modify, and
+    atomically replace the cache file, so readers never see a partial write. The cache
+    is best-effort: a file that cannot be read or written is treated as empty.
+
+    Args:
+        path (str): The path of the cache file. Its directory is created if needed.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(os.path.expanduser(path))
+
+    def get(self, key):
+        entry = self._read().get(key)
+        if not isinstance(entry, dict) or entry.get("expires_at", 0) <= time():
+            return None
+        return entry.get("value")
+
+    def set(self, key, value, ttl):
+        def _set(entries):
+            entries[key] = {"value": value, "expires_at": time() + ttl}
+
+        self._update(_set)
+
+    def pop(self, key):
+        self._update(lambda entries: entries.pop(key, None))
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                entries = json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _update(self, modify):
+        try:
+            with self._lock():
+                entries = self._read()
+                now = time()
+                entries = {
+                    key: entry
+                    for key, entry in entries.items()
+                    if isinstance(entry, dict) and entry.get("expires_at", 0) > now
+                }
+                modify(entries)
+                self._write(entries)
+        except OSError as ex:
+            debug.logger.info(f"Unable to update cache file {self.path}: {ex}")
+
+    def _write(self, entries):
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+                json.dump(entries, temp_file)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @contextmanager
+    def _lock(self):
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            _lock_file(fd)
+            try:
+                yield
+            finally:
+                _unlock_file(fd)
+        finally:
+            os.close(fd)
+
+
+def _lock_file(fd):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:  # pragma: no cover - Windows
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(fd):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:  # pragma: no cover - Windows
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def get_disk_cache():
+    """Returns a :class:`DiskCache` for ``settings.disk_cache_path``, or ``None`` if the
+    disk cache is disabled."""
+    path = settings.disk_cache_path
+    return DiskCache(path) if path else None
+
+
+def make_cache_key(*parts):
+    """Builds a cache key from the given parts. The parts are hashed so that secrets
+    used to identify an entry are never written to the cache file."""
+    joined = "\0".join(str(part) for part in parts)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
@@ -0,0 +1,42 @@
+from concurrent.futures import Future
+from threading import Lock
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time. Callers that ask for a key while a call
+    for it is running wait for that call and get its result, or its exception, instead of
+    making their own.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = Lock()
+
+    def run(self, key, func):
+        """Calls `func`, or waits for a running call with the same key.
+
+        Args:
+            key (hashable): Identifies calls that can share a result.
+            func (callable): Called with no arguments when no call for `key` is running.
+
+        Returns:
+            tuple: The result and whether it was shared from another caller's call.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            result = func()
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,234 @@
+import os
+import ssl
+from threading import Lock
+
+from requests.exceptions import ConnectionError
+from requests.exceptions import Timeout
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+from requests.utils import get_encoding_from_headers
+
+from pycpg.exceptions import PycpgError
+
+# Headers that only apply to HTTP/1.1 connections and are not allowed in HTTP/2.
+_HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "upgrade"}
+
+
+class Transport:
+    """Sends the requests a :class:`~pycpg.services._connection.Connection` prepares.
+
+    Transports receive a :class:`requests.PreparedRequest` and return a
+    :class:`requests.Response`, so the rest of the SDK does not depend on how the
+    request is actually sent.
+    """
+
+    headers = {}
+
+    def prepare_request(self, request):
+        return request.prepare()
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        raise NotImplementedError()
+
+    def stream(self, request, timeout=None, verify=True, cert=None, proxies=None):
+        """Sends a request without reading the response body, which can then be read
+        with :meth:`requests.Response.iter_content`."""
+        return self.send(
+            request,
+            stream=True,
+            timeout=timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """Sends requests with a :class:`requests.Session`. A connection is opened for
+    each request in flight to a host, up to the session adapter's pool size."""
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def prepare_request(self, request):
+        return self.session.prepare_request(request)
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        return self.session.send(
+            request,
+            stream=stream,
+            timeout=timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class HTTP2Transport(Transport):
+    """Sends requests with `httpx <https://www.python-httpx.org/>`_ over HTTP/2, so
+    concurrent requests to a host are multiplexed on a single connection. Requires the
+    ``http2`` extra: ``pip install pycpg[http2]``.
+    """
+
+    headers = {"Accept-Encoding": "gzip, deflate"}
+
+    def __init__(self):
+        try:
+            import httpx
+        except ImportError:
+            raise PycpgError(
+                "HTTP/2 support requires httpx. Install it with `pip install pycpg[http2]`."
+            )
+        self._httpx = httpx
+        self._clients = {}
+        self._lock = Lock()
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        client = self._get_client(verify, cert, proxies)
+        headers = [
+            (name, value)
+            for name, value in request.headers.items()
+            if name.lower() not in _HOP_BY_HOP_HEADERS
+        ]
+        body = request.body
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        httpx_request = client.build_request(
+            request.method,
+            request.url,
+            headers=headers,
+            content=body,
+            timeout=self._create_timeout(timeout),
+        )
+        try:
+            httpx_response = client.send(httpx_request, stream=stream)
+        except self._httpx.TimeoutException as ex:
+            raise Timeout(ex, request=request)
+        except self._httpx.TransportError as ex:
+            raise ConnectionError(ex, request=request)
+        return _create_response(request, httpx_response, stream)
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    def _get_client(self, verify, cert, proxies):
+        key = (verify, cert, tuple(sorted((proxies or {}).items())))
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._create_client(verify, cert, proxies)
+                    self._clients[key] = client
+        return client
+
+    def _create_client(self, verify, cert, proxies):
+        httpx = self._httpx
+        verify = _create_ssl_context(verify, cert)
+        mounts = {
+            f"{scheme}://": httpx.HTTPTransport(http2=True, verify=verify, proxy=url)
+            for scheme, url in (proxies or {}).items()
+            if scheme in ("http", "https") and url
+        }
+        return httpx.Client(
+            http2=True, verify=verify, mounts=mounts or None, follow_redirects=True
+        )
+
+    def _create_timeout(self, timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return self._httpx.Timeout(timeout)
+
+
+def _create_ssl_context(verify, cert):
+    # httpx only accepts a bool or an SSLContext, while settings.verify_ssl_certs may
+    # also be a path to a CA bundle, as requests allows.
+    if isinstance(verify, bool) and not cert:
+        return verify
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str) and os.path.isdir(verify):
+        context = ssl.create_default_context(capath=verify)
+    else:
+        cafile = verify if isinstance(verify, str) else DEFAULT_CA_BUNDLE_PATH
+        context = ssl.create_default_context(cafile=cafile)
+    if cert:
+        if isinstance(cert, tuple):
+            context.load_cert_chain(*cert)
+        else:
+            context.load_cert_chain(cert)
+    return context
+
+
+def _create_response(request, httpx_response, stream):
+    response = Response()
+    response.status_code = httpx_response.status_code
+    response.reason = httpx_response.reason_phrase
+    response.headers = CaseInsensitiveDict(httpx_response.headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = str(httpx_response.url)
+    response.request = request
+    if stream:
+        response.raw = _StreamedBody(httpx_response)
+    else:
+        response._content = httpx_response.read()
+        httpx_response.close()
+        response.elapsed = httpx_response.elapsed
+    return response
+
+
+class _StreamedBody:
+    """Exposes a streamed httpx response body through the parts of the urllib3
+    response interface that :class:`requests.Response` uses."""
+
+    def __init__(self, httpx_response):
+        self._response = httpx_response
+        self._chunks = None
+        self._buffer = b""
+
+    def stream(self, chunk_size, decode_content=True):
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        finally:
+            self._response.close()
+
+    def read(self, amt=None):
+        if self._chunks is None:
+            self._chunks = self._response.iter_bytes()
+        while amt is None or len(self._buffer) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if amt is None:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def close(self):
+        self._response.close()
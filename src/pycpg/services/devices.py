@@ -5,14 +5,20 @@ from pycpg import settings
 from pycpg.clients.settings.device_settings import DeviceSettings
 from pycpg.exceptions import PycpgBadRequestError
 from pycpg.exceptions import PycpgOrgNotFoundError
+from pycpg.query import DeviceQuery
 from pycpg.services import BaseService
 from pycpg.services import handle_active_legal_hold_error
 from pycpg.services.util import get_all_pages
+from pycpg.services.util import run_concurrently
 
 DeviceSettingsResponse = namedtuple(
     "DeviceSettingsResponse", ["error", "settings_response", "device_settings_response"]
 )
 
+DeviceSettingsUpdateResult = namedtuple(
+    "DeviceSettingsUpdateResult", ["guid", "changes", "error", "response"]
+)
+
 
 class DeviceService(BaseService):
     """A class to interact with CrashPlan device/computer APIs."""
@@ -134,6 +140,20 @@ class DeviceService(BaseService):
             **kwargs,
         )
 
+    def query(self, page_size=None):
+        """Creates a query that lists devices, sending the filters the API supports
+        with the request and checking the rest against each device after its page is
+        decoded. Select fields to cut each device down to the fields that are needed.
+
+        Args:
+            page_size (int, optional): The number of devices to request per page.
+                Defaults to `pycpg.settings.items_per_page`.
+
+        Returns:
+            :class:`pycpg.query.DeviceQuery`
+        """
+        return DeviceQuery(self.get_page, page_size=page_size)
+
     def get_by_id(self, device_id, include_backup_usage=None, **kwargs):
         """Gets device information by ID.
 
@@ -286,6 +306,49 @@ class DeviceService(BaseService):
             device_settings["settings"]["configDateMs"] = new_config_date_ms
         return self._connection.put(uri, json=device_settings)
 
+    def bulk_update_settings(self, guids, transform, dry_run=False, max_workers=None):
+        """Applies the same settings change to many devices. Each device's settings are
+        fetched, passed to `transform`, and written back concurrently. Devices for which
+        `transform` makes no changes are not written.
+
+        Args:
+            guids (iterable): The globally unique identifiers of the devices to update.
+            transform (callable): A function that accepts a
+                :class:`pycpg.clients.settings.device_settings.DeviceSettings` and modifies it
+                in place, e.g.
+                `lambda s: s.backup_sets[0].excluded_files.append("C:/Temp/")`.
+            dry_run (bool, optional): When True, reports the changes `transform` would make
+                to each device without writing them. Defaults to False.
+            max_workers (int, optional): The maximum number of devices to update at the same
+                time. Defaults to `pycpg.settings.max_workers`.
+
+        Returns:
+            list: A :class:`DeviceSettingsUpdateResult` namedtuple for each device, in the
+            order of `guids`, containing the device `guid`, the `changes` made by
+            `transform`, the `response` of the update (None when nothing was written), and
+            any `error` raised for that device.
+        """
+
+        def update(guid):
+            device_settings = self.get_settings(guid)
+            transform(device_settings)
+            changes = dict(device_settings.changes)
+            response = None
+            if changes and not dry_run:
+                response = self.update_settings(device_settings)
+            return DeviceSettingsUpdateResult(guid, changes, None, response)
+
+        guids = list(guids)
+        results = [None] * len(guids)
+        updates = run_concurrently(
+            lambda item: update(item[1]), enumerate(guids), max_workers
+        )
+        for (index, guid), result, error in updates:
+            if error is not None:
+                result = DeviceSettingsUpdateResult(guid, {}, error, None)
+            results[index] = result
+        return results
+
     def upgrade(self, guid):
         """Instructs a device to upgrade to the latest available version.
 
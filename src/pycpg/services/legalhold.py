@@ -1,3 +1,5 @@
+from collections import namedtuple
+
 from pycpg import settings
 from pycpg.exceptions import PycpgBadRequestError
 from pycpg.exceptions import PycpgError
@@ -9,8 +11,18 @@ from pycpg.exceptions import PycpgLegalHoldNotFoundOrPermissionDeniedError
 from pycpg.exceptions import PycpgUserAlreadyAddedError
 from pycpg.services import BaseService
 from pycpg.services.util import get_all_pages
+from pycpg.services.util import run_concurrently
 from pycpg.util import parse_timestamp_to_milliseconds_precision
 
+MatterCustodianSyncReport = namedtuple(
+    "MatterCustodianSyncReport", ["added", "removed", "unchanged", "errors"]
+)
+
+
+def _get_membership_user_uid(membership):
+    user = membership.get("user")
+    return user["userUid"] if isinstance(user, dict) else membership["userUid"]
+
 
 def _active_state_map(active):
     _map = {True: "ACTIVE", False: "INACTIVE", None: "ALL"}
@@ -399,6 +411,66 @@ class LegalHoldService(BaseService):
                 err, legal_hold_membership_uid, self._membership_string
             )
 
+    def sync_matter_custodians(
+        self, legal_hold_matter_uid, user_uids, dry_run=False, max_workers=None
+    ):
+        """Makes the given users the exact set of active Custodians of a Legal Hold Matter.
+        Users that are not yet Custodians are added and Custodians that are not in
+        `user_uids` are removed, concurrently. Users that are already Custodians are left
+        alone.
+
+        Args:
+            legal_hold_matter_uid (str): The identifier of the Legal Hold Matter.
+            user_uids (iterable): The identifiers of the users who should be Custodians.
+            dry_run (bool, optional): When True, reports the changes that would be made
+                without making them. Defaults to False.
+            max_workers (int, optional): The maximum number of add/remove requests to send
+                at the same time. Defaults to `pycpg.settings.max_workers`.
+
+        Returns:
+            :class:`MatterCustodianSyncReport`: A namedtuple containing the lists of user
+            UIDs that were `added` and `removed`, the number of `unchanged` Custodians, and a
+            dict of `errors` mapping user UIDs to the exception raised for them.
+        """
+        current = {}
+        for page in self.get_all_matter_custodians(
+            legal_hold_matter_uid=legal_hold_matter_uid
+        ):
+            for membership in page:
+                current[_get_membership_user_uid(membership)] = membership[
+                    "legalHoldMembershipUid"
+                ]
+
+        desired = set(user_uids)
+        to_add = [uid for uid in desired if uid not in current]
+        to_remove = [uid for uid in current if uid not in desired]
+        unchanged = len(current) - len(to_remove)
+        if dry_run:
+            return MatterCustodianSyncReport(to_add, to_remove, unchanged, {})
+
+        def apply(change):
+            action, user_uid = change
+            if action == "remove":
+                return self.remove_from_matter(current[user_uid])
+            try:
+                return self.add_to_matter(user_uid, legal_hold_matter_uid)
+            except PycpgUserAlreadyAddedError:
+                return None
+
+        changes = [("add", uid) for uid in to_add]
+        changes.extend(("remove", uid) for uid in to_remove)
+        report = MatterCustodianSyncReport([], [], unchanged, {})
+        for (action, user_uid), _, error in run_concurrently(
+            apply, changes, max_workers=max_workers
+        ):
+            if error is not None:
+                report.errors[user_uid] = error
+            elif action == "add":
+                report.added.append(user_uid)
+            else:
+                report.removed.append(user_uid)
+        return report
+
     def deactivate_matter(self, legal_hold_matter_uid):
         """Deactivates and closes a Legal Hold Matter.
 
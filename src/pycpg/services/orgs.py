@@ -1,9 +1,13 @@
 from collections import namedtuple
+from functools import partial
+from time import sleep
 
 from pycpg import settings
+from pycpg.bulk import run_bulk
 from pycpg.clients.settings.org_settings import OrgSettings
 from pycpg.exceptions import PycpgError
 from pycpg.exceptions import PycpgInternalServerError
+from pycpg.exceptions import PycpgTooManyRequestsError
 from pycpg.services import BaseService
 from pycpg.services.util import get_all_pages
 
@@ -11,6 +15,15 @@ OrgSettingsResponse = namedtuple(
     "OrgSettingsResponse", ["error", "org_response", "org_settings_response"]
 )
 
+OrgSettingsBulkUpdateReport = namedtuple(
+    "OrgSettingsBulkUpdateReport", ["changed", "unchanged", "errors", "changes"]
+)
+
+# Errors that a later attempt of the same request may not get.
+_RETRYABLE_ERRORS = (PycpgInternalServerError, PycpgTooManyRequestsError)
+# Seconds to wait before retrying, multiplied by the attempt number.
+_RETRY_DELAY = 1
+
 
 class OrgService(BaseService):
     """A service for interacting with CrashPlan organization APIs.
@@ -33,6 +46,21 @@ class OrgService(BaseService):
                 self._org_id_map[org["orgId"]] = org["orgGuid"]
         return self._org_id_map
 
+    def load_org_id_map(self, orgs=None):
+        """Fills the map of org IDs to GUIDs from the full list of orgs. The map is
+        otherwise filled from the first page of orgs only, so methods that take an org ID,
+        such as :meth:`get_settings`, fail for orgs on later pages until this is called.
+
+        Args:
+            orgs (list, optional): The org dicts to fill the map from, such as those
+                already read from :meth:`get_all`. Defaults to every org.
+        """
+        if orgs is None:
+            orgs = [org for page in self.get_all() for org in page["orgs"]]
+        for org in orgs:
+            if org.get("orgGuid"):
+                self._org_id_map[org["orgId"]] = org["orgGuid"]
+
     def create_org(self, org_name, org_ext_ref=None, notes=None, parent_org_uid=None):
         """Creates a new organization.
 
@@ -264,6 +292,97 @@ class OrgService(BaseService):
             org_settings_response=org_settings_response,
         )
 
+    def bulk_update_settings(
+        self,
+        org_ids,
+        transform,
+        dry_run=False,
+        max_workers=None,
+        retries=2,
+        progress=None,
+    ):
+        """Applies the same settings change to many orgs. Each org's settings are
+        fetched, passed to `transform`, and written back concurrently. Orgs for which
+        `transform` makes no changes are not written.
+
+        The two requests that write an org's settings, one for its t-settings packets and
+        one for the org itself, are sent one after the other by the org's worker. When
+        either fails with a server error or is throttled, only the failed request is
+        retried.
+
+        Args:
+            org_ids (iterable): The identifiers of the orgs to update.
+            transform (callable): A function that accepts a
+                :class:`pycpg.clients.settings.org_settings.OrgSettings` and modifies it
+                in place, e.g. `lambda s: setattr(s, "archive_hold_days", 90)`.
+            dry_run (bool, optional): When True, reports the changes `transform` would make
+                to each org without writing them. Defaults to False.
+            max_workers (int, optional): The maximum number of orgs to update at the same
+                time. Defaults to `pycpg.settings.max_workers`.
+            retries (int, optional): The number of times to retry a failed request for an
+                org. Defaults to 2.
+            progress (:class:`pycpg.bulk.BulkProgress`, optional): Records orgs that were
+                updated and skips orgs that were updated in an earlier run, so an
+                interrupted rollout can be run again. Not used in a dry run. Defaults to
+                None.
+
+        Returns:
+            :class:`OrgSettingsBulkUpdateReport`: A namedtuple containing the lists of
+            org IDs whose settings were `changed` (and written, unless `dry_run`) and
+            `unchanged`, a dict of `errors` mapping org IDs to the exception raised for
+            them, and a dict of the `changes` made to each changed org.
+        """
+
+        def update(org_id):
+            org_settings = self.get_settings(org_id)
+            transform(org_settings)
+            changes = dict(org_settings.changes)
+            if changes and not dry_run:
+                self._put_settings(org_settings, retries)
+            return changes
+
+        org_ids = list(org_ids)
+        if any(org_id not in self._org_id_map for org_id in org_ids):
+            self.load_org_id_map()
+        if dry_run:
+            progress = None
+        report = OrgSettingsBulkUpdateReport([], [], {}, {})
+        for result in run_bulk(update, org_ids, max_workers, progress=progress):
+            if result.error is not None:
+                report.errors[result.item] = result.error
+            elif result.response:
+                report.changed.append(result.item)
+                report.changes[result.item] = result.response
+            else:
+                report.unchanged.append(result.item)
+        return report
+
+    def _put_settings(self, org_settings, retries):
+        org_id = org_settings.org_id
+        requests = []
+        if org_settings.packets:
+            uri = f"/api/v1/OrgSetting/{org_id}"
+            payload = {"packets": org_settings.packets}
+            requests.append(partial(self._connection.put, uri, json=payload))
+        if org_settings.changes:
+            uri = f"/api/v1/Org/{org_id}"
+            requests.append(partial(self._connection.put, uri, json=org_settings.data))
+
+        for attempt in range(retries + 1):
+            failed = []
+            for request in requests:
+                try:
+                    request()
+                except PycpgError as err:
+                    failed.append((request, err))
+            if not failed:
+                return
+            for _, error in failed:
+                if not isinstance(error, _RETRYABLE_ERRORS) or attempt == retries:
+                    raise error
+            requests = [request for request, _ in failed]
+            sleep(_RETRY_DELAY * (attempt + 1))
+
     def update_org(self, org_id, name=None, notes=None, ext_ref=None):
         """Updates an org. Only fields associated with passed parameters will be updated.
 
@@ -1,25 +1,61 @@
-from functools import lru_cache
+from collections import OrderedDict
+from collections import namedtuple
+from threading import Lock
+from time import monotonic
 
+import pycpg.settings as settings
 from pycpg.exceptions import PycpgError
-from pycpg.services._connection import Connection
+from pycpg.services._cache import TTLCache
+from pycpg.services._connection import ConnectedServerHostResolver
+from pycpg.services._transport import Transport
 from pycpg.services.storage.archive import StorageArchiveService
 from pycpg.services.storage.restore import PushRestoreService
 
+_MAX_STORAGE_NODES = 64
+_MAX_STORAGE_LOCATIONS = 10000
+# Devices can disconnect or connect to another server at any time, so the server a
+# push restore goes to is looked up again after this many seconds.
+_PUSH_LOCATION_TTL = 60
+
+StorageNodeStats = namedtuple(
+    "StorageNodeStats", ["url", "requests", "errors", "average_latency", "failed"]
+)
+
 
 class StorageServiceFactory:
+    """Creates services for the storage servers that hold device archives.
+
+    Each storage server URL gets one connection, shared by every device whose archive
+    or push restore it serves, and the URL found for each device is remembered. The
+    latency and errors of the requests sent to each server are tracked, and a device's
+    archive URL is only looked up again after a request to its server fails. The server
+    a device is connected to for push restores is also looked up again after a minute.
+    The most recently used servers and device URLs are kept.
+    """
+
     def __init__(self, connection, device_service):
         self._connection = connection
         self._device_service = device_service
+        self._nodes = OrderedDict()
+        self._locations = TTLCache(_MAX_STORAGE_LOCATIONS, float("inf"))
+        self._lock = Lock()
 
     def create_push_restore_service(self, device_guid):
-        conn = Connection.from_device_connection(self._connection, device_guid)
-        return PushRestoreService(conn)
+        node = self._get_node(
+            ("push", device_guid),
+            lambda: ConnectedServerHostResolver(
+                self._connection, device_guid
+            ).get_host_address(),
+            ttl=_PUSH_LOCATION_TTL,
+        )
+        return node.push_restore_service
 
-    @lru_cache(maxsize=None)  # noqa: B019
     def create_archive_service(self, device_guid, destination_guid):
-        url = self.get_storage_url(device_guid, destination_guid)
-        conn = self._connection.clone(url)
-        return StorageArchiveService(conn)
+        node = self._get_node(
+            ("archive", device_guid, destination_guid),
+            lambda: self.get_storage_url(device_guid, destination_guid),
+        )
+        return node.archive_service
 
     def get_storage_url(self, device_guid, destination_guid):
         uri = "api/v1/WebRestoreInfo"
@@ -27,6 +63,13 @@ class StorageServiceFactory:
         response = self._connection.get(uri, params=params)
         return response["serverUrl"]
 
+    def get_node_stats(self):
+        """Returns a :class:`StorageNodeStats` for each storage server a connection is
+        kept for."""
+        with self._lock:
+            nodes = list(self._nodes.values())
+        return [node.get_stats() for node in nodes]
+
     def auto_select_destination_guid(self, device_guid):
         response = self._device_service.get_by_guid(
             device_guid, include_backup_usage=True
@@ -36,3 +79,99 @@ class StorageServiceFactory:
         if not destination_list:
             raise PycpgError(f"No destinations found for device guid: {device_guid}")
         return destination_list[0]["targetComputerGuid"]
+
+    def _get_node(self, location, resolve_url, ttl=None):
+        url = self._locations.get(location)
+        if url is not None:
+            with self._lock:
+                node = self._nodes.get(url)
+                if node is not None and not node.failed:
+                    self._nodes.move_to_end(url)
+                    return node
+            if node is None:
+                return self._add_node(url)
+            if settings.response_cache is not None:
+                # A cached lookup would return the URL of the failed node again.
+                settings.response_cache.invalidate("/api/v1/WebRestoreInfo")
+        url = resolve_url()
+        self._locations.set(location, url, ttl)
+        return self._add_node(url)
+
+    def _add_node(self, url):
+        with self._lock:
+            node = self._nodes.get(url)
+            if node is None or node.failed:
+                # A node that failed gets a new connection, since its URL was just
+                # looked up again.
+                transport = _StorageNodeTransport(self._connection.transport)
+                node = _StorageNode(url, self._connection.clone(url, transport))
+                self._nodes[url] = node
+                while len(self._nodes) > _MAX_STORAGE_NODES:
+                    self._nodes.popitem(last=False)
+            self._nodes.move_to_end(url)
+            return node
+
+
+class _StorageNode:
+    def __init__(self, url, connection):
+        self.url = url
+        self.archive_service = StorageArchiveService(connection)
+        self.push_restore_service = PushRestoreService(connection)
+        self._transport = connection.transport
+
+    @property
+    def failed(self):
+        return self._transport.failed
+
+    def get_stats(self):
+        return self._transport.get_stats(self.url)
+
+
+class _StorageNodeTransport(Transport):
+    """Sends requests through another transport, sharing its connection pool, and
+    tracks their latency and errors."""
+
+    def __init__(self, transport):
+        self._transport = transport
+        self._lock = Lock()
+        self._requests = 0
+        self._errors = 0
+        self._total_latency = 0
+        self.failed = False
+
+    @property
+    def headers(self):
+        return self._transport.headers
+
+    def prepare_request(self, request):
+        return self._transport.prepare_request(request)
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        start = monotonic()
+        response = None
+        try:
+            response = self._transport.send(
+                request,
+                stream=stream,
+                timeout=timeout,
+                verify=verify,
+                cert=cert,
+                proxies=proxies,
+            )
+            return response
+        finally:
+            failed = response is None or response.status_code >= 500
+            with self._lock:
+                self._requests += 1
+                self._total_latency += monotonic() - start
+                self._errors += failed
+                self.failed = failed
+
+    def get_stats(self, url):
+        with self._lock:
+            average = self._total_latency / self._requests if self._requests else None
+            return StorageNodeStats(
+                url, self._requests, self._errors, average, self.failed
+            )
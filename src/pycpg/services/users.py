@@ -1,5 +1,8 @@
+from collections import namedtuple
+
 from pycpg import settings
 from pycpg.exceptions import PycpgBadRequestError
+from pycpg.exceptions import PycpgError
 from pycpg.exceptions import PycpgInternalServerError
 from pycpg.exceptions import PycpgInvalidEmailError
 from pycpg.exceptions import PycpgInvalidPasswordError
@@ -8,16 +11,37 @@ from pycpg.exceptions import PycpgNotFoundError
 from pycpg.exceptions import PycpgOrgNotFoundError
 from pycpg.exceptions import PycpgUserAlreadyExistsError
 from pycpg.exceptions import PycpgUsernameMustBeEmailError
+from pycpg.query import UserQuery
 from pycpg.services import BaseService
 from pycpg.services import handle_active_legal_hold_error
+from pycpg.services._cache import TTLCache
 from pycpg.services.util import get_all_pages
+from pycpg.services.util import run_concurrently
+from pycpg.util import to_list
+
+_USER_CACHE_MAXSIZE = 50000
+_USER_CACHE_TTL_SECONDS = 900
+_ROLE_CACHE_TTL_SECONDS = 900
+
+RoleChangeResult = namedtuple(
+    "RoleChangeResult", ["user_id", "added", "removed", "error", "response"]
+)
 
 
 class UserService(BaseService):
     """A service for interacting with CrashPlan user APIs. Use the UserService to create and retrieve
     users. You can also use it to block and deactivate users.
+
+    User IDs, UIDs, and usernames seen in responses are kept in a bounded, expiring
+    identity cache shared by all methods, so v3 endpoints that need a UID do not look up
+    the user again.
     """
 
+    def __init__(self, connection):
+        super().__init__(connection)
+        self._identity_cache = TTLCache(_USER_CACHE_MAXSIZE, _USER_CACHE_TTL_SECONDS)
+        self._role_cache = TTLCache(1, _ROLE_CACHE_TTL_SECONDS)
+
     def create_user(
         self,
         org_uid,
@@ -74,7 +98,9 @@ class UserService(BaseService):
             :class:`pycpg.response.PycpgResponse`: A response containing the user.
         """
         uri = f"/api/v1/User/{user_id}"
-        return self._connection.get(uri, params=kwargs)
+        response = self._connection.get(uri, params=kwargs)
+        self._cache_users(response)
+        return response
 
     def get_by_uid(self, user_uid, **kwargs):
         """Gets the user with the given UID.
@@ -87,7 +113,9 @@ class UserService(BaseService):
         """
         uri = f"/api/v1/User/{user_uid}"
         params = dict(idType="uid", **kwargs)
-        return self._connection.get(uri, params=params)
+        response = self._connection.get(uri, params=params)
+        self._cache_users(response)
+        return response
 
     def get_by_username(self, username, **kwargs):
         """Gets the user with the given username.
@@ -101,7 +129,9 @@ class UserService(BaseService):
 
         uri = "/api/v1/User"
         params = dict(username=username, **kwargs)
-        return self._connection.get(uri, params=params)
+        response = self._connection.get(uri, params=params)
+        self._cache_users(response)
+        return response
 
     def get_current(self, **kwargs):
         """Gets the currently signed in user.
@@ -150,6 +180,31 @@ class UserService(BaseService):
             :class:`pycpg.response.PycpgResponse`
         """
 
+        response = self._request_page(
+            page_num,
+            active=active,
+            email=email,
+            org_uid=org_uid,
+            role_id=role_id,
+            page_size=page_size,
+            q=q,
+            **kwargs,
+        )
+        self._cache_users(response)
+        return response
+
+    def _request_page(
+        self,
+        page_num,
+        active=None,
+        email=None,
+        org_uid=None,
+        role_id=None,
+        page_size=None,
+        q=None,
+        **kwargs,
+    ):
+        # Gets a page of users without reading the response.
         uri = "/api/v1/User"
         page_size = page_size or settings.items_per_page
         params = dict(
@@ -200,6 +255,20 @@ class UserService(BaseService):
             **kwargs,
         )
 
+    def query(self, page_size=None):
+        """Creates a query that lists users, sending the filters the API supports with
+        the request and checking the rest against each user after its page is decoded.
+        Select fields to cut each user down to the fields that are needed.
+
+        Args:
+            page_size (int, optional): The number of users to request per page. Defaults
+                to `pycpg.settings.items_per_page`.
+
+        Returns:
+            :class:`pycpg.query.UserQuery`
+        """
+        return UserQuery(self._request_page, page_size=page_size)
+
     def get_scim_data_by_uid(self, user_uid):
         """Returns SCIM data such as division, department, and title for a given user.
 
@@ -343,6 +412,51 @@ class UserService(BaseService):
         )
         return self._update_roles(user_id, role_ids)
 
+    def apply_role_changes(self, changes, max_workers=None):
+        """Adds and removes roles for many users at once.
+
+        The list of available roles is fetched once, every user's current roles are read
+        concurrently, and a user's roles are only updated when the change would actually
+        add or remove a role.
+
+        Args:
+            changes (iterable): `(user_id, add, remove)` tuples, where `add` and `remove`
+                are a role name or ID, or a list of them, e.g.
+                `[(1234, ["Desktop User"], []), (5678, "proe-user", "desktop-user")]`.
+            max_workers (int, optional): The maximum number of users to update at the same
+                time. Defaults to `pycpg.settings.max_workers`.
+
+        Returns:
+            list: A :class:`RoleChangeResult` namedtuple for each change, in the order of
+            `changes`, containing the role IDs that were `added` and `removed`, the
+            `response` of the update (None when nothing needed to change), and any `error`
+            that was raised for that user, such as for a role that is not available.
+        """
+        self._get_role_catalogue()
+        changes = list(changes)
+        results = [None] * len(changes)
+        pending = []
+        for index, (user_id, add, remove) in enumerate(changes):
+            try:
+                add = [self._get_role_id(r) for r in to_list(add)]
+                remove = [self._get_role_id(r) for r in to_list(remove)]
+            except PycpgError as err:
+                results[index] = RoleChangeResult(user_id, [], [], err, None)
+            else:
+                pending.append((index, (user_id, add, remove)))
+        self.resolve_users([change[0] for _, change in pending])
+
+        updates = run_concurrently(
+            lambda item: self._apply_role_change(item[1]),
+            pending,
+            max_workers=max_workers,
+        )
+        for (index, (user_id, _, _)), result, error in updates:
+            if error is not None:
+                result = RoleChangeResult(user_id, [], [], error, None)
+            results[index] = result
+        return results
+
     def update_user(
         self,
         user_uid,
@@ -381,7 +495,7 @@ class UserService(BaseService):
             "quotaInBytes": archive_size_quota_bytes,
         }
         try:
-            return self._connection.put(uri, json=data)
+            response = self._connection.put(uri, json=data)
         except PycpgInternalServerError as err:
             response_text = str(err.response.text)
             if "USERNAME_NOT_AN_EMAIL" in response_text:
@@ -393,19 +507,125 @@ class UserService(BaseService):
             elif "INVALID_USERNAME" in response_text:
                 raise PycpgInvalidUsernameError(err)
             raise
+        if username is not None:
+            self._forget_user(str(user_uid))
+        return response
+
+    def resolve_users(self, user_ids, use_paging=None, max_workers=None):
+        """Resolves many user IDs to user UIDs at once and fills the user identity cache,
+        so that later calls for these users do not need an extra lookup request.
+
+        IDs that are not already cached are either looked up concurrently with
+        :meth:`get_by_id` or, when there are at least a page's worth of them, found by
+        paging through :meth:`get_all`, which takes far fewer requests.
+
+        Args:
+            user_ids (iterable): The IDs of the users to resolve.
+            use_paging (bool, optional): True always pages through all users, False always
+                looks users up individually. Defaults to None, which picks based on how many
+                IDs are not cached.
+            max_workers (int, optional): The maximum number of concurrent lookups. Defaults
+                to `pycpg.settings.max_workers`.
+
+        Returns:
+            dict: A dict mapping each resolved user ID to its user UID. IDs of users that
+            could not be found are left out.
+        """
+        resolved = {}
+        missing = set()
+        for user_id in user_ids:
+            identity = self._identity_cache.get(("id", user_id))
+            if identity:
+                resolved[user_id] = identity[1]
+            else:
+                missing.add(user_id)
+
+        if use_paging is None:
+            use_paging = len(missing) >= settings.items_per_page
+
+        if missing and use_paging:
+            for page in self.get_all(active=None):
+                for user in page["users"]:
+                    if user["userId"] in missing:
+                        resolved[user["userId"]] = user["userUid"]
+                        missing.discard(user["userId"])
+                if not missing:
+                    break
+        elif missing:
+            lookups = run_concurrently(self.get_by_id, missing, max_workers=max_workers)
+            for user_id, response, error in lookups:
+                if error is None:
+                    resolved[user_id] = response["userUid"]
+                elif not isinstance(error, PycpgNotFoundError):
+                    raise error
+
+        return resolved
+
+    def clear_user_cache(self):
+        """Empties the user identity cache."""
+        self._identity_cache.clear()
 
     def _get_user_uid_by_id(self, user_id):
         # Identity crisis helper method.
         # Old pycpg methods accepted IDs. New apis take UIDs.
         # Use additional lookup to prevent breaking changes.
+        identity = self._identity_cache.get(("id", user_id))
+        if identity:
+            return identity[1]
         return self.get_by_id(user_id)["userUid"]
 
+    def _cache_users(self, response):
+        data = getattr(response, "data", None)
+        if not isinstance(data, dict):
+            return
+        for user in data.get("users") or [data]:
+            self._cache_user(user)
+
+    def _cache_user(self, user):
+        if not isinstance(user, dict) or "userId" not in user or "userUid" not in user:
+            return
+        identity = (user["userId"], user["userUid"], user.get("username"))
+        self._identity_cache.set(("id", identity[0]), identity)
+        self._identity_cache.set(("uid", identity[1]), identity)
+        if identity[2]:
+            self._identity_cache.set(("username", identity[2]), identity)
+
+    def _forget_user(self, user_uid):
+        identity = self._identity_cache.pop(("uid", user_uid))
+        if identity:
+            self._identity_cache.pop(("id", identity[0]))
+            self._identity_cache.pop(("username", identity[2]))
+
     def _get_role_ids(self, user_id):
         return [i["roleId"] for i in self.get_roles(user_id)]
 
+    def _get_role_catalogue(self):
+        roles = self._role_cache.get("roles")
+        if roles is None:
+            roles = self.get_available_roles().data
+            self._role_cache.set("roles", roles)
+        return roles
+
+    def _get_role_id(self, role_name):
+        for role in self._get_role_catalogue():
+            if role_name in (role["roleName"], role["roleId"]):
+                return role["roleId"]
+        raise PycpgError(f"Role '{role_name}' is not available to assign.")
+
+    def _apply_role_change(self, change):
+        user_id, add, remove = change
+        current = self._get_role_ids(user_id)
+        added = [r for r in dict.fromkeys(add) if r not in current]
+        removed = [r for r in current if r in remove]
+        response = None
+        if added or removed:
+            role_ids = [r for r in current if r not in removed] + added
+            response = self._update_roles(user_id, role_ids)
+        return RoleChangeResult(user_id, added, removed, None, response)
+
     def _update_role_ids(self, role_name, role_ids, add=True):
 
-        for role in self.get_available_roles():
+        for role in self._get_role_catalogue():
             if (role["roleName"] == role_name) or (role["roleId"] == role_name):
                 if add:
                     role_ids.append(role["roleId"])
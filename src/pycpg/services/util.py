@@ -1,3 +1,8 @@
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from itertools import islice
+
 import pycpg.settings as settings
 
 
@@ -13,3 +18,27 @@ def get_all_pages(func, key, *args, **kwargs):
         yield response
         page_items = response[key] if key else response.data
         item_count = len(page_items)
+
+
+def run_concurrently(func, items, max_workers=None):
+    """Calls `func` once per item on a bounded thread pool and yields an
+    `(item, result, error)` tuple for each call as it completes.
+
+    Items are pulled from `items` lazily, so at most `max_workers` calls are in flight
+    and large iterables are never fully materialized. An exception raised by `func`
+    is yielded as `error` (with `result` set to None) instead of being raised.
+    """
+    max_workers = max_workers or settings.max_workers
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(func, i): i for i in islice(items, max_workers)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    yield item, future.result(), None
+                except Exception as err:
+                    yield item, None, err
+                for next_item in islice(items, 1):
+                    pending[executor.submit(func, next_item)] = next_item
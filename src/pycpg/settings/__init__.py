@@ -9,22 +9,58 @@ verify_ssl_certs = True
 
 items_per_page = 500
 
+# The maximum number of requests bulk helpers send at the same time.
+max_workers = 4
+
+# Whether connections send requests over HTTP/2 so that concurrent requests to a host
+# share one connection. Requires the `http2` extra (`pip install pycpg[http2]`).
+use_http2 = False
+
+# Whether identical GET requests sent at the same time by different threads share one
+# request to the server. Only GETs without a body, headers, cookies, hooks, or
+# streaming are shared.
+coalesce_get_requests = False
+
+# A `pycpg.cache.ResponseCache` that keeps the responses of slow-changing endpoints, such
+# as the available roles, for reuse. Disabled when None.
+response_cache = None
+
+# A `pycpg.cache.RevalidationCache` that keeps GET responses with an ETag or
+# Last-Modified header and revalidates them with conditional requests. Disabled when
+# None.
+revalidation_cache = None
+
+# Path of a file where auth tokens and resolved microservice hosts are cached so that
+# other processes run by the same user can reuse them. Disabled when None.
+disk_cache_path = None
+
+# The number of seconds a resolved microservice host is kept in the disk cache.
+disk_cache_host_ttl = 3600
+
 _custom_user_prefix = ""
 _custom_user_suffix = ""
 _python_version = f"{sys.version_info[0]}.{sys.version_info[1]}.{sys.version_info[2]}"
+_user_agent_string = None
 
 
 def get_user_agent_string():
-    return "{}pycpg/{} python/{}{}".format(
-        _custom_user_prefix, version("pycpg"), _python_version, _custom_user_suffix
-    )
+    # Looking up the installed package version reads its metadata from disk, so the
+    # result is kept until the prefix or suffix changes.
+    global _user_agent_string
+    if _user_agent_string is None:
+        _user_agent_string = "{}pycpg/{} python/{}{}".format(
+            _custom_user_prefix, version("pycpg"), _python_version, _custom_user_suffix
+        )
+    return _user_agent_string
 
 
 def set_user_agent_suffix(suffix):
-    global _custom_user_suffix
+    global _custom_user_suffix, _user_agent_string
     _custom_user_suffix = f" {suffix}" if suffix else ""
+    _user_agent_string = None
 
 
 def set_user_agent_prefix(prefix):
-    global _custom_user_prefix
+    global _custom_user_prefix, _user_agent_string
     _custom_user_prefix = f"{prefix} " if prefix else ""
+    _user_agent_string = None
@@ -1,5 +1,6 @@
 import logging
 import sys
+from threading import Lock
 
 
 class _DebugSettings:
@@ -9,8 +10,25 @@ class _DebugSettings:
     NONE = logging.NOTSET
 
     def __init__(self):
-        self.logger = logging.getLogger("pycpg")
-        self.logger.addHandler(logging.StreamHandler(sys.stderr))
+        self._logger = None
+        self._lock = Lock()
+
+    @property
+    def logger(self):
+        # The default logger and its stderr handler are only set up when first used,
+        # so that importing pycpg does not add handlers to the logging tree.
+        if self._logger is None:
+            with self._lock:
+                # Checked again so that threads racing to set it up add one handler.
+                if self._logger is None:
+                    logger = logging.getLogger("pycpg")
+                    logger.addHandler(logging.StreamHandler(sys.stderr))
+                    self._logger = logger
+        return self._logger
+
+    @logger.setter
+    def logger(self, logger):
+        self._logger = logger
 
     @property
     def level(self):
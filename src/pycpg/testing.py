@@ -0,0 +1,751 @@
+"""An in-process fake CrashPlan server for exercising the SDK offline.
+
+:class:`FakeCrashPlanServer` is a :class:`~pycpg.services._transport.Transport`, so
+connections send their requests straight to it instead of over the network. It serves
+generated orgs and their settings, users, devices and their archives, legal hold
+matters, audit log events and an archive tree, and can add latency, server errors and ``429`` throttling so that
+the SDK's paging, concurrency and retry behavior can be benchmarked deterministically.
+JSON responses to GET requests carry an ``ETag`` and are answered with a ``304`` when
+the request's ``If-None-Match`` matches it.
+
+Example::
+
+    from pycpg.testing import FakeCrashPlanServer
+
+    server = FakeCrashPlanServer(device_count=5000, latency=0.02)
+    sdk = server.create_sdk()
+    for page in sdk.devices.get_all():
+        ...
+"""
+
+import hashlib
+import io
+import json
+import random
+import re
+import time
+from collections import Counter
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from threading import Lock
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from pycpg.services._transport import Transport
+
+_FAKE_TOKEN = "fake-token"
+# Device N last backed up N - 1 days after this.
+_FIRST_BACKUP = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeCrashPlanServer(Transport):
+    """Serves a synthetic CrashPlan environment in-process.
+
+    Args:
+        host_address (str, optional): The address the fake server answers for. Every
+            microservice and storage node resolves to this address too. Defaults to
+            ``https://console.example.com``.
+        org_count (int, optional): The number of orgs. Defaults to 10.
+        user_count (int, optional): The number of users. Defaults to 100.
+        device_count (int, optional): The number of devices. Defaults to 200.
+        matter_count (int, optional): The number of legal hold matters. Defaults to 5.
+        custodians_per_matter (int, optional): The number of custodians added to each
+            matter. Defaults to 10.
+        audit_event_count (int, optional): The number of audit log events. Defaults to
+            1000.
+        tree_depth (int, optional): How many directory levels the archive tree has
+            below its root. Defaults to 3.
+        tree_breadth (int, optional): The number of subdirectories per directory.
+            Defaults to 3.
+        files_per_directory (int, optional): The number of files per directory.
+            Defaults to 5.
+        max_page_size (int, optional): The largest page the server returns, whatever
+            page size is requested. Defaults to 1000.
+        latency (float, optional): Seconds every request takes. Defaults to 0.
+        error_rate (float, optional): The probability, from 0 to 1, that a request
+            fails with a ``500``. Defaults to 0.
+        throttle_rate (float, optional): The probability, from 0 to 1, that a request
+            is rejected with a ``429``. Defaults to 0.
+        retry_after (int, optional): The ``Retry-After`` value, in seconds, sent with
+            ``429`` responses. Defaults to 1.
+        seed (int, optional): Seeds the generated data and the random failures.
+            Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        host_address="https://console.example.com",
+        org_count=10,
+        user_count=100,
+        device_count=200,
+        matter_count=5,
+        custodians_per_matter=10,
+        audit_event_count=1000,
+        tree_depth=3,
+        tree_breadth=3,
+        files_per_directory=5,
+        max_page_size=1000,
+        latency=0,
+        error_rate=0,
+        throttle_rate=0,
+        retry_after=1,
+        seed=0,
+    ):
+        self.host_address = host_address
+        self.max_page_size = max_page_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.request_counts = Counter()
+        self.max_concurrent_requests = 0
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._in_flight = 0
+        self._next_job_id = 0
+        self._orgs = _generate_orgs(org_count)
+        self._org_settings, self._t_settings = _generate_org_settings(self._orgs)
+        self._users = _generate_users(user_count, self._orgs)
+        self._devices = _generate_devices(device_count, self._users, self._random)
+        self._archives = _generate_archives(self._devices)
+        self._matters, self._memberships = _generate_legal_holds(
+            matter_count, custodians_per_matter, self._users
+        )
+        self._events = _generate_audit_events(audit_event_count, self._users)
+        self._tree = _generate_archive_tree(
+            tree_depth, tree_breadth, files_per_directory
+        )
+        self._routes = [
+            (method, re.compile(f"^{pattern}$"), handler)
+            for method, pattern, handler in self._get_routes()
+        ]
+
+    def create_sdk(self):
+        """Creates an :class:`~pycpg.sdk.SDKClient` that sends its requests to this
+        server.
+
+        Returns:
+            :class:`pycpg.sdk.SDKClient`
+        """
+        from pycpg.sdk import SDKClient
+        from pycpg.services._auth import CustomJWTAuth
+        from pycpg.services._connection import Connection
+
+        auth = CustomJWTAuth(lambda: _FAKE_TOKEN)
+        connection = Connection.from_host_address(
+            self.host_address, auth=auth, transport=self
+        )
+        return SDKClient(connection, auth)
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        with self._lock:
+            self._in_flight += 1
+            self.max_concurrent_requests = max(
+                self.max_concurrent_requests, self._in_flight
+            )
+            roll = self._random.random()
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return self._respond(request, stream, roll)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def reset_counts(self):
+        """Clears :attr:`request_counts` and :attr:`max_concurrent_requests`."""
+        with self._lock:
+            self.request_counts.clear()
+            self.max_concurrent_requests = 0
+
+    def _respond(self, request, stream, roll):
+        url = urlsplit(request.url)
+        params = dict(parse_qsl(url.query))
+        body = _parse_body(request.body)
+        for method, pattern, handler in self._routes:
+            match = pattern.match(url.path)
+            if method != request.method or not match:
+                continue
+            with self._lock:
+                self.request_counts[f"{method} {pattern.pattern[1:-1]}"] += 1
+            if roll < self.throttle_rate:
+                headers = {"Retry-After": str(self.retry_after)}
+                return _create_response(request, 429, {"error": "throttled"}, headers)
+            if roll < self.throttle_rate + self.error_rate:
+                return _create_response(request, 500, {"error": "fake server error"})
+            if not _is_public_route(url.path) and not request.headers.get(
+                "Authorization"
+            ):
+                return _create_response(request, 401, {"error": "unauthorized"})
+            status, payload = handler(match, params, body)
+            response = _create_response(request, status, payload, stream=stream)
+            if method == "GET" and status == 200 and not stream:
+                etag = f'"{hashlib.sha1(response.content).hexdigest()}"'
+                if request.headers.get("If-None-Match") == etag:
+                    return _create_response(request, 304, b"", {"ETag": etag})
+                response.headers["ETag"] = etag
+            return response
+        return _create_response(request, 404, {"error": f"no route {url.path}"})
+
+    def _get_routes(self):
+        return [
+            ("POST", "/api/v3/oauth/token", self._post_token),
+            ("GET", "/api/v3/auth/jwt", self._get_jwt),
+            ("GET", "/api/v1/ServerEnv", self._get_server_env),
+            ("GET", r"/v1/(?P<key>[^/]+)", self._get_stored_value),
+            ("GET", "/api/v3/customer/my", self._get_customer),
+            ("GET", "/api/v1/Org", self._get_orgs),
+            ("GET", "/api/v1/Org/my", self._get_my_org),
+            ("GET", r"/api/v1/Org/(?P<id>[^/]+)", self._get_org),
+            ("PUT", r"/api/v1/Org/(?P<id>[^/]+)", self._put_org),
+            ("GET", r"/api/v3/orgs/(?P<guid>[^/]+)", self._get_org_by_guid),
+            ("PUT", r"/api/v3/orgs/(?P<guid>[^/]+)", self._put_org_by_guid),
+            ("GET", r"/api/v1/OrgSetting/(?P<id>[^/]+)", self._get_t_settings),
+            ("PUT", r"/api/v1/OrgSetting/(?P<id>[^/]+)", self._put_t_settings),
+            ("GET", "/api/v1/User", self._get_users),
+            ("GET", "/api/v1/User/my", self._get_my_user),
+            ("GET", r"/api/v1/User/(?P<id>[^/]+)", self._get_user),
+            ("GET", "/api/v1/Computer", self._get_devices),
+            ("GET", r"/api/v1/Computer/(?P<id>[^/]+)", self._get_device),
+            ("PUT", r"/api/v1/Computer/(?P<id>[^/]+)", self._put_device),
+            ("GET", "/api/v1/Archive", self._get_archives),
+            ("GET", "/api/v38/legal-hold-matter/list", self._get_matters),
+            ("GET", "/api/v38/legal-hold-matter/view", self._get_matter),
+            ("GET", "/api/v38/legal-hold-membership/list", self._get_memberships),
+            ("POST", "/api/v38/legal-hold-membership/create", self._add_custodian),
+            (
+                "POST",
+                "/api/v38/legal-hold-membership/deactivate",
+                self._remove_custodian,
+            ),
+            ("POST", "/rpc/search/search-audit-log", self._search_audit_log),
+            ("GET", "/api/v1/WebRestoreInfo", self._get_web_restore_info),
+            ("GET", "/api/v1/connectedServerUrl", self._get_connected_server_url),
+            ("POST", "/api/v1/DataKeyToken", self._get_data_key_token),
+            (
+                "GET",
+                r"/api/v3/BackupSets/(?P<guid>[^/]+)/(?P<dest>[^/]+)",
+                self._get_backup_sets,
+            ),
+            ("POST", "/api/v1/WebRestoreSession", self._create_restore_session),
+            ("GET", "/api/v1/WebRestoreTreeNode", self._get_tree_nodes),
+            ("POST", "/api/v1/WebRestoreFileSizePolling", self._create_size_job),
+            ("GET", "/api/v1/WebRestoreFileSizePolling", self._get_size_job),
+            ("POST", "/api/v9/restore/web", self._start_restore),
+            ("POST", "/api/v38/restore/push", self._start_restore),
+            ("GET", r"/api/v1/WebRestoreJob/(?P<id>[^/]+)", self._get_restore_job),
+            ("DELETE", "/api/v1/WebRestoreJob", self._cancel_restore),
+            (
+                "GET",
+                r"/api/v1/WebRestoreJobResult/(?P<id>[^/]+)",
+                self._get_restore_result,
+            ),
+        ]
+
+    def _page(self, items, page_num, page_size, first_page=1):
+        page_size = min(int(page_size or self.max_page_size), self.max_page_size)
+        start = (int(page_num or first_page) - first_page) * page_size
+        end = start + page_size
+        return items[start:end]
+
+    def _new_job_id(self):
+        with self._lock:
+            self._next_job_id += 1
+            return str(self._next_job_id)
+
+    def _post_token(self, match, params, body):
+        return 200, {"access_token": _FAKE_TOKEN, "expires_in": 3600}
+
+    def _get_jwt(self, match, params, body):
+        return 200, {"data": {"v3_user_token": _FAKE_TOKEN}}
+
+    def _get_server_env(self, match, params, body):
+        return 200, {"stsBaseUrl": self.host_address}
+
+    def _get_stored_value(self, match, params, body):
+        return 200, self.host_address
+
+    def _get_customer(self, match, params, body):
+        return 200, {"data": {"tenantUid": "fake-tenant"}}
+
+    def _get_orgs(self, match, params, body):
+        orgs = self._page(self._orgs, params.get("pgNum"), params.get("pgSize"))
+        return 200, {"data": {"totalCount": len(self._orgs), "orgs": orgs}}
+
+    def _get_my_org(self, match, params, body):
+        return 200, {"data": self._orgs[0]}
+
+    def _get_org(self, match, params, body):
+        org = _find(self._orgs, "orgId", match["id"])
+        return (200, {"data": org}) if org else (404, {"error": "org not found"})
+
+    def _put_org(self, match, params, body):
+        org = _find(self._orgs, "orgId", match["id"])
+        if not org:
+            return 404, {"error": "org not found"}
+        with self._lock:
+            for key in ("orgName", "orgExtRef", "notes"):
+                if key in body:
+                    org[key] = body[key]
+            if isinstance(body.get("settings"), dict):
+                self._org_settings[org["orgId"]].update(body["settings"])
+        return 200, {"data": org}
+
+    def _get_org_by_guid(self, match, params, body):
+        org = _find(self._orgs, "orgGuid", match["guid"])
+        if not org:
+            return 404, {"error": "org not found"}
+        with self._lock:
+            settings = dict(self._org_settings[org["orgId"]])
+        return 200, {"data": dict(org, settings=settings)}
+
+    def _put_org_by_guid(self, match, params, body):
+        org = _find(self._orgs, "orgGuid", match["guid"])
+        if not org:
+            return 404, {"error": "org not found"}
+        with self._lock:
+            org.update({k: v for k, v in body.items() if v is not None})
+        return 200, {"data": org}
+
+    def _get_t_settings(self, match, params, body):
+        org = _find(self._orgs, "orgId", match["id"])
+        if not org:
+            return 404, {"error": "org not found"}
+        with self._lock:
+            t_settings = {k: dict(v) for k, v in self._t_settings[org["orgId"]].items()}
+        return 200, {"data": t_settings}
+
+    def _put_t_settings(self, match, params, body):
+        org = _find(self._orgs, "orgId", match["id"])
+        if not org:
+            return 404, {"error": "org not found"}
+        with self._lock:
+            t_settings = self._t_settings[org["orgId"]]
+            for packet in body.get("packets", []):
+                t_settings.setdefault(packet["key"], {"scope": "ORG"}).update(
+                    value=packet["value"], locked=packet.get("locked", False)
+                )
+        return 200, {"data": None}
+
+    def _get_users(self, match, params, body):
+        users = self._users
+        if params.get("username"):
+            users = [u for u in users if u["username"] == params["username"]]
+        page = self._page(users, params.get("pgNum"), params.get("pgSize"))
+        return 200, {"data": {"totalCount": len(users), "users": page}}
+
+    def _get_my_user(self, match, params, body):
+        return 200, {"data": self._users[0]}
+
+    def _get_user(self, match, params, body):
+        key = "userUid" if params.get("idType") == "uid" else "userId"
+        user = _find(self._users, key, match["id"])
+        return (200, {"data": user}) if user else (404, {"error": "user not found"})
+
+    def _get_devices(self, match, params, body):
+        devices = self._devices
+        if params.get("active", "").lower() in ("true", "false"):
+            active = params["active"].lower() == "true"
+            devices = [d for d in devices if d["active"] == active]
+        if params.get("orgUid"):
+            devices = [d for d in devices if d["orgUid"] == params["orgUid"]]
+        page = self._page(devices, params.get("pgNum"), params.get("pgSize"))
+        if params.get("incBackupUsage") != "True":
+            page = [_without_backup_usage(d) for d in page]
+        return 200, {"data": {"totalCount": len(devices), "computers": page}}
+
+    def _get_device(self, match, params, body):
+        key = "guid" if params.get("idType") == "guid" else "computerId"
+        device = _find(self._devices, key, match["id"])
+        if not device:
+            return 404, {"error": "device not found"}
+        if params.get("incBackupUsage") != "True":
+            device = _without_backup_usage(device)
+        return 200, {"data": device}
+
+    def _put_device(self, match, params, body):
+        device = _find(self._devices, "computerId", match["id"])
+        if not device:
+            return 404, {"error": "device not found"}
+        with self._lock:
+            device.update(body or {})
+        return 200, {"data": device}
+
+    def _get_archives(self, match, params, body):
+        archives = self._archives
+        for param in ("backupSourceGuid", "userUid", "destinationGuid"):
+            if params.get(param):
+                key = "targetGuid" if param == "destinationGuid" else param
+                archives = [a for a in archives if a[key] == params[param]]
+        page = self._page(archives, params.get("pgNum"), params.get("pgSize"))
+        return 200, {"data": {"totalCount": len(archives), "archives": page}}
+
+    def _get_matters(self, match, params, body):
+        matters = self._matters
+        if params.get("active") in ("true", "false"):
+            active = params["active"] == "true"
+            matters = [m for m in matters if m["active"] == active]
+        return 200, self._page(matters, params.get("page"), params.get("pageSize"))
+
+    def _get_matter(self, match, params, body):
+        matter = _find(self._matters, "legalHoldUid", params.get("legalHoldUid"))
+        return (200, matter) if matter else (404, {"error": "matter not found"})
+
+    def _get_memberships(self, match, params, body):
+        memberships = self._memberships
+        if params.get("legalHoldUid"):
+            uid = params["legalHoldUid"]
+            memberships = [
+                m for m in memberships if m["legalHold"]["legalHoldUid"] == uid
+            ]
+        if params.get("userUid"):
+            uid = params["userUid"]
+            memberships = [m for m in memberships if m["user"]["userUid"] == uid]
+        if params.get("active") in ("ACTIVE", "INACTIVE"):
+            active = params["active"] == "ACTIVE"
+            memberships = [m for m in memberships if m["active"] == active]
+        return 200, self._page(memberships, params.get("page"), params.get("pageSize"))
+
+    def _add_custodian(self, match, params, body):
+        matter = _find(self._matters, "legalHoldUid", body.get("legalHoldUid"))
+        user = _find(self._users, "userUid", body.get("userUid"))
+        if not matter or not user:
+            return 400, {"error": "NOT_FOUND"}
+        with self._lock:
+            for membership in self._memberships:
+                if (
+                    membership["active"]
+                    and membership["legalHold"]["legalHoldUid"]
+                    == matter["legalHoldUid"]
+                    and membership["user"]["userUid"] == user["userUid"]
+                ):
+                    return 400, {"error": "USER_ALREADY_IN_HOLD"}
+            membership = _create_membership(len(self._memberships), matter, user)
+            self._memberships.append(membership)
+        return 201, membership
+
+    def _remove_custodian(self, match, params, body):
+        uid = body.get("legalHoldMembershipUid")
+        membership = _find(self._memberships, "legalHoldMembershipUid", uid)
+        if not membership:
+            return 403, {"error": "membership not found"}
+        with self._lock:
+            membership["active"] = False
+        return 204, b""
+
+    def _search_audit_log(self, match, params, body):
+        events = self._events
+        if body.get("actorIds"):
+            actor_ids = set(body["actorIds"])
+            events = [e for e in events if e["actorId"] in actor_ids]
+        page = self._page(events, body.get("page"), body.get("pageSize"), first_page=0)
+        return 200, {"events": page, "totalResultCount": len(events)}
+
+    def _get_web_restore_info(self, match, params, body):
+        return 200, {"data": {"serverUrl": self.host_address, "nodeGuid": "1"}}
+
+    def _get_connected_server_url(self, match, params, body):
+        return 200, {"data": {"serverUrl": self.host_address}}
+
+    def _get_data_key_token(self, match, params, body):
+        return 200, {"data": {"dataKeyToken": "fake-data-key-token"}}
+
+    def _get_backup_sets(self, match, params, body):
+        backup_set = {"backupSetId": "1", "name": "BackupSet Default"}
+        return 200, {"backupSets": [backup_set]}
+
+    def _create_restore_session(self, match, params, body):
+        return 200, {"data": {"webRestoreSessionId": f"session-{self._new_job_id()}"}}
+
+    def _get_tree_nodes(self, match, params, body):
+        children = self._tree.get(params.get("fileId"), [])
+        batch_size = params.get("batchSize")
+        last_id = params.get("lastBatchFileId")
+        if last_id:
+            ids = [node["id"] for node in children]
+            start = ids.index(last_id) + 1 if last_id in ids else len(ids)
+            children = children[start:]
+        if batch_size:
+            children = children[: int(batch_size)]
+        return 200, {"data": children}
+
+    def _create_size_job(self, match, params, body):
+        return 200, {"data": {"jobId": self._new_job_id()}}
+
+    def _get_size_job(self, match, params, body):
+        size = {"numFiles": 1, "numDirs": 0, "size": 1024, "status": "DONE"}
+        return 200, {"data": size}
+
+    def _start_restore(self, match, params, body):
+        return 200, {"data": {"jobId": self._new_job_id()}}
+
+    def _get_restore_job(self, match, params, body):
+        status = {"done": True, "status": "DONE", "percentComplete": 100}
+        return 200, {"data": status}
+
+    def _cancel_restore(self, match, params, body):
+        return 200, {"data": {"jobId": body.get("jobId")}}
+
+    def _get_restore_result(self, match, params, body):
+        return 200, f"restored content for job {match['id']}".encode()
+
+
+def _is_public_route(path):
+    # Token endpoints use basic auth and the key-value store is not authenticated.
+    return path in ("/api/v3/oauth/token", "/api/v3/auth/jwt") or path.startswith(
+        "/v1/"
+    )
+
+
+def _parse_body(body):
+    if not body:
+        return {}
+    try:
+        return json.loads(body)
+    except ValueError:
+        return {}
+
+
+def _create_response(request, status, payload, headers=None, stream=False):
+    if isinstance(payload, (dict, list)):
+        content = json.dumps(payload).encode()
+        content_type = "application/json"
+    else:
+        content = payload if isinstance(payload, bytes) else str(payload).encode()
+        content_type = "application/octet-stream"
+    response = Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+    response.headers.update(headers or {})
+    response.url = request.url
+    response.request = request
+    response.encoding = "utf-8"
+    if stream:
+        response.raw = io.BytesIO(content)
+    else:
+        response._content = content
+    return response
+
+
+def _find(items, key, value):
+    value = str(value)
+    for item in items:
+        if str(item[key]) == value:
+            return item
+    return None
+
+
+def _format_date(value):
+    return value.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _without_backup_usage(device):
+    return {key: value for key, value in device.items() if key != "backupUsage"}
+
+
+def _generate_orgs(count):
+    orgs = []
+    for i in range(1, count + 1):
+        # The first org is the root and every other org reports to an earlier one,
+        # which gives a shallow tree.
+        parent = None if i == 1 else orgs[(i - 2) // 3]
+        orgs.append(
+            {
+                "orgId": i,
+                "orgUid": f"org-uid-{i}",
+                "orgGuid": f"org-guid-{i}",
+                "orgName": f"Org {i}",
+                "parentOrgId": parent["orgId"] if parent else None,
+                "parentOrgUid": parent["orgUid"] if parent else None,
+                "status": "Active",
+                "active": True,
+            }
+        )
+    return orgs
+
+
+def _generate_org_settings(orgs):
+    org_settings = {}
+    t_settings = {}
+    for org in orgs:
+        # Every org but the root inherits its quota and reporting settings.
+        inherits = org["parentOrgId"] is not None
+        org_settings[org["orgId"]] = {
+            "isUsingQuotaDefaults": inherits,
+            "archiveHoldDays": 14,
+            "maxSeats": -1,
+            "maxBytes": -1,
+            "defaultUserMaxBytes": -1,
+            "webRestoreAdminLimitMb": 250,
+            "webRestoreUserLimitMb": 250,
+            "isUsingReportingDefaults": inherits,
+            "warnInDays": 3,
+            "alertInDays": 5,
+            "recipients": [],
+        }
+        t_settings[org["orgId"]] = {
+            "device_webRestore_enabled": {
+                "scope": "ORG",
+                "value": "true",
+                "locked": False,
+            }
+        }
+    return org_settings, t_settings
+
+
+def _generate_users(count, orgs):
+    users = []
+    for i in range(1, count + 1):
+        org = orgs[i % len(orgs)] if orgs else {"orgId": None, "orgUid": None}
+        users.append(
+            {
+                "userId": i,
+                "userUid": f"user-uid-{i}",
+                "username": f"user{i}@example.com",
+                "email": f"user{i}@example.com",
+                "firstName": "User",
+                "lastName": str(i),
+                "orgId": org["orgId"],
+                "orgUid": org["orgUid"],
+                "active": True,
+                "blocked": False,
+            }
+        )
+    return users
+
+
+def _generate_devices(count, users, rng):
+    devices = []
+    for i in range(1, count + 1):
+        user = users[i % len(users)] if users else {}
+        archive_bytes = rng.randrange(1, 500) * 1024**3
+        devices.append(
+            {
+                "computerId": i,
+                "guid": str(900000000000000000 + i),
+                "name": f"device-{i}",
+                "osHostname": f"host-{i}",
+                "osName": ("win", "mac", "linux")[i % 3],
+                "status": "Active" if i % 10 else "Deactivated",
+                "active": bool(i % 10),
+                "blocked": False,
+                "userUid": user.get("userUid"),
+                "orgId": user.get("orgId"),
+                "orgUid": user.get("orgUid"),
+                "lastConnected": "2024-01-01T00:00:00.000Z",
+                "backupUsage": [
+                    {
+                        "targetComputerGuid": "42",
+                        "targetComputerName": "Fake Storage",
+                        "archiveGuid": str(800000000000000000 + i),
+                        "archiveBytes": archive_bytes,
+                        "selectedBytes": archive_bytes * 2,
+                        "todoBytes": 0,
+                        "percentComplete": 100.0,
+                        "lastBackup": _format_date(
+                            _FIRST_BACKUP + timedelta(days=i - 1)
+                        ),
+                    }
+                ],
+            }
+        )
+    return devices
+
+
+def _generate_archives(devices):
+    # One archive per destination a device backs up to. The archives of deactivated
+    # devices are in cold storage.
+    archives = []
+    for device in devices:
+        for usage in device["backupUsage"]:
+            archives.append(
+                {
+                    "archiveGuid": usage["archiveGuid"],
+                    "backupSourceGuid": device["guid"],
+                    "userUid": device["userUid"],
+                    "targetGuid": usage["targetComputerGuid"],
+                    "archiveBytes": usage["archiveBytes"],
+                    "selectedBytes": usage["selectedBytes"],
+                    "lastCompletedBackupDate": usage["lastBackup"],
+                    "isColdStorage": not device["active"],
+                    "archiveHoldExpireDate": (
+                        None if device["active"] else "2030-01-01T00:00:00.000Z"
+                    ),
+                }
+            )
+    return archives
+
+
+def _create_membership(index, matter, user):
+    return {
+        "legalHoldMembershipUid": f"membership-uid-{index + 1}",
+        "active": True,
+        "legalHold": {
+            "legalHoldUid": matter["legalHoldUid"],
+            "name": matter["name"],
+        },
+        "user": {"userUid": user["userUid"], "username": user["username"]},
+    }
+
+
+def _generate_legal_holds(matter_count, custodians_per_matter, users):
+    matters = []
+    memberships = []
+    for i in range(1, matter_count + 1):
+        matter = {
+            "legalHoldUid": f"matter-uid-{i}",
+            "name": f"Matter {i}",
+            "active": True,
+        }
+        matters.append(matter)
+        for user in users[:custodians_per_matter]:
+            memberships.append(_create_membership(len(memberships), matter, user))
+    return matters, memberships
+
+
+def _generate_audit_events(count, users):
+    events = []
+    for i in range(count):
+        user = users[i % len(users)] if users else {}
+        events.append(
+            {
+                "type$": "audit_log::logged_in/1",
+                "actorId": user.get("userUid"),
+                "actorName": user.get("username"),
+                "timestamp": f"2024-01-01T00:{(i // 60) % 60:02d}:{i % 60:02d}.000Z",
+            }
+        )
+    return events
+
+
+def _generate_archive_tree(depth, breadth, files_per_directory):
+    # Maps a file ID, or None for the roots, to the metadata of its children.
+    tree = {None: [{"id": "root", "path": "/", "type": "directory"}]}
+    directories = [("root", "/", 0)]
+    while directories:
+        parent_id, parent_path, level = directories.pop()
+        children = []
+        if level < depth:
+            for i in range(breadth):
+                child_id = f"{parent_id}.d{i}"
+                child_path = f"{parent_path.rstrip('/')}/dir{i}"
+                children.append(
+                    {"id": child_id, "path": child_path, "type": "directory"}
+                )
+                directories.append((child_id, child_path, level + 1))
+        for i in range(files_per_directory):
+            children.append(
+                {
+                    "id": f"{parent_id}.f{i}",
+                    "path": f"{parent_path.rstrip('/')}/file{i}.txt",
+                    "type": "file",
+                }
+            )
+        tree[parent_id] = children
+    return tree
@@ -65,6 +65,26 @@ def convert_datetime_to_timestamp_str(date):
     return f"{prefix}Z"
 
 
+def parse_iso_datetime(value):
+    """Parses an ISO-8601 date str, such as the dates in server responses, to a
+    timezone-aware datetime. A trailing 'Z' means UTC, and so does a missing offset.
+
+    Args:
+        value (str): The str to parse.
+
+    Returns:
+        (datetime): The parsed datetime, or None if `value` is not a str or is not an
+        ISO-8601 date.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = dt.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.UTC)
+
+
 def convert_datetime_to_epoch(date):
     return date.timestamp()
 
@@ -3,6 +3,7 @@ from copy import deepcopy
 import pytest
 from tests.clients.conftest import param
 
+from pycpg.clients.settings import extract
 from pycpg.clients.settings import get_val
 from pycpg.clients.settings.device_settings import DeviceSettings
 from pycpg.exceptions import PycpgError
@@ -962,6 +963,60 @@ class TestDeviceSettingsBackupSets:
             {"@regex": NEW_REGEX},
         ]
 
+    def test_backup_set_batch_edit_rebuilds_file_selection_once_on_exit(
+        self, mocker, device_settings_with_empty_values
+    ):
+        device_settings = DeviceSettings(device_settings_with_empty_values)
+        backup_set = device_settings.backup_sets[0]
+        spy = mocker.spy(backup_set, "_build_file_selection")
+        with backup_set.batch_edit():
+            backup_set.included_files.append(TEST_HOME_DIR)
+            backup_set.included_files.append(TEST_EXTERNAL_DOCUMENTS_DIR)
+            backup_set.excluded_files.append(TEST_PHOTOS_DIR)
+            assert spy.call_count == 0
+            assert "included_files" not in device_settings.changes
+        assert spy.call_count == 1
+        assert backup_set["backupPaths"]["pathset"]["paths"]["path"] == [
+            {"@include": TEST_HOME_DIR, "@und": "false"},
+            {"@include": TEST_EXTERNAL_DOCUMENTS_DIR, "@und": "false"},
+            {"@exclude": TEST_PHOTOS_DIR, "@und": "false"},
+        ]
+        assert "included_files" in device_settings.changes
+        assert "excluded_files" in device_settings.changes
+
+    def test_backup_set_batch_edit_when_changes_undone_registers_no_change(
+        self, device_settings_with_multiple_values
+    ):
+        device_settings = DeviceSettings(device_settings_with_multiple_values)
+        backup_set = device_settings.backup_sets[0]
+        with backup_set.batch_edit():
+            backup_set.filename_exclusions.append(".*/Logs/")
+            backup_set.filename_exclusions.remove(".*/Logs/")
+        assert "filename_exclusions" not in device_settings.changes
+
+    def test_backup_set_batch_edit_when_nested_applies_changes_on_outer_exit(
+        self, device_settings_with_empty_values
+    ):
+        device_settings = DeviceSettings(device_settings_with_empty_values)
+        backup_set = device_settings.backup_sets[0]
+        with backup_set.batch_edit():
+            with backup_set.batch_edit():
+                backup_set.filename_exclusions.append(PHOTOS_REGEX)
+            assert "filename_exclusions" not in device_settings.changes
+        assert backup_set["backupPaths"]["excludeUser"]["patternList"]["pattern"] == [
+            {"@regex": PHOTOS_REGEX}
+        ]
+        assert "filename_exclusions" in device_settings.changes
+
+    def test_backup_set_included_files_setter_rebuilds_file_selection_once(
+        self, mocker, device_settings_with_multiple_values
+    ):
+        backup_set = DeviceSettings(device_settings_with_multiple_values).backup_sets[0]
+        spy = mocker.spy(backup_set, "_build_file_selection")
+        backup_set.included_files = [TEST_ADDED_PATH]
+        assert spy.call_count == 1
+        assert backup_set.included_files == [TEST_ADDED_PATH]
+
     def test_backup_set_when_locked_returns_expected_property_value(
         self, device_settings_with_locked_backup_set
     ):
@@ -1011,3 +1066,46 @@ class TestDeviceSettingsBackupSets:
         assert len(device_settings.backup_sets) == 1
         for bs in device_settings.backup_sets:
             assert bs["@id"] != TEST_LEGAL_HOLD_BACKUP_SET_ID
+
+
+class TestExtract:
+    def test_extract_returns_column_for_each_property(self):
+        first = DeviceSettings(deepcopy(DEVICE_DICT_W_SETTINGS))
+        second = DeviceSettings(deepcopy(DEVICE_DICT_W_SETTINGS))
+        second.name = "Second Device"
+        second.warning_alert_days = 3
+        columns = extract(
+            [first, second], ["name", "warning_alert_days", "critical_alert_days"]
+        )
+        assert columns == {
+            "name": [first.name, "Second Device"],
+            "warning_alert_days": [first.warning_alert_days, 3],
+            "critical_alert_days": [first.critical_alert_days] * 2,
+        }
+
+    def test_extract_matches_property_values(self):
+        device_settings = DeviceSettings(deepcopy(DEVICE_DICT_W_SETTINGS))
+        names = [
+            "notes",
+            "warning_email_enabled",
+            "backup_status_email_enabled",
+            "backup_status_email_frequency_days",
+            "java_memory_heap_max",
+        ]
+        columns = extract([device_settings], names)
+        assert columns == {name: [getattr(device_settings, name)] for name in names}
+
+    def test_extract_when_setting_locked_returns_value(self):
+        device_dict = deepcopy(DEVICE_DICT_W_SETTINGS)
+        device_dict["settings"]["serviceBackupConfig"]["warningEmailEnabled"] = {
+            "#text": "false",
+            "@locked": "true",
+        }
+        columns = extract([DeviceSettings(device_dict)], ["warning_email_enabled"])
+        assert columns == {"warning_email_enabled": [False]}
+
+    def test_extract_when_setting_missing_returns_none(self):
+        device_dict = deepcopy(DEVICE_DICT_W_SETTINGS)
+        del device_dict["computerExtRef"]
+        columns = extract([DeviceSettings(device_dict)], ["external_reference"])
+        assert columns == {"external_reference": [None]}
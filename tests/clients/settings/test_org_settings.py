@@ -11,6 +11,7 @@ from tests.clients.conftest import TEST_EXTERNAL_DOCUMENTS_DIR
 from tests.clients.conftest import TEST_HOME_DIR
 from tests.clients.conftest import TEST_PHOTOS_DIR
 
+from pycpg.clients.settings import extract
 from pycpg.clients.settings import get_val
 from pycpg.clients.settings.org_settings import OrgSettings
 from pycpg.exceptions import PycpgError
@@ -298,8 +299,8 @@ class TestOrgSettings:
             ),
             param(
                 name="maximum_user_subscriptions",
-                new_val=99,
-                expected_stored_val=99,
+                new_val=100,
+                expected_stored_val=100,
                 dict_location=["settings", "maxSeats"],
             ),
             param(
@@ -362,6 +363,61 @@ class TestOrgSettings:
         )
         assert param.name in org_settings.changes
 
+    def test_org_settings_changes_are_tracked_per_instance(self, org_settings_dict):
+        first = OrgSettings(deepcopy(org_settings_dict), TEST_T_SETTINGS_DICT)
+        second_dict = deepcopy(org_settings_dict)
+        second_dict["notes"] = "second note"
+        second = OrgSettings(second_dict, TEST_T_SETTINGS_DICT)
+
+        first.notes = "second note"
+        second.notes = "changed note"
+        second.notes = "second note"
+        assert first.changes == {"notes": '"test_note" -> "second note"'}
+        assert second.changes == {}
+
+    def test_org_settings_t_setting_changes_are_tracked_per_instance(
+        self, org_settings_dict
+    ):
+        first = OrgSettings(deepcopy(org_settings_dict), TEST_T_SETTINGS_DICT)
+        t_settings = deepcopy(TEST_T_SETTINGS_DICT)
+        t_settings["device_webRestore_enabled"]["value"] = "true"
+        second = OrgSettings(deepcopy(org_settings_dict), t_settings)
+
+        first.web_restore_enabled = True
+        second.web_restore_enabled = True
+        assert "web_restore_enabled" in first.changes
+        assert "web_restore_enabled" not in second.changes
+
+    def test_extract_reads_t_settings_and_dotted_paths(self, org_settings_dict):
+        org_settings = OrgSettings(org_settings_dict, TEST_T_SETTINGS_DICT)
+        columns = extract(
+            [org_settings],
+            ["org_name", "web_restore_enabled", "device_defaults.warning_alert_days"],
+        )
+        assert columns == {
+            "org_name": ["TEST_ORG"],
+            "web_restore_enabled": [False],
+            "device_defaults.warning_alert_days": [
+                org_settings.device_defaults.warning_alert_days
+            ],
+        }
+
+    def test_extract_when_t_setting_or_path_missing_returns_none(
+        self, org_settings_dict
+    ):
+        t_settings = deepcopy(TEST_T_SETTINGS_DICT)
+        del t_settings["device_webRestore_enabled"]
+        org_settings = OrgSettings(org_settings_dict, t_settings)
+        columns = extract(
+            [org_settings],
+            ["web_restore_enabled", "device_defaults.not_a_setting", "not_a_setting"],
+        )
+        assert columns == {
+            "web_restore_enabled": [None],
+            "device_defaults.not_a_setting": [None],
+            "not_a_setting": [None],
+        }
+
 
 class TestOrgDeviceSettingsDefaultsBackupSets:
     def test_backup_set_destinations_property_returns_expected_value(
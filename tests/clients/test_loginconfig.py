@@ -1,6 +1,7 @@
 import pytest
 from requests.sessions import Session
 
+import pycpg.settings as settings
 from pycpg.clients.loginconfig import LoginConfigurationClient
 from pycpg.services._connection import Connection
 
@@ -14,15 +15,26 @@ class TestLoginConfiguration:
         mock_session.headers = {}
         return mock_session
 
-    def test_get_for_user_calls_session_get_with_expected_uri_and_params(
+    def test_get_for_user_sends_request_with_expected_uri_and_params(
         self, mock_session
     ):
         connection = Connection.from_host_address(HOST_ADDRESS, session=mock_session)
         loginconfig = LoginConfigurationClient(connection)
         loginconfig.get_for_user("test@example.com")
-        expected_uri = f"https://{HOST_ADDRESS}/api/v3/LoginConfiguration"
-        expected_params = {"username": "test@example.com"}
-        mock_session.get.assert_called_once_with(expected_uri, params=expected_params)
+        request = mock_session.prepare_request.call_args[0][0]
+        assert request.url == f"https://{HOST_ADDRESS}/api/v3/LoginConfiguration"
+        assert request.params == {"username": "test@example.com"}
+        assert request.auth is None
+        assert mock_session.send.call_count == 1
+
+    def test_get_for_user_uses_proxy_and_ssl_settings(self, mocker, mock_session):
+        mocker.patch.object(settings, "proxies", {"https": "http://localhost:9999"})
+        mocker.patch.object(settings, "verify_ssl_certs", False)
+        connection = Connection.from_host_address(HOST_ADDRESS, session=mock_session)
+        LoginConfigurationClient(connection).get_for_user("test@example.com")
+        kwargs = mock_session.send.call_args[1]
+        assert kwargs["proxies"] == {"https": "http://localhost:9999"}
+        assert kwargs["verify"] is False
 
     def test_get_for_user_does_not_use_pycpg_connection_get_method(
         self, mocker, mock_session
@@ -36,4 +48,4 @@ class TestLoginConfiguration:
         loginconfig = LoginConfigurationClient(connection)
         loginconfig.get_for_user("test@example.com")
         assert mock_get.call_count == 0
-        assert mock_session.get.call_count == 1
+        assert mock_session.send.call_count == 1
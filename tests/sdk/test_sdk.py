@@ -1,3 +1,6 @@
+import subprocess
+import sys
+
 import pytest
 from requests import Session
 from tests.conftest import create_mock_response
@@ -16,7 +19,6 @@ from pycpg.services._auth import CPGRenewableAuth
 from pycpg.services._connection import Connection
 from pycpg.usercontext import UserContext
 
-
 HOST_ADDRESS = "https://example.com"
 TEST_USERNAME = "test-username"
 TEST_PASSWORD = "test-password"
@@ -77,14 +79,46 @@ class TestSDK:
         client = SDKClient(pycpg_connection, mock_auth)
         assert type(client.auditlogs) == AuditLogsClient
 
+    def test_does_not_create_services_until_used(self, pycpg_connection, mock_auth):
+        client = SDKClient(pycpg_connection, mock_auth)
+        assert client._components == {}
+        client.devices
+        assert list(client._components) == ["devices"]
+
+    def test_import_does_not_load_modules_used_only_by_connections(self):
+        script = (
+            "import sys, pycpg.sdk; "
+            "print(sorted(m for m in sys.modules if m.startswith('pycpg')))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script], check=True, capture_output=True, text=True
+        ).stdout
+        for module in ("_diskcache", "_singleflight", "_transport"):
+            assert f"pycpg.services.{module}" not in output
+
+    def test_returns_same_service_on_each_access(self, pycpg_connection, mock_auth):
+        client = SDKClient(pycpg_connection, mock_auth)
+        assert client.users is client.users
+
+    def test_user_context_uses_administration_service(
+        self, pycpg_connection, mock_auth
+    ):
+        client = SDKClient(pycpg_connection, mock_auth)
+        assert client.usercontext._administration_client is client.serveradmin
+
     def test_from_local_account_when_unauthorized_calls_loginConfig_and_returns_config_value_on_raised_exception_text(
         self, mocker, mock_session, mock_auth, unauthorized_response
     ):
         login_type = "LOCAL_2FA"
-        mock_session.send.return_value = unauthorized_response
-        mock_session.get.return_value = create_mock_response(
+        login_config_response = create_mock_response(
             mocker, f'{{"loginType": "{login_type}"}}'
         )
+        # The current user is requested twice before the login configuration.
+        mock_session.send.side_effect = [
+            unauthorized_response,
+            unauthorized_response,
+            login_config_response,
+        ]
         connection = Connection.from_host_address(HOST_ADDRESS, session=mock_session)
         client = SDKClient(connection, mock_auth)
         mocker.patch("pycpg.sdk.SDKClient.from_local_account", return_value=client)
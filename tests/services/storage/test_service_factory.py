@@ -3,11 +3,19 @@ from requests import Session
 from tests.conftest import create_mock_response
 from tests.conftest import TEST_DEVICE_GUID
 
+import pycpg.settings as settings
+from pycpg.cache import ResponseCache
+from pycpg.exceptions import PycpgDeviceNotConnectedError
 from pycpg.exceptions import PycpgError
+from pycpg.exceptions import PycpgInternalServerError
 from pycpg.services._connection import Connection
 from pycpg.services.devices import DeviceService
 from pycpg.services.storage._service_factory import StorageServiceFactory
 from pycpg.services.storage.archive import StorageArchiveService
+from pycpg.services.storage.restore import PushRestoreService
+from pycpg.testing import FakeCrashPlanServer
+
+WEB_RESTORE_INFO = "GET /api/v1/WebRestoreInfo"
 
 
 @pytest.fixture
@@ -39,6 +47,17 @@ def mock_connection_with_storage_lookup(mocker):
     return connection
 
 
+@pytest.fixture
+def server():
+    return FakeCrashPlanServer(org_count=1, user_count=3, device_count=3)
+
+
+@pytest.fixture
+def factory(server):
+    sdk = server.create_sdk()
+    return StorageServiceFactory(sdk._main_connection, sdk.devices)
+
+
 class TestStorageServiceFactory:
     def test_create_archive_service(
         self, mock_connection_with_storage_lookup, mock_device_service
@@ -85,3 +104,100 @@ class TestStorageServiceFactory:
         mock_device_service.get_by_guid.return_value = response
         with pytest.raises(PycpgError):
             factory.auto_select_destination_guid(TEST_DEVICE_GUID)
+
+    def test_create_archive_service_shares_connection_per_storage_url(
+        self, server, factory
+    ):
+        guids = [d["guid"] for d in server._devices]
+        services = [factory.create_archive_service(guid, "42") for guid in guids]
+        services += [factory.create_archive_service(guid, "42") for guid in guids]
+        assert len({id(s._connection) for s in services}) == 1
+        assert server.request_counts[WEB_RESTORE_INFO] == 3
+
+    def test_create_archive_service_when_node_failed_looks_up_url_again(
+        self, server, factory
+    ):
+        guid = server._devices[0]["guid"]
+        service = factory.create_archive_service(guid, "42")
+        server.error_rate = 1
+        with pytest.raises(PycpgInternalServerError):
+            service.create_restore_session(guid)
+        server.error_rate = 0
+        new_service = factory.create_archive_service(guid, "42")
+        assert server.request_counts[WEB_RESTORE_INFO] == 2
+        assert new_service._connection is not service._connection
+        new_service.create_restore_session(guid)
+        assert factory.create_archive_service(guid, "42") is new_service
+        assert server.request_counts[WEB_RESTORE_INFO] == 2
+
+    def test_create_archive_service_when_node_failed_does_not_use_cached_lookup(
+        self, server, factory
+    ):
+        settings.response_cache = ResponseCache()
+        guid = server._devices[0]["guid"]
+        try:
+            service = factory.create_archive_service(guid, "42")
+            server.error_rate = 1
+            with pytest.raises(PycpgInternalServerError):
+                service.create_restore_session(guid)
+            server.error_rate = 0
+            factory.create_archive_service(guid, "42")
+        finally:
+            settings.response_cache = None
+        assert server.request_counts[WEB_RESTORE_INFO] == 2
+
+    def test_create_push_restore_service_shares_connection_with_archive_services(
+        self, server, factory
+    ):
+        guid = server._devices[0]["guid"]
+        push_service = factory.create_push_restore_service(guid)
+        factory.create_push_restore_service(guid)
+        archive_service = factory.create_archive_service(guid, "42")
+        assert isinstance(push_service, PushRestoreService)
+        assert push_service._connection is archive_service._connection
+        assert server.request_counts["GET /api/v1/connectedServerUrl"] == 1
+
+    def test_create_push_restore_service_looks_up_server_again_after_ttl(
+        self, mocker, server, factory
+    ):
+        mocker.patch("pycpg.services.storage._service_factory._PUSH_LOCATION_TTL", 0)
+        guid = server._devices[0]["guid"]
+        factory.create_push_restore_service(guid)
+        factory.create_push_restore_service(guid)
+        assert server.request_counts["GET /api/v1/connectedServerUrl"] == 2
+
+    def test_create_push_restore_service_when_device_disconnects_raises(
+        self, mocker, server, factory
+    ):
+        mocker.patch("pycpg.services.storage._service_factory._PUSH_LOCATION_TTL", 0)
+        guid = server._devices[0]["guid"]
+        factory.create_push_restore_service(guid)
+        server.host_address = None
+        with pytest.raises(PycpgDeviceNotConnectedError):
+            factory.create_push_restore_service(guid)
+
+    def test_get_node_stats_reports_requests_and_errors(self, server, factory):
+        guid = server._devices[0]["guid"]
+        service = factory.create_archive_service(guid, "42")
+        service.create_restore_session(guid)
+        server.error_rate = 1
+        with pytest.raises(PycpgInternalServerError):
+            service.create_restore_session(guid)
+        (stats,) = factory.get_node_stats()
+        assert stats.url == server.host_address
+        assert stats.requests == 3
+        assert stats.errors == 2
+        assert stats.average_latency >= 0
+        assert stats.failed
+
+    def test_create_archive_service_keeps_most_recently_used_nodes(
+        self, mocker, mock_connection_with_storage_lookup, mock_device_service
+    ):
+        mocker.patch("pycpg.services.storage._service_factory._MAX_STORAGE_NODES", 2)
+        factory = StorageServiceFactory(
+            mock_connection_with_storage_lookup, mock_device_service
+        )
+        for guid in ("1", "2", "3"):
+            factory.create_archive_service(guid, "4")
+        urls = [stats.url for stats in factory.get_node_stats()]
+        assert urls == ["2-4", "3-4"]
@@ -1,12 +1,43 @@
+import base64
+import json
+
 import pytest
 from requests import Request
+from tests.conftest import create_mock_error
 from tests.conftest import create_mock_response
 
+import pycpg.settings as settings
+from pycpg.exceptions import PycpgUnauthorizedError
 from pycpg.services._auth import ApiClientAuth
 from pycpg.services._auth import BearerAuth
 from pycpg.services._auth import CustomJWTAuth
 
 
+def _create_jwt(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=")
+    return f"eyJhbGciOiJIUzI1NiJ9.{payload.decode()}.c2lnbmF0dXJl"
+
+
+@pytest.fixture
+def mock_clock(mocker):
+    clock = {"now": 1000.0}
+    mocker.patch("pycpg.services._auth.monotonic", side_effect=lambda: clock["now"])
+    mocker.patch("pycpg.services._auth.time", side_effect=lambda: clock["now"])
+    return clock
+
+
+@pytest.fixture
+def sync_thread(mocker):
+    class _SyncThread:
+        def __init__(self, target, daemon=None):
+            self._target = target
+
+        def start(self):
+            self._target()
+
+    return mocker.patch("pycpg.services._auth.Thread", side_effect=_SyncThread)
+
+
 @pytest.fixture
 def mock_request(mocker):
     mock = mocker.MagicMock(spec=Request)
@@ -131,3 +162,168 @@ class TestApiClientAuth:
         auth.clear_credentials()
         auth(mock_request)
         assert mock_api_client_conn.post.call_count == 2
+
+
+class TestCredentialExpiry:
+    def test_get_credentials_before_refresh_time_does_not_renew(
+        self, mock_clock, sync_thread
+    ):
+        tokens = iter([_create_jwt({"exp": 1000 + 3600}), "second"])
+        auth = CustomJWTAuth(lambda: next(tokens))
+        first = auth.get_credentials()
+        mock_clock["now"] += 3500
+        assert auth.get_credentials() == first
+        assert not sync_thread.called
+
+    def test_get_credentials_near_jwt_expiry_refreshes_in_background(
+        self, mock_clock, sync_thread
+    ):
+        tokens = iter([_create_jwt({"exp": 1000 + 3600}), "second"])
+        auth = CustomJWTAuth(lambda: next(tokens))
+        first = auth.get_credentials()
+        mock_clock["now"] += 3550
+        # The current token is returned while the refresh runs.
+        assert auth.get_credentials() == first
+        assert sync_thread.call_count == 1
+        assert auth.get_credentials() == "Bearer second"
+
+    def test_get_credentials_after_jwt_expiry_renews_before_returning(
+        self, mock_clock, sync_thread
+    ):
+        tokens = iter([_create_jwt({"exp": 1000 + 3600}), "second"])
+        auth = CustomJWTAuth(lambda: next(tokens))
+        auth.get_credentials()
+        mock_clock["now"] += 3600
+        assert auth.get_credentials() == "Bearer second"
+        assert not sync_thread.called
+
+    def test_get_credentials_when_background_refresh_fails_keeps_current_credentials(
+        self, mock_clock, sync_thread
+    ):
+        def provider():
+            if calls:
+                raise Exception("auth server down")
+            calls.append(1)
+            return _create_jwt({"exp": 1000 + 3600})
+
+        calls = []
+        auth = CustomJWTAuth(provider)
+        first = auth.get_credentials()
+        mock_clock["now"] += 3550
+        assert auth.get_credentials() == first
+        assert auth.get_credentials() == first
+        assert sync_thread.call_count == 1
+
+    def test_get_credentials_when_background_refresh_unauthorized_does_not_retry(
+        self, mocker, mock_clock, sync_thread
+    ):
+        def provider():
+            if calls:
+                raise create_mock_error(PycpgUnauthorizedError, mocker, "bad totp")
+            calls.append(1)
+            return _create_jwt({"exp": 1000 + 3600})
+
+        calls = []
+        auth = CustomJWTAuth(provider)
+        first = auth.get_credentials()
+        mock_clock["now"] += 3550
+        assert auth.get_credentials() == first
+        mock_clock["now"] += 30
+        assert auth.get_credentials() == first
+        assert sync_thread.call_count == 1
+
+    def test_get_credentials_when_totp_is_fixed_does_not_refresh_early(
+        self, mocker, mock_clock, sync_thread, mock_connection
+    ):
+        token = _create_jwt({"exp": 1000 + 3600})
+        mock_connection.get.return_value = create_mock_response(
+            mocker, json.dumps({"v3_user_token": token})
+        )
+        auth = BearerAuth(mock_connection, "123456")
+        auth.get_credentials()
+        mock_clock["now"] += 3550
+        auth.get_credentials()
+        assert not sync_thread.called
+        assert mock_connection.get.call_count == 1
+        mock_clock["now"] += 50
+        auth.get_credentials()
+        assert mock_connection.get.call_count == 2
+
+    def test_get_credentials_when_token_is_not_jwt_never_refreshes(
+        self, mock_clock, sync_thread, mock_custom_auth_function
+    ):
+        auth = CustomJWTAuth(mock_custom_auth_function)
+        auth.get_credentials()
+        mock_clock["now"] += 10**6
+        assert auth.get_credentials() == "Bearer token-string"
+        assert not sync_thread.called
+
+    def test_get_credentials_when_cleared_concurrently_returns_credentials(
+        self, mocker, mock_clock, sync_thread
+    ):
+        auth = CustomJWTAuth(lambda: _create_jwt({"exp": 1000 + 3600}))
+        first = auth.get_credentials()
+        cleared = []
+
+        def clear_while_reading_clock():
+            # Another thread clears the credentials after a 401 during the read.
+            if not cleared:
+                cleared.append(1)
+                auth.clear_credentials()
+            return mock_clock["now"]
+
+        mocker.patch(
+            "pycpg.services._auth.monotonic", side_effect=clear_while_reading_clock
+        )
+        assert auth.get_credentials() == first
+
+    def test_api_client_auth_uses_expires_in_for_refresh(
+        self, mock_clock, sync_thread, mock_api_client_conn, mock_request
+    ):
+        auth = ApiClientAuth(mock_api_client_conn)
+        auth(mock_request)
+        mock_clock["now"] += 800
+        auth(mock_request)
+        assert mock_api_client_conn.post.call_count == 1
+        mock_clock["now"] += 50
+        auth(mock_request)
+        assert mock_api_client_conn.post.call_count == 2
+
+
+class TestDiskCachedCredentials:
+    @pytest.fixture
+    def disk_cache_path(self, mocker, tmp_path):
+        path = str(tmp_path / "pycpg.json")
+        mocker.patch.object(settings, "disk_cache_path", path)
+        return path
+
+    def test_get_credentials_reuses_credentials_from_other_instance(
+        self, disk_cache_path, mock_api_client_conn
+    ):
+        ApiClientAuth(mock_api_client_conn, cache_key="key").get_credentials()
+        auth = ApiClientAuth(mock_api_client_conn, cache_key="key")
+        assert auth.get_credentials() == "Bearer API_CLIENT_VAL"
+        assert mock_api_client_conn.post.call_count == 1
+
+    def test_get_credentials_without_cache_key_does_not_share_credentials(
+        self, disk_cache_path, mock_api_client_conn
+    ):
+        ApiClientAuth(mock_api_client_conn).get_credentials()
+        ApiClientAuth(mock_api_client_conn).get_credentials()
+        assert mock_api_client_conn.post.call_count == 2
+
+    def test_clear_credentials_removes_credentials_from_disk_cache(
+        self, disk_cache_path, mock_api_client_conn
+    ):
+        auth = ApiClientAuth(mock_api_client_conn, cache_key="key")
+        auth.get_credentials()
+        auth.clear_credentials()
+        ApiClientAuth(mock_api_client_conn, cache_key="key").get_credentials()
+        assert mock_api_client_conn.post.call_count == 2
+
+    def test_get_credentials_when_token_has_no_expiry_does_not_cache(
+        self, disk_cache_path, mock_v3_conn
+    ):
+        BearerAuth(mock_v3_conn, cache_key="key").get_credentials()
+        BearerAuth(mock_v3_conn, cache_key="key").get_credentials()
+        assert mock_v3_conn.get.call_count == 2
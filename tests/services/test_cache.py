@@ -0,0 +1,49 @@
+from pycpg.services._cache import TTLCache
+
+
+class TestTTLCache:
+    def test_get_returns_set_value(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+        assert "key" in cache
+
+    def test_get_when_expired_returns_default(self, mocker):
+        clock = mocker.patch("pycpg.services._cache.monotonic")
+        clock.return_value = 100
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("key", "value")
+        clock.return_value = 161
+        assert cache.get("key", "default") == "default"
+        assert len(cache) == 0
+
+    def test_len_does_not_count_expired_entries(self, mocker):
+        clock = mocker.patch("pycpg.services._cache.monotonic")
+        clock.return_value = 100
+        cache = TTLCache(maxsize=3, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=120)
+        clock.return_value = 161
+        assert len(cache) == 1
+        assert "b" in cache
+
+    def test_set_when_full_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_contains_when_value_is_none_returns_true(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("key", None)
+        assert "key" in cache
+
+    def test_pop_removes_value(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("key", "value")
+        assert cache.pop("key") == "value"
+        assert cache.pop("key") is None
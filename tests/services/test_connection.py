@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from requests import Response
 from tests.conftest import TEST_DEVICE_GUID
@@ -17,6 +19,7 @@ from pycpg.services._connection import KnownUrlHostResolver
 from pycpg.services._connection import MicroserviceKeyHostResolver
 from pycpg.services._connection import MicroservicePrefixHostResolver
 from pycpg.services._keyvaluestore import KeyValueStoreService
+from pycpg.testing import FakeCrashPlanServer
 
 default_kwargs = {
     "timeout": 60,
@@ -94,6 +97,19 @@ def proxy_set():
     settings.proxies = None
 
 
+@pytest.fixture
+def coalesce_get_requests_set():
+    settings.coalesce_get_requests = True
+    yield
+    settings.coalesce_get_requests = False
+
+
+def _get_concurrently(get, count=8):
+    with ThreadPoolExecutor(count) as executor:
+        futures = [executor.submit(get) for _ in range(count)]
+        return [f.result() for f in futures]
+
+
 class MockPreparedRequest:
     def __init__(self, method, url, data=None, json=None):
         self._method = method
@@ -146,6 +162,18 @@ class TestMicroservicePrefixHostResolver:
         resolver.get_host_address()
         mock_server_env_conn.get.assert_called_once_with("/api/v1/ServerEnv")
 
+    def test_get_host_address_when_disk_cache_enabled_reuses_resolved_host(
+        self, mocker, tmp_path, mock_server_env_conn
+    ):
+        mocker.patch.object(settings, "disk_cache_path", str(tmp_path / "c.json"))
+        mock_server_env_conn.host_address = HOST_ADDRESS
+        for _ in range(2):
+            resolver = MicroservicePrefixHostResolver(
+                mock_server_env_conn, "TESTPREFIX"
+            )
+            assert resolver.get_host_address() == "TESTPREFIX-testsuffix"
+        assert mock_server_env_conn.get.call_count == 1
+
 
 class TestConnectedServerHostResolver:
     def test_get_host_address_returns_expected_value(self, mock_connected_server_conn):
@@ -357,6 +385,35 @@ class TestConnection:
         request = success_requests_session.prepare_request.call_args[0][0]
         assert request.headers.get("Foo") is None
 
+    def test_connection_request_does_not_modify_given_headers(
+        self, mock_host_resolver, mock_auth, success_requests_session
+    ):
+        connection = Connection(mock_host_resolver, mock_auth, success_requests_session)
+        headers = {"Foo": "Bar"}
+        connection.put(URL, data='{"foo":"bar"}', headers=headers)
+        assert headers == {"Foo": "Bar"}
+
+    def test_connection_request_when_user_agent_changes_uses_new_user_agent(
+        self, mock_host_resolver, mock_auth, success_requests_session
+    ):
+        connection = Connection(mock_host_resolver, mock_auth, success_requests_session)
+        connection.get(URL)
+        settings.set_user_agent_suffix("example-suffix")
+        try:
+            connection.get(URL)
+        finally:
+            settings.set_user_agent_suffix("")
+        request = success_requests_session.prepare_request.call_args[0][0]
+        assert request.headers["User-Agent"].endswith(" example-suffix")
+
+    def test_connection_request_when_url_has_dot_segments_resolves_url(
+        self, mock_host_resolver, mock_auth, success_requests_session
+    ):
+        connection = Connection(mock_host_resolver, mock_auth, success_requests_session)
+        connection.get("/api/v1/../resource")
+        request = success_requests_session.prepare_request.call_args[0][0]
+        assert request.url == f"{HOST_ADDRESS}/api/resource"
+
     def test_connection_request_includes_user_agent_header(
         self, mock_host_resolver, mock_auth, success_requests_session
     ):
@@ -405,3 +462,38 @@ class TestConnection:
         connection.delete(url)
         for call in success_requests_session.send.call_args_list:
             assert call[1]["proxies"] == {"https": "http://localhost:9999"}
+
+    def test_connection_get_when_coalescing_shares_concurrent_identical_requests(
+        self, coalesce_get_requests_set
+    ):
+        server = FakeCrashPlanServer(latency=0.2)
+        sdk = server.create_sdk()
+        responses = _get_concurrently(sdk.users.get_current)
+        assert server.request_counts["GET /api/v1/User/my"] == 1
+        assert all(r["userUid"] == responses[0]["userUid"] for r in responses)
+        assert len({id(r.data) for r in responses}) == len(responses)
+
+    def test_connection_get_when_coalescing_does_not_share_different_params(
+        self, coalesce_get_requests_set
+    ):
+        server = FakeCrashPlanServer(latency=0.1)
+        sdk = server.create_sdk()
+        _get_concurrently(lambda: sdk.users.get_current(incAll=True), 4)
+        _get_concurrently(lambda: sdk.users.get_current(incAll=False), 4)
+        assert server.request_counts["GET /api/v1/User/my"] == 2
+
+    def test_connection_get_when_coalescing_raises_error_for_every_caller(
+        self, coalesce_get_requests_set
+    ):
+        server = FakeCrashPlanServer(latency=0.2, error_rate=1)
+        sdk = server.create_sdk()
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(sdk.users.get_current) for _ in range(4)]
+        for future in futures:
+            assert isinstance(future.exception(), PycpgInternalServerError)
+
+    def test_connection_get_when_not_coalescing_sends_every_request(self):
+        server = FakeCrashPlanServer(latency=0.1)
+        sdk = server.create_sdk()
+        _get_concurrently(sdk.users.get_current, 4)
+        assert server.request_counts["GET /api/v1/User/my"] == 4
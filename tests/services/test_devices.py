@@ -1,3 +1,6 @@
+import json
+from threading import Event
+
 import pytest
 from requests import HTTPError
 from requests import Response
@@ -205,3 +208,85 @@ class TestDeviceService:
         client.update_settings(settings)
         uri = f"/api/v1/Computer/{device_id}"
         mock_connection.put.assert_called_once_with(uri, json=settings)
+
+    @pytest.fixture
+    def device_settings_connection(self, mocker, mock_connection):
+        def get(uri, params=None):
+            guid = uri.rsplit("/", 1)[1]
+            device = {
+                "computerId": f"id-{guid}",
+                "guid": guid,
+                "name": "device",
+                "availableDestinations": [],
+                "settings": {
+                    "configDateMs": "123",
+                    "serviceBackupConfig": {"backupConfig": {"backupSets": []}},
+                },
+            }
+            return create_mock_response(mocker, json.dumps({"data": device}))
+
+        mock_connection.get.side_effect = get
+        return mock_connection
+
+    def test_bulk_update_settings_puts_changed_devices(
+        self, device_settings_connection
+    ):
+        def rename(device_settings):
+            device_settings.name = f"renamed-{device_settings.guid}"
+
+        client = DeviceService(device_settings_connection)
+        results = client.bulk_update_settings(["1", "2"], rename)
+        assert sorted(r.guid for r in results) == ["1", "2"]
+        assert all(r.error is None and r.changes for r in results)
+        assert device_settings_connection.put.call_count == 2
+
+    def test_bulk_update_settings_returns_results_in_order_of_guids(
+        self, device_settings_connection
+    ):
+        second_done = Event()
+
+        def rename(device_settings):
+            # The first device's update finishes last.
+            if device_settings.guid == "1":
+                second_done.wait(timeout=5)
+            else:
+                second_done.set()
+            device_settings.name = "renamed"
+
+        client = DeviceService(device_settings_connection)
+        results = client.bulk_update_settings(["1", "2"], rename, max_workers=2)
+        assert [r.guid for r in results] == ["1", "2"]
+
+    def test_bulk_update_settings_skips_devices_without_changes(
+        self, device_settings_connection
+    ):
+        client = DeviceService(device_settings_connection)
+        results = client.bulk_update_settings(["1"], lambda s: None)
+        assert results[0].changes == {}
+        assert results[0].response is None
+        assert not device_settings_connection.put.call_count
+
+    def test_bulk_update_settings_when_dry_run_does_not_put(
+        self, device_settings_connection
+    ):
+        def rename(device_settings):
+            device_settings.name = "renamed"
+
+        client = DeviceService(device_settings_connection)
+        results = client.bulk_update_settings(["1"], rename, dry_run=True)
+        assert results[0].changes
+        assert not device_settings_connection.put.call_count
+
+    def test_bulk_update_settings_reports_errors_per_device(
+        self, mocker, device_settings_connection
+    ):
+        device_settings_connection.put.side_effect = create_mock_error(
+            PycpgBadRequestError, mocker, "BAD REQUEST"
+        )
+
+        def rename(device_settings):
+            device_settings.name = "renamed"
+
+        client = DeviceService(device_settings_connection)
+        results = client.bulk_update_settings(["1"], rename)
+        assert isinstance(results[0].error, PycpgBadRequestError)
@@ -0,0 +1,72 @@
+import os
+import stat
+
+import pytest
+
+import pycpg.settings as settings
+from pycpg.services._diskcache import DiskCache
+from pycpg.services._diskcache import get_disk_cache
+from pycpg.services._diskcache import make_cache_key
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache" / "pycpg.json")
+
+
+class TestDiskCache:
+    def test_get_returns_value_set_by_other_instance(self, cache_path):
+        DiskCache(cache_path).set("key", {"a": 1}, ttl=60)
+        assert DiskCache(cache_path).get("key") == {"a": 1}
+
+    def test_get_when_expired_returns_none(self, mocker, cache_path):
+        clock = mocker.patch("pycpg.services._diskcache.time")
+        clock.return_value = 1000
+        cache = DiskCache(cache_path)
+        cache.set("key", "value", ttl=60)
+        clock.return_value = 1061
+        assert cache.get("key") is None
+
+    def test_get_when_file_is_missing_returns_none(self, cache_path):
+        assert DiskCache(cache_path).get("key") is None
+
+    def test_get_when_file_is_corrupt_returns_none(self, cache_path):
+        cache = DiskCache(cache_path)
+        cache.set("key", "value", ttl=60)
+        with open(cache_path, "w") as cache_file:
+            cache_file.write("{not json")
+        assert cache.get("key") is None
+
+    def test_pop_removes_value(self, cache_path):
+        cache = DiskCache(cache_path)
+        cache.set("key", "value", ttl=60)
+        cache.pop("key")
+        assert cache.get("key") is None
+
+    def test_set_keeps_other_values(self, cache_path):
+        cache = DiskCache(cache_path)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        assert cache.get("a") == 1
+        assert cache.get("b") == 2
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+    def test_set_creates_file_readable_only_by_owner(self, cache_path):
+        DiskCache(cache_path).set("key", "value", ttl=60)
+        assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+
+
+def test_get_disk_cache_when_path_not_set_returns_none(mocker):
+    mocker.patch.object(settings, "disk_cache_path", None)
+    assert get_disk_cache() is None
+
+
+def test_get_disk_cache_when_path_set_returns_cache(mocker, cache_path):
+    mocker.patch.object(settings, "disk_cache_path", cache_path)
+    assert get_disk_cache().path == cache_path
+
+
+def test_make_cache_key_does_not_contain_parts():
+    key = make_cache_key("api-client", "host", "secret-value")
+    assert "secret-value" not in key
+    assert key == make_cache_key("api-client", "host", "secret-value")
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from tests.conftest import create_mock_error
 from tests.conftest import create_mock_response
@@ -451,3 +453,60 @@ class TestLegalHoldService:
             err.value.args[0]
             == f"Matter with UID '{TEST_MATTER_UID}' can not be found. Your account may not have permission to view the matter."
         )
+
+    @pytest.fixture
+    def matter_custodians_connection(self, mocker, mock_connection):
+        memberships = [
+            {"legalHoldMembershipUid": "m-1", "user": {"userUid": "user-1"}},
+            {"legalHoldMembershipUid": "m-2", "user": {"userUid": "user-2"}},
+        ]
+        mock_connection.get.return_value = create_mock_response(
+            mocker, json.dumps(memberships)
+        )
+        return mock_connection
+
+    def test_sync_matter_custodians_adds_and_removes_only_differences(
+        self, matter_custodians_connection
+    ):
+        service = LegalHoldService(matter_custodians_connection)
+        report = service.sync_matter_custodians(TEST_MATTER_UID, ["user-2", "user-3"])
+        assert report.added == ["user-3"]
+        assert report.removed == ["user-1"]
+        assert report.unchanged == 1
+        assert report.errors == {}
+        matter_custodians_connection.post.assert_any_call(
+            f"{BASE_URI}/legal-hold-membership/create",
+            json={"legalHoldUid": TEST_MATTER_UID, "userUid": "user-3"},
+        )
+        matter_custodians_connection.post.assert_any_call(
+            f"{BASE_URI}/legal-hold-membership/deactivate",
+            json={"legalHoldMembershipUid": "m-1"},
+        )
+        assert matter_custodians_connection.post.call_count == 2
+
+    def test_sync_matter_custodians_when_dry_run_makes_no_changes(
+        self, matter_custodians_connection
+    ):
+        service = LegalHoldService(matter_custodians_connection)
+        report = service.sync_matter_custodians(
+            TEST_MATTER_UID, ["user-3"], dry_run=True
+        )
+        assert report.added == ["user-3"]
+        assert sorted(report.removed) == ["user-1", "user-2"]
+        assert not matter_custodians_connection.post.call_count
+
+    def test_sync_matter_custodians_reports_errors_per_user(
+        self, mocker, matter_custodians_connection
+    ):
+        matter_custodians_connection.post.side_effect = create_mock_error(
+            PycpgForbiddenError, mocker, ""
+        )
+        service = LegalHoldService(matter_custodians_connection)
+        report = service.sync_matter_custodians(TEST_MATTER_UID, ["user-1", "user-2"])
+        assert report.added == report.removed == []
+        assert report.errors == {}
+
+        report = service.sync_matter_custodians(TEST_MATTER_UID, ["user-1"])
+        assert isinstance(
+            report.errors["user-2"], PycpgLegalHoldNotFoundOrPermissionDeniedError
+        )
@@ -1,10 +1,16 @@
+import json
+from copy import deepcopy
 from unittest.mock import patch
 
 import pytest
+from tests.clients.settings.test_org_settings import TEST_T_SETTINGS_DICT
 from tests.conftest import create_mock_error
 from tests.conftest import create_mock_response
 
 import pycpg.settings
+from pycpg.bulk import BulkProgress
+from pycpg.clients.settings.org_settings import OrgSettings
+from pycpg.exceptions import PycpgBadRequestError
 from pycpg.exceptions import PycpgInternalServerError
 from pycpg.services.orgs import OrgService
 
@@ -193,3 +199,149 @@ class TestOrgService:
         uri = f"{ORGS_V3_URI}/{TEST_ORG_GUID}"
         data = {"orgName": "new org name", "orgExtRef": "123", "notes": "new org notes"}
         mock_connection.put.assert_called_once_with(uri, json=data)
+
+    @pytest.fixture
+    def org_settings_service(self, mocker, mock_connection):
+        with open("tests/clients/settings/org_settings_not_inherited.json") as f:
+            org_dict = json.load(f)["data"]
+
+        def get_settings(org_id):
+            data = deepcopy(org_dict)
+            data["orgId"] = org_id
+            return OrgSettings(data, deepcopy(TEST_T_SETTINGS_DICT))
+
+        mocker.patch("pycpg.services.orgs._RETRY_DELAY", 0)
+        service = OrgService(mock_connection)
+        mocker.patch.object(service, "get_settings", side_effect=get_settings)
+        return service
+
+    @staticmethod
+    def _put_uris(mock_connection):
+        return sorted(c.args[0] for c in mock_connection.put.call_args_list)
+
+    @staticmethod
+    def _change_settings(org_settings):
+        org_settings.archive_hold_days = 90
+        org_settings.web_restore_enabled = True
+
+    def test_bulk_update_settings_puts_org_and_packets_for_changed_orgs(
+        self, mock_connection, org_settings_service
+    ):
+        report = org_settings_service.bulk_update_settings(
+            [1, 2], self._change_settings
+        )
+        assert sorted(report.changed) == [1, 2]
+        assert report.errors == {}
+        assert set(report.changes[1]) == {"archive_hold_days", "web_restore_enabled"}
+        assert self._put_uris(mock_connection) == [
+            "/api/v1/Org/1",
+            "/api/v1/Org/2",
+            "/api/v1/OrgSetting/1",
+            "/api/v1/OrgSetting/2",
+        ]
+
+    def test_bulk_update_settings_skips_orgs_without_changes(
+        self, mock_connection, org_settings_service
+    ):
+        report = org_settings_service.bulk_update_settings([1], lambda s: None)
+        assert report.unchanged == [1]
+        assert report.changed == []
+        assert not mock_connection.put.call_count
+
+    def test_bulk_update_settings_when_dry_run_does_not_put(
+        self, mock_connection, org_settings_service
+    ):
+        report = org_settings_service.bulk_update_settings(
+            [1], self._change_settings, dry_run=True
+        )
+        assert report.changed == [1]
+        assert report.changes[1]
+        assert not mock_connection.put.call_count
+
+    def test_bulk_update_settings_retries_only_failed_request(
+        self, mocker, mock_connection, org_settings_service
+    ):
+        server_error = create_mock_error(PycpgInternalServerError, mocker, "error")
+        failures = [server_error]
+
+        def put(uri, json=None):
+            if uri.startswith("/api/v1/OrgSetting/") and failures:
+                raise failures.pop()
+
+        mock_connection.put.side_effect = put
+        report = org_settings_service.bulk_update_settings([1], self._change_settings)
+        assert report.changed == [1]
+        assert self._put_uris(mock_connection) == [
+            "/api/v1/Org/1",
+            "/api/v1/OrgSetting/1",
+            "/api/v1/OrgSetting/1",
+        ]
+
+    def test_bulk_update_settings_when_retries_exhausted_reports_error(
+        self, mocker, mock_connection, org_settings_service
+    ):
+        mock_connection.put.side_effect = create_mock_error(
+            PycpgInternalServerError, mocker, "error"
+        )
+        report = org_settings_service.bulk_update_settings(
+            [1], self._change_settings, retries=1
+        )
+        assert isinstance(report.errors[1], PycpgInternalServerError)
+        assert mock_connection.put.call_count == 4
+
+    def test_bulk_update_settings_does_not_retry_bad_requests(
+        self, mocker, mock_connection, org_settings_service
+    ):
+        mock_connection.put.side_effect = create_mock_error(
+            PycpgBadRequestError, mocker, "BAD REQUEST"
+        )
+        report = org_settings_service.bulk_update_settings([1], self._change_settings)
+        assert isinstance(report.errors[1], PycpgBadRequestError)
+        assert mock_connection.put.call_count == 2
+
+    def test_bulk_update_settings_when_orgs_span_pages_finds_every_org(
+        self, mocker, mock_connection
+    ):
+        with open("tests/clients/settings/org_settings_not_inherited.json") as f:
+            org_dict = json.load(f)["data"]
+        orgs = [{"orgId": i, "orgGuid": f"guid-{i}"} for i in range(1, 701)]
+
+        def get(uri, params=None):
+            if uri == COMPUTER_URI:
+                end = params["pgNum"] * params["pgSize"]
+                start = end - params["pgSize"]
+                page = orgs[start:end]
+                text = json.dumps({"totalCount": len(orgs), "orgs": page})
+            elif uri.startswith(ORGS_V3_URI):
+                org_id = int(uri.rsplit("-", 1)[1])
+                text = json.dumps({**org_dict, "orgId": org_id})
+            else:
+                text = json.dumps({"data": TEST_T_SETTINGS_DICT})
+            return create_mock_response(mocker, text)
+
+        mock_connection.get.side_effect = get
+        service = OrgService(mock_connection)
+        report = service.bulk_update_settings([1, 600], self._change_settings)
+        assert report.errors == {}
+        assert sorted(report.changed) == [1, 600]
+
+    def test_bulk_update_settings_with_progress_skips_orgs_already_updated(
+        self, mocker, mock_connection, org_settings_service
+    ):
+        def put(uri, json=None):
+            if uri.endswith("/2"):
+                raise create_mock_error(PycpgBadRequestError, mocker, "BAD REQUEST")
+
+        mock_connection.put.side_effect = put
+        progress = BulkProgress()
+        first = org_settings_service.bulk_update_settings(
+            [1, 2], self._change_settings, progress=progress
+        )
+        assert first.changed == [1]
+        assert list(first.errors) == [2]
+
+        mock_connection.put.side_effect = None
+        second = org_settings_service.bulk_update_settings(
+            [1, 2], self._change_settings, progress=progress
+        )
+        assert second.changed == [2]
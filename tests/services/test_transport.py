@@ -0,0 +1,145 @@
+import sys
+
+import pytest
+from requests import Request
+from requests.exceptions import ConnectionError
+from requests.exceptions import Timeout
+from requests.sessions import Session
+
+import pycpg.services._connection as connection_module
+import pycpg.settings as settings
+from pycpg.exceptions import PycpgError
+from pycpg.services._connection import Connection
+from pycpg.services._transport import HTTP2Transport
+from pycpg.services._transport import RequestsTransport
+
+URL = "https://example.com/api/v1/Computer"
+
+
+@pytest.fixture
+def httpx():
+    return pytest.importorskip("httpx")
+
+
+@pytest.fixture
+def sent_requests():
+    return []
+
+
+@pytest.fixture
+def http2_transport(mocker, httpx, sent_requests):
+    def handler(request):
+        sent_requests.append(request)
+        if request.url.path == "/timeout":
+            raise httpx.ReadTimeout("timed out", request=request)
+        if request.url.path == "/refused":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+            stream=httpx.ByteStream(b'{"data": {"key": "value"}}'),
+        )
+
+    transport = HTTP2Transport()
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    mocker.patch.object(transport, "_create_client", return_value=client)
+    return transport
+
+
+def _prepare(url=URL, method="GET", **kwargs):
+    return Request(method, url, **kwargs).prepare()
+
+
+class TestRequestsTransport:
+    def test_send_passes_request_and_options_to_session(self, mocker):
+        session = mocker.MagicMock(spec=Session)
+        transport = RequestsTransport(session)
+        request = _prepare()
+        transport.send(request, stream=True, timeout=10, verify=False)
+        session.send.assert_called_once_with(
+            request, stream=True, timeout=10, verify=False, cert=None, proxies=None
+        )
+
+    def test_prepare_request_uses_session(self, mocker):
+        session = mocker.MagicMock(spec=Session)
+        transport = RequestsTransport(session)
+        request = Request("GET", URL)
+        transport.prepare_request(request)
+        session.prepare_request.assert_called_once_with(request)
+
+
+class TestHTTP2Transport:
+    def test_send_returns_requests_response(self, http2_transport):
+        request = _prepare()
+        response = http2_transport.send(request)
+        assert response.status_code == 200
+        assert response.json() == {"data": {"key": "value"}}
+        assert response.encoding == "utf-8"
+        assert response.request is request
+
+    def test_send_sends_method_url_headers_and_body(
+        self, http2_transport, sent_requests
+    ):
+        request = _prepare(method="POST", headers={"X-Test": "1"}, data="body")
+        http2_transport.send(request)
+        sent = sent_requests[0]
+        assert sent.method == "POST"
+        assert str(sent.url) == URL
+        assert sent.headers["X-Test"] == "1"
+        assert sent.content == b"body"
+
+    def test_send_does_not_send_http1_connection_headers(
+        self, http2_transport, sent_requests
+    ):
+        request = _prepare(headers={"Keep-Alive": "timeout=5", "Upgrade": "h2c"})
+        http2_transport.send(request)
+        assert "Keep-Alive" not in sent_requests[0].headers
+        assert "Upgrade" not in sent_requests[0].headers
+
+    def test_send_when_streaming_returns_iterable_content(self, http2_transport):
+        response = http2_transport.send(_prepare(), stream=True)
+        content = b"".join(response.iter_content(chunk_size=4))
+        assert content == b'{"data": {"key": "value"}}'
+
+    def test_send_when_timed_out_raises_requests_timeout(self, http2_transport):
+        with pytest.raises(Timeout):
+            http2_transport.send(_prepare("https://example.com/timeout"))
+
+    def test_send_when_connection_fails_raises_requests_connection_error(
+        self, http2_transport
+    ):
+        with pytest.raises(ConnectionError):
+            http2_transport.send(_prepare("https://example.com/refused"))
+
+    def test_init_when_httpx_not_installed_raises_pycpg_error(self, mocker):
+        mocker.patch.dict(sys.modules, {"httpx": None})
+        with pytest.raises(PycpgError) as err:
+            HTTP2Transport()
+        assert "pycpg[http2]" in str(err.value)
+
+
+class TestDefaultTransport:
+    def test_connection_by_default_uses_requests_transport(self):
+        connection = Connection.from_host_address("https://example.com")
+        assert connection._transport is connection_module._get_default_transport()
+        assert isinstance(connection._transport, RequestsTransport)
+
+    def test_connection_when_use_http2_set_uses_shared_http2_transport(
+        self, mocker, httpx
+    ):
+        mocker.patch.object(settings, "use_http2", True)
+        mocker.patch.object(connection_module, "_http2_transport", None)
+        first = Connection.from_host_address("https://example.com")
+        second = first.clone("https://other.example.com")
+        assert isinstance(first._transport, HTTP2Transport)
+        assert second._transport is first._transport
+
+    def test_connection_sends_requests_with_given_transport(
+        self, http2_transport, sent_requests
+    ):
+        connection = Connection.from_host_address(
+            "https://example.com", transport=http2_transport
+        )
+        response = connection.get("/api/v1/Computer")
+        assert response["key"] == "value"
+        assert sent_requests[0].headers["Host"] == "example.com"
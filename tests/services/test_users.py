@@ -1,4 +1,5 @@
 import json
+from threading import Event
 from unittest.mock import patch
 
 import pytest
@@ -8,6 +9,7 @@ from tests.conftest import create_mock_response
 import pycpg.settings
 from pycpg.exceptions import PycpgActiveLegalHoldError
 from pycpg.exceptions import PycpgBadRequestError
+from pycpg.exceptions import PycpgError
 from pycpg.exceptions import PycpgInternalServerError
 from pycpg.exceptions import PycpgInvalidEmailError
 from pycpg.exceptions import PycpgInvalidPasswordError
@@ -626,3 +628,180 @@ class TestUserService:
         assert (
             "User not found.  Please be aware that this method is incompatible with api client authentication."
         ) in str(err.value)
+
+    def test_block_after_get_by_id_uses_cached_uid(
+        self, mock_connection, mock_get_user_by_id_response
+    ):
+        mock_connection.get.return_value = mock_get_user_by_id_response
+        service = UserService(mock_connection)
+        service.get_by_id(12345)
+        service.block(12345)
+        assert mock_connection.get.call_count == 1
+        mock_connection.post.assert_called_once_with(
+            f"{USER_URI_V3}/{TEST_USER_UID}/block"
+        )
+
+    def test_get_uid_by_id_after_get_page_uses_cached_uid(
+        self, mocker, mock_connection
+    ):
+        page = {"users": [{"userId": 1, "userUid": "uid-1", "username": "a"}]}
+        mock_connection.get.return_value = create_mock_response(
+            mocker, json.dumps(page)
+        )
+        service = UserService(mock_connection)
+        service.get_page(1)
+        assert service._get_user_uid_by_id(1) == "uid-1"
+        assert mock_connection.get.call_count == 1
+
+    def test_update_user_when_username_changes_forgets_cached_user(
+        self, mock_connection, mock_get_user_by_id_response
+    ):
+        mock_connection.get.return_value = mock_get_user_by_id_response
+        service = UserService(mock_connection)
+        service.get_by_id(12345)
+        service.update_user(TEST_USER_UID, username="new@crashplan.com")
+        service._get_user_uid_by_id(12345)
+        assert mock_connection.get.call_count == 2
+
+    def test_resolve_users_when_cached_makes_no_requests(
+        self, mock_connection, mock_get_user_by_id_response
+    ):
+        mock_connection.get.return_value = mock_get_user_by_id_response
+        service = UserService(mock_connection)
+        service.get_by_id(12345)
+        assert service.resolve_users([12345]) == {12345: TEST_USER_UID}
+        assert mock_connection.get.call_count == 1
+
+    def test_resolve_users_looks_up_each_missing_user_and_skips_not_found(
+        self, mocker, mock_connection
+    ):
+        def get(uri, params=None):
+            user_id = int(uri.rsplit("/", 1)[1])
+            if user_id == 3:
+                raise create_mock_error(PycpgNotFoundError, mocker, "")
+            user = {"userId": user_id, "userUid": f"uid-{user_id}"}
+            return create_mock_response(mocker, json.dumps({"data": user}))
+
+        mock_connection.get.side_effect = get
+        service = UserService(mock_connection)
+        resolved = service.resolve_users([1, 2, 3], use_paging=False)
+        assert resolved == {1: "uid-1", 2: "uid-2"}
+        assert mock_connection.get.call_count == 3
+
+    def test_resolve_users_with_paging_stops_when_all_users_found(
+        self, mocker, mock_connection
+    ):
+        users = [{"userId": i, "userUid": f"uid-{i}"} for i in range(2)]
+        mock_connection.get.return_value = create_mock_response(
+            mocker, json.dumps({"users": users})
+        )
+        pycpg.settings.items_per_page = 2
+        service = UserService(mock_connection)
+        resolved = service.resolve_users([0, 1], use_paging=True)
+        pycpg.settings.items_per_page = 500
+        assert resolved == {0: "uid-0", 1: "uid-1"}
+        assert mock_connection.get.call_count == 1
+
+    @pytest.fixture
+    def role_change_connection(
+        self,
+        mocker,
+        mock_connection,
+        mock_get_available_roles_response,
+        mock_get_roles_response,
+    ):
+        def get(uri, params=None):
+            if uri == "/api/v1/role":
+                return mock_get_available_roles_response
+            if uri.endswith("/roles"):
+                return mock_get_roles_response
+            user_id = int(uri.rsplit("/", 1)[1])
+            user = {"userId": user_id, "userUid": f"uid-{user_id}"}
+            return create_mock_response(mocker, json.dumps({"data": user}))
+
+        mock_connection.get.side_effect = get
+        return mock_connection
+
+    def test_apply_role_changes_fetches_available_roles_once(
+        self, role_change_connection
+    ):
+        service = UserService(role_change_connection)
+        service.apply_role_changes(
+            [(1, "Alert Emails", []), (2, ["alert-emails"], ["Desktop User"])]
+        )
+        role_calls = [
+            c
+            for c in role_change_connection.get.call_args_list
+            if c[0][0] == "/api/v1/role"
+        ]
+        assert len(role_calls) == 1
+
+    def test_apply_role_changes_puts_minimal_role_changes(self, role_change_connection):
+        service = UserService(role_change_connection)
+        results = service.apply_role_changes([(1, "Alert Emails", "Desktop User")])
+        role_change_connection.put.assert_called_once_with(
+            f"{USER_URI_V3}/uid-1/roles",
+            json={"roleIds": ["proe-user", "customer-cloud-admin", "alert-emails"]},
+        )
+        assert results[0].added == ["alert-emails"]
+        assert results[0].removed == ["desktop-user"]
+        assert results[0].error is None
+
+    def test_apply_role_changes_when_no_change_needed_skips_put(
+        self, role_change_connection
+    ):
+        service = UserService(role_change_connection)
+        results = service.apply_role_changes([(1, "Desktop User", "Alert Emails")])
+        assert not role_change_connection.put.call_count
+        assert results[0].response is None
+        assert results[0].added == results[0].removed == []
+
+    def test_apply_role_changes_reports_error_per_user(
+        self, mocker, role_change_connection
+    ):
+        role_change_connection.put.side_effect = create_mock_error(
+            PycpgBadRequestError, mocker, "BAD REQUEST"
+        )
+        service = UserService(role_change_connection)
+        results = service.apply_role_changes([(1, "Alert Emails", [])])
+        assert isinstance(results[0].error, PycpgBadRequestError)
+
+    def test_apply_role_changes_when_role_unknown_reports_error_for_that_user(
+        self, role_change_connection
+    ):
+        service = UserService(role_change_connection)
+        results = service.apply_role_changes(
+            [(1, "Not A Role", []), (2, "Alert Emails", [])]
+        )
+        assert isinstance(results[0].error, PycpgError)
+        assert results[1].error is None
+        role_change_connection.put.assert_called_once_with(
+            f"{USER_URI_V3}/uid-2/roles",
+            json={
+                "roleIds": [
+                    "desktop-user",
+                    "proe-user",
+                    "customer-cloud-admin",
+                    "alert-emails",
+                ]
+            },
+        )
+
+    def test_apply_role_changes_returns_results_in_order_of_changes(
+        self, role_change_connection
+    ):
+        second_done = Event()
+
+        def put(uri, json):
+            # The first user's update finishes last.
+            if "uid-1" in uri:
+                second_done.wait(timeout=5)
+            else:
+                second_done.set()
+
+        role_change_connection.put.side_effect = put
+        service = UserService(role_change_connection)
+        results = service.apply_role_changes(
+            [(1, "Alert Emails", []), (2, "Alert Emails", [])], max_workers=2
+        )
+        assert [r.user_id for r in results] == [1, 2]
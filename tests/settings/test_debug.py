@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
@@ -97,3 +98,15 @@ def test_setting_debug_level_to_trace_sets_custom_logger_to_debug(
 def test_debug_settings_class_creates_default_logger():
     assert debug.logger.name == "pycpg"
     assert debug.level == logging.NOTSET
+
+
+def test_debug_settings_logger_when_first_used_by_many_threads_adds_one_handler(
+    mocker,
+):
+    logger = logging.Logger("pycpg")
+    mocker.patch("logging.getLogger", return_value=logger)
+    settings = type(debug)()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        loggers = list(executor.map(lambda _: settings.logger, range(32)))
+    assert all(item is logger for item in loggers)
+    assert len(logger.handlers) == 1
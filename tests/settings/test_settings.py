@@ -36,3 +36,11 @@ def test_get_user_agent_returns_correct_value_after_setting_prefix(default_user_
     assert settings.get_user_agent_string() == f"example-prefix {default_user_agent}"
     # reset settings to default
     settings.set_user_agent_prefix("")
+
+
+def test_get_user_agent_reads_package_version_once(mocker, default_user_agent):
+    settings.set_user_agent_suffix("")
+    spy = mocker.patch("pycpg.settings.version", return_value=version("pycpg"))
+    settings.get_user_agent_string()
+    settings.get_user_agent_string()
+    assert spy.call_count == 1
@@ -3,6 +3,7 @@ from tests.conftest import create_mock_response
 
 import pycpg.settings as settings
 from pycpg.services.util import get_all_pages
+from pycpg.services.util import run_concurrently
 
 
 @pytest.fixture
@@ -61,3 +62,21 @@ def test_get_all_pages_with_input_page_size_greater_than_default_calls_callback_
 
     settings.items_per_page = 500
     verify_calls(get_three_three_item_pages, 3)
+
+
+def test_run_concurrently_yields_result_for_each_item():
+    results = run_concurrently(lambda x: x * 2, range(10), max_workers=3)
+    assert sorted((item, result) for item, result, _ in results) == [
+        (i, i * 2) for i in range(10)
+    ]
+
+
+def test_run_concurrently_yields_errors_instead_of_raising():
+    def func(item):
+        if item == 2:
+            raise ValueError("bad item")
+        return item
+
+    errors = {item: err for item, _, err in run_concurrently(func, [1, 2, 3]) if err}
+    assert list(errors) == [2]
+    assert isinstance(errors[2], ValueError)
@@ -0,0 +1,86 @@
+from time import sleep
+
+import pytest
+
+from pycpg.bulk import BulkProgress
+from pycpg.bulk import run_bulk
+from pycpg.exceptions import PycpgBulkErrorThresholdError
+from pycpg.exceptions import PycpgError
+
+
+def succeed(item):
+    return f"response-{item}"
+
+
+def fail_odd(item):
+    if item % 2:
+        raise PycpgError(f"failed {item}")
+    return item
+
+
+def test_run_bulk_yields_result_for_each_item():
+    results = list(run_bulk(succeed, [1, 2, 3], max_workers=2))
+    assert sorted(r.item for r in results) == [1, 2, 3]
+    assert all(r.response == f"response-{r.item}" for r in results)
+    assert all(r.error is None for r in results)
+
+
+def test_run_bulk_reports_errors_per_item():
+    results = {r.item: r for r in run_bulk(fail_odd, [1, 2])}
+    assert isinstance(results[1].error, PycpgError)
+    assert results[2].error is None
+
+
+def test_run_bulk_when_dry_run_does_not_call_operation(mocker):
+    operation = mocker.MagicMock()
+    results = list(run_bulk(operation, [1, 2], dry_run=True))
+    assert [r.item for r in results] == [1, 2]
+    assert not operation.call_count
+
+
+def test_run_bulk_when_max_errors_reached_raises_threshold_error():
+    with pytest.raises(PycpgBulkErrorThresholdError) as err:
+        list(run_bulk(fail_odd, [1, 3, 5, 7, 9], max_workers=1, max_errors=2))
+    assert err.value.error_count == 2
+
+
+def test_run_bulk_when_max_errors_reached_records_items_already_running():
+    def fail_odd_slowly(item):
+        if item % 2:
+            raise PycpgError(f"failed {item}")
+        sleep(0.2)
+        return item
+
+    progress = BulkProgress()
+    with pytest.raises(PycpgBulkErrorThresholdError) as err:
+        list(
+            run_bulk(
+                fail_odd_slowly,
+                [2, 4, 1, 3, 6, 8],
+                max_workers=4,
+                max_errors=2,
+                progress=progress,
+            )
+        )
+    assert err.value.error_count == 2
+    assert all(progress.is_done(item) for item in (2, 4, 6))
+    assert not progress.is_done(8)
+    assert len(progress.failed) == 2
+
+
+def test_run_bulk_with_progress_skips_completed_items(mocker):
+    progress = BulkProgress()
+    list(run_bulk(fail_odd, [1, 2], progress=progress))
+    operation = mocker.MagicMock()
+    list(run_bulk(operation, [1, 2], progress=progress))
+    operation.assert_called_once_with(1)
+
+
+def test_bulk_progress_with_path_resumes_from_file(tmp_path):
+    path = str(tmp_path / "progress.jsonl")
+    list(run_bulk(fail_odd, [1, 2, 3, 4], progress=BulkProgress(path)))
+    resumed = BulkProgress(path)
+    assert resumed.is_done(2)
+    assert resumed.is_done(4)
+    assert not resumed.is_done(1)
+    assert len(resumed.failed) == 2
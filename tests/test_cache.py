@@ -0,0 +1,212 @@
+import json
+
+import pytest
+
+import pycpg.settings as settings
+from pycpg.cache import CacheStats
+from pycpg.cache import ResponseCache
+from pycpg.cache import RevalidationCache
+from pycpg.sdk import SDKClient
+from pycpg.services._auth import CustomJWTAuth
+from pycpg.services._connection import Connection
+from pycpg.testing import FakeCrashPlanServer
+
+TENANT_PATH = "GET /api/v3/customer/my"
+ORGS_PATH = "GET /api/v1/Org"
+
+
+class DictBackend:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        value = self.entries.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.entries[key] = json.dumps(value)
+
+
+@pytest.fixture
+def server():
+    return FakeCrashPlanServer(org_count=1, user_count=2, device_count=2)
+
+
+@pytest.fixture
+def sdk(server):
+    return server.create_sdk()
+
+
+@pytest.fixture
+def use_cache():
+    def use(**kwargs):
+        settings.response_cache = ResponseCache(**kwargs)
+        return settings.response_cache
+
+    yield use
+    settings.response_cache = None
+
+
+@pytest.fixture
+def cache(use_cache):
+    return use_cache()
+
+
+@pytest.fixture
+def revalidation_cache():
+    settings.revalidation_cache = RevalidationCache()
+    yield settings.revalidation_cache
+    settings.revalidation_cache = None
+
+
+def _create_sdk(server, token):
+    auth = CustomJWTAuth(lambda: token)
+    connection = Connection.from_host_address(
+        server.host_address, auth=auth, transport=server
+    )
+    return SDKClient(connection, auth)
+
+
+class TestResponseCache:
+    def test_get_when_endpoint_cached_sends_request_once(self, server, sdk, cache):
+        first = sdk.serveradmin.get_current_tenant()
+        second = sdk.serveradmin.get_current_tenant()
+        assert server.request_counts[TENANT_PATH] == 1
+        assert second.data == first.data
+        assert second.data is not first.data
+        assert cache.get_stats()["/api/v3/customer/my"] == CacheStats(1, 1)
+
+    def test_get_when_cached_returns_response_with_read_body(self, sdk, cache):
+        sdk.serveradmin.get_current_tenant()
+        response = sdk.serveradmin.get_current_tenant()
+        assert "<streamed>" not in repr(response)
+        assert b"".join(response.iter_content()) == response.raw_text.encode()
+
+    def test_get_when_endpoint_not_cached_sends_every_request(self, server, sdk, cache):
+        sdk.users.get_current()
+        sdk.users.get_current()
+        assert server.request_counts["GET /api/v1/User/my"] == 2
+
+    def test_get_keeps_responses_per_auth_identity(self, server, cache):
+        _create_sdk(server, "token-1").serveradmin.get_current_tenant()
+        _create_sdk(server, "token-2").serveradmin.get_current_tenant()
+        _create_sdk(server, "token-1").serveradmin.get_current_tenant()
+        assert server.request_counts[TENANT_PATH] == 2
+
+    def test_get_keeps_responses_per_url_below_endpoint(self, server, sdk, cache):
+        guids = [d["guid"] for d in server._devices]
+        for _ in range(2):
+            for guid in guids:
+                sdk.archive.get_backup_sets(guid, "42")
+        backup_sets_path = "GET /api/v3/BackupSets/(?P<guid>[^/]+)/(?P<dest>[^/]+)"
+        assert server.request_counts[backup_sets_path] == 2
+        assert cache.get_stats()["/api/v3/BackupSets"] == CacheStats(2, 2)
+
+    def test_get_when_ttl_expired_sends_request_again(self, server, sdk, use_cache):
+        use_cache(ttls={"/api/v3/customer/my": 0})
+        sdk.serveradmin.get_current_tenant()
+        sdk.serveradmin.get_current_tenant()
+        assert server.request_counts[TENANT_PATH] == 2
+
+    def test_get_when_cache_full_evicts_least_recently_used(
+        self, server, sdk, use_cache
+    ):
+        use_cache(maxsize=1)
+        sdk.serveradmin.get_current_tenant()
+        sdk.archive.get_backup_sets(server._devices[0]["guid"], "42")
+        sdk.serveradmin.get_current_tenant()
+        assert server.request_counts[TENANT_PATH] == 2
+
+    def test_invalidate_drops_responses_of_endpoint(self, server, sdk, cache):
+        sdk.serveradmin.get_current_tenant()
+        cache.invalidate("/api/v3/customer/my")
+        sdk.serveradmin.get_current_tenant()
+        assert server.request_counts[TENANT_PATH] == 2
+
+    def test_invalidate_without_path_drops_every_response(self, server, sdk, cache):
+        sdk.serveradmin.get_current_tenant()
+        cache.invalidate()
+        sdk.serveradmin.get_current_tenant()
+        assert server.request_counts[TENANT_PATH] == 2
+
+    def test_write_below_endpoint_invalidates_endpoint(self, server, sdk, use_cache):
+        use_cache(ttls={"/api/v1/Computer": 60})
+        device = server._devices[0]
+        sdk.devices.get_by_guid(device["guid"])
+        sdk.devices.update_settings({"computerId": device["computerId"]})
+        sdk.devices.get_by_guid(device["guid"])
+        assert server.request_counts["GET /api/v1/Computer/(?P<id>[^/]+)"] == 2
+
+    def test_clear_drops_responses_and_resets_stats(self, server, sdk, cache):
+        sdk.serveradmin.get_current_tenant()
+        cache.clear()
+        assert cache.get_stats()["/api/v3/customer/my"] == CacheStats(0, 0)
+        sdk.serveradmin.get_current_tenant()
+        assert server.request_counts[TENANT_PATH] == 2
+
+    def test_backend_is_used_instead_of_memory(self, server, sdk, use_cache):
+        backend = DictBackend()
+        use_cache(backend=backend)
+        first = sdk.serveradmin.get_current_tenant()
+        second = _create_sdk(server, "fake-token").serveradmin.get_current_tenant()
+        assert len(backend.entries) == 1
+        assert server.request_counts[TENANT_PATH] == 1
+        assert second.data == first.data
+
+    def test_invalidate_with_shared_backend_reaches_other_caches(
+        self, server, sdk, use_cache
+    ):
+        backend = DictBackend()
+        use_cache(backend=backend)
+        sdk.serveradmin.get_current_tenant()
+        ResponseCache(backend=backend).invalidate("/api/v3/customer/my")
+        sdk.serveradmin.get_current_tenant()
+        assert server.request_counts[TENANT_PATH] == 2
+
+    def test_clear_with_shared_backend_keeps_other_entries(
+        self, server, sdk, use_cache
+    ):
+        backend = DictBackend()
+        backend.set("other", {"value": 1}, 60)
+        cache = use_cache(backend=backend)
+        sdk.serveradmin.get_current_tenant()
+        cache.clear()
+        sdk.serveradmin.get_current_tenant()
+        assert backend.get("other") == {"value": 1}
+        assert server.request_counts[TENANT_PATH] == 2
+
+
+class TestRevalidationCache:
+    def test_get_when_not_modified_returns_kept_response(
+        self, server, sdk, revalidation_cache
+    ):
+        first = sdk.orgs.get_page(1)
+        second = sdk.orgs.get_page(1)
+        assert server.request_counts[ORGS_PATH] == 2
+        assert second.status_code == 200
+        assert second.data == first.data
+        assert revalidation_cache.get_stats() == CacheStats(1, 0)
+
+    def test_get_when_modified_returns_new_response(
+        self, server, sdk, revalidation_cache
+    ):
+        sdk.orgs.get_page(1)
+        server._orgs[0]["orgName"] = "Renamed"
+        response = sdk.orgs.get_page(1)
+        assert response["orgs"][0]["orgName"] == "Renamed"
+        assert revalidation_cache.get_stats() == CacheStats(0, 1)
+        sdk.orgs.get_page(1)
+        assert revalidation_cache.get_stats() == CacheStats(1, 1)
+
+    def test_get_keeps_responses_per_auth_identity(self, server, revalidation_cache):
+        _create_sdk(server, "token-1").orgs.get_page(1)
+        _create_sdk(server, "token-2").orgs.get_page(1)
+        assert revalidation_cache.get_stats() == CacheStats(0, 0)
+
+    def test_get_when_response_cached_is_not_revalidated(
+        self, server, sdk, cache, revalidation_cache
+    ):
+        sdk.serveradmin.get_current_tenant()
+        sdk.serveradmin.get_current_tenant()
+        assert server.request_counts[TENANT_PATH] == 1
+        assert revalidation_cache.get_stats() == CacheStats(0, 0)
@@ -0,0 +1,105 @@
+import json
+from copy import deepcopy
+
+import pytest
+from tests.clients.settings.test_device_settings import DEVICE_DICT_W_SETTINGS
+from tests.clients.settings.test_org_settings import TEST_T_SETTINGS_DICT
+
+from pycpg.clients.settings.device_settings import DeviceSettings
+from pycpg.clients.settings.org_settings import OrgSettings
+from pycpg.drift import DeviceDrift
+from pycpg.drift import DriftDetector
+from pycpg.exceptions import PycpgError
+
+
+def _create_device_settings(guid):
+    device_dict = deepcopy(DEVICE_DICT_W_SETTINGS)
+    device_dict["guid"] = guid
+    return DeviceSettings(device_dict)
+
+
+def _create_org_settings():
+    with open("tests/clients/settings/org_settings_not_inherited.json") as f:
+        org_dict = json.load(f)["data"]
+    return OrgSettings(org_dict, deepcopy(TEST_T_SETTINGS_DICT))
+
+
+@pytest.fixture
+def devices():
+    return {guid: _create_device_settings(guid) for guid in ("1", "2", "3")}
+
+
+@pytest.fixture
+def sdk(mocker, devices):
+    sdk = mocker.MagicMock()
+    sdk.devices.get_settings.side_effect = lambda guid: devices[guid]
+    sdk.orgs.get_settings.side_effect = lambda org_id: _create_org_settings()
+    return sdk
+
+
+@pytest.fixture
+def template():
+    return _create_device_settings("template")
+
+
+class TestDriftDetector:
+    def test_check_yields_drift_for_each_device(self, sdk, template):
+        drifts = list(DriftDetector(sdk, template=template).check(["1", "2", "3"]))
+        assert sorted(d.guid for d in drifts) == ["1", "2", "3"]
+        assert all(isinstance(d, DeviceDrift) for d in drifts)
+        assert all(d.differences == {} and d.error is None for d in drifts)
+
+    def test_check_reports_changed_settings(self, sdk, devices, template):
+        devices["2"].warning_alert_days = template.warning_alert_days + 1
+        devices["2"].backup_sets[0].excluded_files.append("/tmp/")
+        drifts = {d.guid: d for d in DriftDetector(sdk, template=template).check("12")}
+        assert drifts["1"].differences == {}
+        differences = drifts["2"].differences
+        assert differences["warning_alert_days"] == (
+            template.warning_alert_days,
+            template.warning_alert_days + 1,
+        )
+        expected, actual = differences["backup_sets[0].excluded_files"]
+        assert set(actual) - set(expected) == {"/tmp/"}
+
+    def test_check_ignores_order_of_file_selections(self, sdk, devices, template):
+        backup_set = devices["1"].backup_sets[0]
+        backup_set.included_files = list(reversed(backup_set.included_files))
+        (drift,) = DriftDetector(sdk, template=template).check(["1"])
+        assert drift.differences == {}
+
+    def test_check_reports_missing_backup_sets(self, sdk, devices, template):
+        devices["1"].backup_sets.pop()
+        (drift,) = DriftDetector(sdk, template=template).check(["1"])
+        index = len(template.backup_sets) - 1
+        expected, actual = drift.differences[f"backup_sets[{index}].destinations"]
+        assert expected
+        assert actual is None
+
+    def test_check_without_template_reads_each_org_once(self, sdk):
+        drifts = list(DriftDetector(sdk, max_workers=3).check(["1", "2", "3"]))
+        assert sdk.orgs.get_settings.call_count == 1
+        assert all(d.org_id == DEVICE_DICT_W_SETTINGS["orgId"] for d in drifts)
+        assert all(d.error is None for d in drifts)
+
+    def test_check_without_template_compares_with_org_defaults(self, sdk, devices):
+        defaults = _create_org_settings().device_defaults
+        devices["1"].critical_alert_days = defaults.critical_alert_days + 1
+        (drift,) = DriftDetector(sdk).check(["1"])
+        assert drift.differences["critical_alert_days"] == (
+            defaults.critical_alert_days,
+            defaults.critical_alert_days + 1,
+        )
+
+    def test_check_when_device_settings_cannot_be_read_records_error(self, sdk):
+        sdk.devices.get_settings.side_effect = PycpgError("failed")
+        (drift,) = DriftDetector(sdk).check(["1"])
+        assert drift.guid == "1"
+        assert isinstance(drift.error, PycpgError)
+
+    def test_check_when_org_settings_cannot_be_read_records_error_once(self, sdk):
+        sdk.orgs.get_settings.side_effect = PycpgError("failed")
+        drifts = list(DriftDetector(sdk, max_workers=3).check(["1", "2", "3"]))
+        assert all(isinstance(d.error, PycpgError) for d in drifts)
+        assert all(d.org_id == DEVICE_DICT_W_SETTINGS["orgId"] for d in drifts)
+        assert sdk.orgs.get_settings.call_count == 1
@@ -0,0 +1,131 @@
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from pycpg.mirror import InventoryMirror
+from pycpg.mirror import MirrorRefreshResult
+from pycpg.testing import FakeCrashPlanServer
+
+
+@pytest.fixture
+def server():
+    return FakeCrashPlanServer(org_count=4, user_count=30, device_count=25)
+
+
+@pytest.fixture
+def mirror(server):
+    mirror = InventoryMirror(server.create_sdk(), page_size=10)
+    mirror.refresh()
+    yield mirror
+    mirror.close()
+
+
+def _guids(devices):
+    return [d["guid"] for d in devices]
+
+
+class TestInventoryMirror:
+    def test_refresh_returns_result_for_each_table(self, server):
+        with InventoryMirror(server.create_sdk(), page_size=10) as mirror:
+            results = mirror.refresh()
+        assert results == [
+            MirrorRefreshResult("orgs", 4, 4, 0, 0),
+            MirrorRefreshResult("users", 30, 30, 0, 0),
+            MirrorRefreshResult("devices", 25, 25, 0, 0),
+        ]
+
+    def test_refresh_when_nothing_changed_does_not_rewrite_pages(self, mirror):
+        devices = mirror.refresh(tables=["devices"])[0]
+        assert devices == MirrorRefreshResult("devices", 25, 0, 0, 3)
+
+    def test_refresh_writes_only_changed_records(self, server, mirror):
+        server._devices[12]["name"] = "renamed"
+        devices = mirror.refresh(tables=["devices"])[0]
+        assert devices.changed == 1
+        assert devices.unchanged_pages == 2
+        assert mirror.get_device(server._devices[12]["guid"])["name"] == "renamed"
+
+    def test_refresh_removes_records_no_longer_returned(self, server, mirror):
+        removed = server._devices.pop(3)
+        devices = mirror.refresh(tables=["devices"])[0]
+        assert devices.deleted == 1
+        assert mirror.get_device(removed["guid"]) is None
+        assert len(mirror.query("SELECT guid FROM devices")) == 24
+
+    def test_refresh_when_records_shift_pages_keeps_all_records(self, server, mirror):
+        server._devices.insert(0, dict(server._devices[-1], guid="1", computerId=99))
+        devices = mirror.refresh(tables=["devices"])[0]
+        assert devices.changed == 1
+        assert devices.deleted == 0
+        assert len(mirror.query("SELECT guid FROM devices")) == 26
+
+    def test_refresh_sets_refreshed_at(self, server):
+        with InventoryMirror(server.create_sdk()) as mirror:
+            assert mirror.get_refreshed_at("users") is None
+            mirror.refresh(tables=["users"])
+            assert mirror.get_refreshed_at("users") is not None
+            assert mirror.get_refreshed_at("devices") is None
+
+    def test_get_devices_by_org_returns_devices_in_org(self, server, mirror):
+        devices = mirror.get_devices_by_org("org-uid-2")
+        expected = [d["guid"] for d in server._devices if d["orgUid"] == "org-uid-2"]
+        assert devices
+        assert _guids(devices) == expected
+
+    def test_get_devices_by_org_when_including_child_orgs_returns_all(self, mirror):
+        assert len(mirror.get_devices_by_org("org-uid-1")) < 25
+        assert (
+            len(mirror.get_devices_by_org("org-uid-1", include_child_orgs=True)) == 25
+        )
+
+    def test_get_users_without_devices_returns_users_without_devices(self, mirror):
+        users = mirror.get_users_without_devices()
+        assert [u["userUid"] for u in users] == [
+            f"user-uid-{i}" for i in (1, 27, 28, 29, 30)
+        ]
+
+    def test_get_users_without_devices_when_active_devices_only(self, mirror):
+        users = mirror.get_users_without_devices(active_devices_only=True)
+        # Devices 10 and 20 are deactivated.
+        assert {"user-uid-11", "user-uid-21"} <= {u["userUid"] for u in users}
+
+    def test_get_devices_not_backed_up_returns_oldest_first(self, mirror):
+        now = datetime(2024, 1, 21, tzinfo=timezone.utc).timestamp()
+        devices = mirror.get_devices_not_backed_up(15, now=now)
+        assert [d["computerId"] for d in devices] == [1, 2, 3, 4, 5]
+
+    def test_get_devices_not_backed_up_when_active_is_none_includes_inactive(
+        self, mirror
+    ):
+        now = datetime(2024, 2, 1, tzinfo=timezone.utc).timestamp()
+        devices = mirror.get_devices_not_backed_up(15, active=None, now=now)
+        assert 10 in [d["computerId"] for d in devices]
+
+    def test_get_devices_not_backed_up_includes_devices_never_backed_up(
+        self, server, mirror
+    ):
+        server._devices[0]["backupUsage"] = []
+        mirror.refresh(tables=["devices"])
+        devices = mirror.get_devices_not_backed_up(365, now=0)
+        assert _guids(devices) == [server._devices[0]["guid"]]
+
+    def test_get_user_by_username_ignores_case(self, mirror):
+        assert mirror.get_user_by_username("USER3@example.com")["userId"] == 3
+
+    def test_query_returns_rows_as_dicts(self, mirror):
+        rows = mirror.query(
+            "SELECT org_uid, COUNT(*) AS count FROM devices GROUP BY org_uid "
+            "ORDER BY org_uid"
+        )
+        assert sum(row["count"] for row in rows) == 25
+        assert rows[0]["org_uid"] == "org-uid-1"
+
+    def test_mirror_is_kept_in_database_file(self, server, tmp_path):
+        path = str(tmp_path / "inventory.db")
+        with InventoryMirror(server.create_sdk(), path=path) as mirror:
+            mirror.refresh()
+        server.reset_counts()
+        with InventoryMirror(server.create_sdk(), path=path) as mirror:
+            assert len(mirror.get_devices_by_org("org-uid-2")) > 0
+        assert not server.request_counts
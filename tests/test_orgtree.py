@@ -0,0 +1,116 @@
+import json
+from copy import deepcopy
+
+import pytest
+from tests.clients.settings.test_org_settings import TEST_T_SETTINGS_DICT
+
+from pycpg.clients.settings.org_settings import OrgSettings
+from pycpg.exceptions import PycpgError
+from pycpg.orgtree import INHERITED_SETTINGS
+from pycpg.orgtree import OrgSettingsTree
+
+# org ID: (parent org ID, quota settings inherited, archive hold days)
+ORGS = {
+    1: (None, False, 100),
+    2: (1, True, 5),
+    3: (2, True, 6),
+    4: (1, False, 50),
+    5: (4, True, 7),
+}
+
+
+@pytest.fixture
+def org_settings_dict():
+    with open("tests/clients/settings/org_settings_not_inherited.json") as f:
+        return json.load(f)["data"]
+
+
+@pytest.fixture
+def sdk(mocker, org_settings_dict):
+    def get_settings(org_id):
+        parent_id, inherited, hold_days = ORGS[org_id]
+        data = deepcopy(org_settings_dict)
+        data["orgId"] = org_id
+        data["parentOrgId"] = parent_id
+        data["settings"]["isUsingQuotaDefaults"] = inherited
+        data["settings"]["archiveHoldDays"] = hold_days
+        return OrgSettings(data, deepcopy(TEST_T_SETTINGS_DICT))
+
+    sdk = mocker.MagicMock()
+    sdk.orgs.get_all.return_value = [
+        {
+            "orgs": [
+                {"orgId": org_id, "orgGuid": f"guid-{org_id}", "parentOrgId": parent}
+                for org_id, (parent, _, _) in ORGS.items()
+            ]
+        }
+    ]
+    sdk.orgs.get_settings.side_effect = get_settings
+    return sdk
+
+
+class TestOrgSettingsTree:
+    def test_load_reads_settings_of_every_org(self, sdk):
+        tree = OrgSettingsTree(sdk, max_workers=3).load()
+        assert sorted(tree.org_ids) == [1, 2, 3, 4, 5]
+        assert sdk.orgs.get_settings.call_count == 5
+        assert sdk.orgs.get_all.call_count == 1
+        assert tree.get_settings(3).org_id == 3
+
+    def test_load_fills_org_id_map_from_every_org(self, sdk):
+        OrgSettingsTree(sdk).load()
+        orgs = sdk.orgs.load_org_id_map.call_args[0][0]
+        assert sorted(org["orgId"] for org in orgs) == [1, 2, 3, 4, 5]
+
+    def test_load_when_org_ids_given_also_loads_their_ancestors(self, sdk):
+        tree = OrgSettingsTree(sdk).load([3])
+        assert sorted(tree.org_ids) == [1, 2, 3]
+
+    def test_hierarchy(self, sdk):
+        tree = OrgSettingsTree(sdk).load()
+        assert tree.get_parent_id(3) == 2
+        assert tree.get_parent_id(1) is None
+        assert tree.get_child_ids(1) == [2, 4]
+        assert tree.get_child_ids(None) == [1]
+
+    def test_get_effective_value_takes_inherited_values_from_ancestors(self, sdk):
+        tree = OrgSettingsTree(sdk).load()
+        assert tree.get_effective_value(1, "archive_hold_days") == 100
+        assert tree.get_effective_value(3, "archive_hold_days") == 100
+        assert tree.get_effective_value(2, "archive_hold_days") == 100
+        assert tree.get_effective_value(4, "archive_hold_days") == 50
+        assert tree.get_effective_value(5, "archive_hold_days") == 50
+
+    def test_get_effective_value_when_setting_not_inherited_returns_own_value(
+        self, sdk
+    ):
+        tree = OrgSettingsTree(sdk).load()
+        assert tree.get_effective_value(3, "org_name") == "TEST_ORG"
+
+    def test_get_effective_value_when_top_level_org_inherits_returns_own_value(
+        self, mocker, sdk
+    ):
+        mocker.patch.dict(ORGS, {1: (None, True, 100)})
+        tree = OrgSettingsTree(sdk).load()
+        assert tree.get_effective_value(3, "archive_hold_days") == 100
+
+    def test_get_effective_settings_returns_every_inherited_setting(self, sdk):
+        settings = OrgSettingsTree(sdk).load().get_effective_settings(3)
+        assert set(settings) == set(INHERITED_SETTINGS)
+        assert settings["archive_hold_days"] == 100
+        assert settings["backup_warning_email_days"] == 3
+
+    def test_load_records_errors_per_org(self, sdk):
+        get_settings = sdk.orgs.get_settings.side_effect
+
+        def fail_org_2(org_id):
+            if org_id == 2:
+                raise PycpgError("failed")
+            return get_settings(org_id)
+
+        sdk.orgs.get_settings.side_effect = fail_org_2
+        tree = OrgSettingsTree(sdk).load()
+        assert isinstance(tree.errors[2], PycpgError)
+        assert sorted(tree.org_ids) == [1, 3, 4, 5]
+        with pytest.raises(PycpgError):
+            tree.get_effective_value(3, "archive_hold_days")
@@ -0,0 +1,147 @@
+import json
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from pycpg.exceptions import PycpgError
+from pycpg.query import DeviceQuery
+from pycpg.query import UserQuery
+from pycpg.testing import FakeCrashPlanServer
+
+DEVICES = [
+    {
+        "guid": str(i),
+        "name": f"device-{i}",
+        "osName": "win" if i % 2 else "mac",
+        "lastConnected": f"2024-01-{i:02d}T00:00:00.000Z",
+        "backupUsage": [{"targetComputerGuid": "42", "archiveBytes": i}],
+    }
+    for i in range(1, 6)
+]
+
+
+class _Page:
+    def __init__(self, records):
+        self.raw_text = json.dumps({"data": {"totalCount": 5, "computers": records}})
+
+
+@pytest.fixture
+def page_calls():
+    return []
+
+
+@pytest.fixture
+def get_page(page_calls):
+    def get_page(page_num, page_size=None, **params):
+        page_calls.append(dict(params, page_num=page_num, page_size=page_size))
+        start = (page_num - 1) * page_size
+        end = start + page_size
+        return _Page(DEVICES[start:end])
+
+    return get_page
+
+
+class TestListingQuery:
+    def test_iter_pages_until_short_page(self, get_page, page_calls):
+        devices = list(DeviceQuery(get_page, page_size=2))
+        assert devices == DEVICES
+        assert [c["page_num"] for c in page_calls] == [1, 2, 3]
+
+    def test_filter_sends_params_with_request(self, get_page, page_calls):
+        list(DeviceQuery(get_page).filter(active=True, org_uid="org-1"))
+        assert page_calls[0]["active"] is True
+        assert page_calls[0]["org_uid"] == "org-1"
+
+    def test_filter_when_not_supported_by_api_raises(self, get_page):
+        with pytest.raises(PycpgError) as err:
+            DeviceQuery(get_page).filter(os_name="win")
+        assert "Use where()" in str(err.value)
+
+    def test_where_on_pushdown_field_sends_param_with_request(
+        self, get_page, page_calls
+    ):
+        list(DeviceQuery(get_page).where("orgUid", "==", "org-1"))
+        assert page_calls[0]["org_uid"] == "org-1"
+
+    def test_filter_after_where_on_same_param_keeps_where_clause(
+        self, get_page, page_calls
+    ):
+        query = DeviceQuery(get_page).where("orgUid", "==", "org-1")
+        devices = list(query.filter(org_uid="org-2"))
+        assert page_calls[0]["org_uid"] == "org-2"
+        assert devices == []
+
+    def test_where_filters_records_client_side(self, get_page, page_calls):
+        devices = list(DeviceQuery(get_page).where("osName", "==", "mac"))
+        assert [d["guid"] for d in devices] == ["2", "4"]
+        assert "osName" not in page_calls[0]
+
+    def test_where_when_value_is_datetime_compares_dates(self, get_page):
+        cutoff = datetime(2024, 1, 3, tzinfo=timezone.utc)
+        devices = list(DeviceQuery(get_page).where("lastConnected", "<", cutoff))
+        assert [d["guid"] for d in devices] == ["1", "2"]
+
+    def test_where_when_value_is_naive_datetime_treats_it_as_utc(self, get_page):
+        devices = list(
+            DeviceQuery(get_page).where("lastConnected", ">=", datetime(2024, 1, 4))
+        )
+        assert [d["guid"] for d in devices] == ["4", "5"]
+
+    def test_where_when_field_missing_does_not_match_ordering(self, get_page):
+        assert list(DeviceQuery(get_page).where("missing", ">", 1)) == []
+
+    def test_where_in_operator(self, get_page):
+        devices = list(DeviceQuery(get_page).where("guid", "in", {"1", "5"}))
+        assert [d["guid"] for d in devices] == ["1", "5"]
+
+    def test_where_when_operator_invalid_raises(self, get_page):
+        with pytest.raises(PycpgError):
+            DeviceQuery(get_page).where("guid", "~", "1")
+
+    def test_select_returns_only_selected_fields(self, get_page):
+        devices = list(
+            DeviceQuery(get_page).where("osName", "==", "win").select("guid", "name")
+        )
+        assert devices == [
+            {"guid": "1", "name": "device-1"},
+            {"guid": "3", "name": "device-3"},
+            {"guid": "5", "name": "device-5"},
+        ]
+
+    def test_select_keeps_nested_fields_whole(self, get_page):
+        devices = list(DeviceQuery(get_page).select("backupUsage"))
+        assert devices[0] == {"backupUsage": DEVICES[0]["backupUsage"]}
+
+    def test_select_backup_usage_requests_backup_usage(self, get_page, page_calls):
+        list(DeviceQuery(get_page).select("guid", "backupUsage"))
+        assert page_calls[0]["include_backup_usage"] is True
+
+    def test_queries_are_immutable(self, get_page):
+        query = DeviceQuery(get_page)
+        query.where("osName", "==", "mac").select("guid")
+        assert list(query) == DEVICES
+
+
+class TestServiceQueries:
+    @pytest.fixture
+    def sdk(self):
+        return FakeCrashPlanServer(device_count=30, user_count=20).create_sdk()
+
+    def test_devices_query_returns_matching_devices(self, sdk):
+        query = sdk.devices.query(page_size=7)
+        devices = list(
+            query.filter(active=True).where("osName", "==", "linux").select("name")
+        )
+        expected = [
+            {"name": f"device-{i}"} for i in range(1, 31) if i % 3 == 2 and i % 10
+        ]
+        assert devices == expected
+
+    def test_users_query_returns_matching_users(self, sdk):
+        users = list(sdk.users.query().where("userId", "<=", 2).select("username"))
+        assert isinstance(sdk.users.query(), UserQuery)
+        assert users == [
+            {"username": "user1@example.com"},
+            {"username": "user2@example.com"},
+        ]
@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from pycpg.exceptions import PycpgError
+from pycpg.exceptions import PycpgInternalServerError
+from pycpg.reports import DeviceStorage
+from pycpg.reports import StorageReport
+from pycpg.testing import FakeCrashPlanServer
+
+NOW = datetime(2024, 2, 1, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def server():
+    return FakeCrashPlanServer(org_count=3, user_count=10, device_count=20)
+
+
+@pytest.fixture
+def sdk(server):
+    return server.create_sdk()
+
+
+@pytest.fixture
+def report(sdk):
+    return StorageReport(sdk, max_workers=4, now=NOW)
+
+
+def _archive_bytes(server, devices=None):
+    return sum(
+        a["archiveBytes"]
+        for a in server._archives
+        if devices is None or a["backupSourceGuid"] in devices
+    )
+
+
+class TestStorageReport:
+    def test_iter_devices_reads_archives_of_each_device(self, server, report):
+        devices = list(report.iter_devices())
+        assert len(devices) == 20
+        assert all(isinstance(d, DeviceStorage) for d in devices)
+        assert server.request_counts["GET /api/v1/Archive"] == 20
+        assert server.request_counts["GET /api/v1/Computer"] == 1
+
+    def test_iter_devices_returns_device_storage(self, server, report):
+        devices = {d.guid: d for d in report.iter_devices()}
+        device = devices[server._devices[9]["guid"]]
+        assert device.archives == 1
+        assert device.cold_storage_archives == 1
+        assert device.cold_storage_bytes == device.archive_bytes
+        assert device.destinations == ["42"]
+        assert device.last_backup == "2024-01-10T00:00:00+00:00"
+        assert device.backup_age_days == 22
+        assert device.error is None
+
+    def test_iter_devices_when_run_again_does_not_read_archives_again(
+        self, server, report
+    ):
+        first = list(report.iter_devices())
+        second = list(report.iter_devices())
+        assert first == second
+        assert server.request_counts["GET /api/v1/Archive"] == 20
+
+    def test_iter_devices_when_archive_has_no_backup_date_uses_backup_usage(
+        self, server, report
+    ):
+        server._archives[0]["lastCompletedBackupDate"] = None
+        devices = {d.guid: d for d in report.iter_devices()}
+        assert devices[server._devices[0]["guid"]].last_backup == (
+            "2024-01-01T00:00:00+00:00"
+        )
+
+    def test_iter_devices_when_archives_cannot_be_read_records_error(
+        self, mocker, server, sdk, report
+    ):
+        failing_guid = server._devices[4]["guid"]
+        get_archives = sdk.archive.get_all_by_device_guid
+
+        def get_all_by_device_guid(guid):
+            if guid == failing_guid:
+                raise PycpgInternalServerError(mocker.MagicMock(text="error"))
+            return get_archives(guid)
+
+        mocker.patch.object(
+            sdk.archive, "get_all_by_device_guid", side_effect=get_all_by_device_guid
+        )
+        devices = {d.guid: d for d in report.iter_devices()}
+        assert devices[failing_guid].error is not None
+        assert devices[failing_guid].archives == 0
+        org = next(
+            s
+            for s in report.get_summary("org")
+            if s.key == devices[failing_guid].org_uid
+        )
+        assert org.errors == 1
+
+    def test_get_summary_by_org_totals_devices_in_each_org(self, server, report):
+        list(report.iter_devices())
+        summaries = report.get_summary("org")
+        assert sum(s.devices for s in summaries) == 20
+        assert sum(s.archive_bytes for s in summaries) == _archive_bytes(server)
+        for summary in summaries:
+            guids = {d["guid"] for d in server._devices if d["orgUid"] == summary.key}
+            assert summary.archive_bytes == _archive_bytes(server, guids)
+
+    def test_get_summary_is_sorted_by_archive_bytes(self, report):
+        list(report.iter_devices())
+        sizes = [s.archive_bytes for s in report.get_summary("user")]
+        assert sizes == sorted(sizes, reverse=True)
+
+    def test_get_summary_by_destination_includes_backup_ages(self, server, report):
+        list(report.iter_devices())
+        (destination,) = report.get_summary("destination")
+        assert destination.key == "42"
+        assert destination.archives == 20
+        assert destination.cold_storage_archives == 2
+        assert destination.last_backup == "2024-01-20T00:00:00+00:00"
+        assert destination.max_backup_age_days == 31
+        assert destination.devices_never_backed_up == 0
+
+    def test_get_summary_during_run_includes_devices_read_so_far(self, report):
+        devices = report.iter_devices()
+        next(devices)
+        assert sum(s.devices for s in report.get_summary("org")) == 1
+        devices.close()
+
+    def test_filters_limit_devices(self, report, sdk):
+        report = StorageReport(sdk, now=NOW, active=True)
+        devices = list(report.iter_devices())
+        assert len(devices) == 18
+        assert not any(d.cold_storage_archives for d in devices)
+
+    def test_write_devices_writes_csv_row_for_each_device(self, report):
+        output = io.StringIO()
+        report.write_devices(output)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        assert len(rows) == 20
+        assert rows[0]["destinations"] == "42"
+
+    def test_write_devices_as_json_writes_json_array(self, report):
+        output = io.StringIO()
+        report.write_devices(output, format="json")
+        devices = json.loads(output.getvalue())
+        assert len(devices) == 20
+        assert devices[0]["destinations"] == "42"
+
+    def test_write_summary_as_json_writes_summary(self, report):
+        output = io.StringIO()
+        report.write_summary(output, "destination", format="json")
+        assert json.loads(output.getvalue())[0]["devices"] == 20
+
+    def test_write_summary_when_no_devices_writes_empty_json_array(self, sdk):
+        report = StorageReport(sdk, org_uid="org-uid-none")
+        output = io.StringIO()
+        report.write_summary(output, "org", format="json")
+        assert json.loads(output.getvalue()) == []
+
+    def test_write_summary_when_format_invalid_raises(self, report):
+        with pytest.raises(PycpgError):
+            report.write_summary(io.StringIO(), "org", format="xml")
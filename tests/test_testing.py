@@ -0,0 +1,127 @@
+import pytest
+
+from pycpg.exceptions import PycpgInternalServerError
+from pycpg.exceptions import PycpgNotFoundError
+from pycpg.exceptions import PycpgTooManyRequestsError
+from pycpg.orgtree import OrgSettingsTree
+from pycpg.testing import FakeCrashPlanServer
+
+
+@pytest.fixture
+def server():
+    return FakeCrashPlanServer(
+        org_count=4, user_count=30, device_count=25, audit_event_count=12
+    )
+
+
+@pytest.fixture
+def sdk(server):
+    return server.create_sdk()
+
+
+class TestFakeCrashPlanServer:
+    def test_devices_get_all_pages_through_all_devices(self, server, sdk):
+        pages = list(sdk.devices.get_all(page_size=10))
+        devices = [d for page in pages for d in page["computers"]]
+        assert len(devices) == 25
+        assert server.request_counts["GET /api/v1/Computer"] == 3
+
+    def test_devices_get_all_when_active_filters_devices(self, sdk):
+        pages = sdk.devices.get_all(active=True)
+        devices = [d for page in pages for d in page["computers"]]
+        assert devices
+        assert all(d["active"] for d in devices)
+
+    def test_devices_get_by_guid_includes_backup_usage_when_requested(self, sdk):
+        device = sdk.devices.get_page(1, page_size=1)["computers"][0]
+        response = sdk.devices.get_by_guid(device["guid"], include_backup_usage=True)
+        assert response["backupUsage"][0]["archiveBytes"] > 0
+
+    def test_max_page_size_limits_page(self):
+        server = FakeCrashPlanServer(device_count=25, max_page_size=5)
+        sdk = server.create_sdk()
+        assert len(sdk.devices.get_page(1, page_size=50)["computers"]) == 5
+
+    def test_users_get_by_id_returns_user(self, sdk):
+        assert sdk.users.get_by_id(3)["username"] == "user3@example.com"
+
+    def test_users_get_by_id_when_missing_raises_not_found(self, sdk):
+        with pytest.raises(PycpgNotFoundError):
+            sdk.users.get_by_id(999)
+
+    def test_orgs_get_all_returns_org_tree(self, sdk):
+        orgs = [o for page in sdk.orgs.get_all() for o in page["orgs"]]
+        assert [o["parentOrgId"] for o in orgs] == [None, 1, 1, 1]
+
+    def test_orgs_get_settings_returns_org_settings(self, sdk):
+        org_settings = sdk.orgs.get_settings(2)
+        assert org_settings.org_id == 2
+        assert org_settings.quota_settings_inherited is True
+        assert org_settings.web_restore_enabled is True
+
+    def test_orgs_bulk_update_settings_writes_settings(self, sdk):
+        def change(org_settings):
+            org_settings.archive_hold_days = 30
+            org_settings.web_restore_enabled = False
+
+        report = sdk.orgs.bulk_update_settings([2, 3], change)
+        assert sorted(report.changed) == [2, 3]
+        assert report.errors == {}
+        org_settings = sdk.orgs.get_settings(3)
+        assert org_settings.archive_hold_days == 30
+        assert org_settings.web_restore_enabled is False
+
+    def test_org_settings_tree_loads_every_org(self, sdk):
+        tree = OrgSettingsTree(sdk).load()
+        assert sorted(tree.org_ids) == [1, 2, 3, 4]
+        assert tree.errors == {}
+        assert tree.get_effective_value(4, "archive_hold_days") == 14
+
+    def test_sync_matter_custodians_updates_memberships(self, sdk):
+        report = sdk.legalhold.sync_matter_custodians(
+            "matter-uid-1", ["user-uid-1", "user-uid-20"]
+        )
+        assert report.added == ["user-uid-20"]
+        assert report.unchanged == 1
+        pages = sdk.legalhold.get_all_matter_custodians(
+            legal_hold_matter_uid="matter-uid-1"
+        )
+        members = {m["user"]["userUid"] for page in pages for m in page.data}
+        assert members == {"user-uid-1", "user-uid-20"}
+
+    def test_audit_logs_get_all_pages_from_zero(self, sdk):
+        pages = list(sdk.auditlogs.get_all(page_size=5))
+        assert sum(len(page["events"]) for page in pages) == 12
+
+    def test_archive_stream_from_backup_walks_tree_and_streams_result(self, sdk):
+        response = sdk.archive.stream_from_backup(
+            "/dir1/dir0/file2.txt",
+            "900000000000000001",
+            destination_guid="42",
+            file_size_calc_timeout=0,
+        )
+        assert b"".join(response.iter_content(chunk_size=8)).startswith(
+            b"restored content"
+        )
+
+    def test_throttle_rate_returns_too_many_requests(self, server, sdk):
+        server.throttle_rate = 1
+        with pytest.raises(PycpgTooManyRequestsError) as err:
+            sdk.users.get_by_id(1)
+        assert err.value.response.headers["Retry-After"] == "1"
+
+    def test_error_rate_returns_internal_server_error(self, server, sdk):
+        server.error_rate = 1
+        with pytest.raises(PycpgInternalServerError):
+            sdk.users.get_by_id(1)
+
+    def test_request_without_authorization_returns_unauthorized(self, server):
+        from requests import Request
+
+        request = Request("GET", f"{server.host_address}/api/v1/User/1").prepare()
+        assert server.send(request).status_code == 401
+
+    def test_records_max_concurrent_requests(self, server, sdk):
+        server.latency = 0.01
+        sdk.users.resolve_users(range(1, 9), max_workers=4)
+        assert 1 < server.max_concurrent_requests <= 4
@@ -1,4 +1,5 @@
 from datetime import datetime
+from datetime import timezone
 
 import pycpg.util as util
 
@@ -83,3 +84,18 @@ def test_parse_timestamp_to_microseconds_precision_returns_expected_timestamp_wi
 def test_parse_timestamp_to_milliseconds_precision_returns_expected_timestamp_with_float_time():
     actual = util.parse_timestamp_to_milliseconds_precision(1599653541.001002)
     assert actual == "2020-09-09T12:12:21.001Z"
+
+
+def test_parse_iso_datetime_returns_utc_datetime():
+    expected = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    assert util.parse_iso_datetime("2024-05-01T12:30:00Z") == expected
+    assert util.parse_iso_datetime("2024-05-01T12:30:00.000Z") == expected
+    assert util.parse_iso_datetime("2024-05-01T12:30:00") == expected
+    assert util.parse_iso_datetime("2024-05-01T14:30:00+02:00") == expected
+
+
+def test_parse_iso_datetime_when_not_iso_date_returns_none():
+    assert util.parse_iso_datetime(None) is None
+    assert util.parse_iso_datetime("") is None
+    assert util.parse_iso_datetime("yesterday") is None
+    assert util.parse_iso_datetime(1714566600000) is None